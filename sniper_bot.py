@@ -1,8 +1,9 @@
 import time
 from datetime import datetime, timedelta
-import requests
 import json
 import re
+import random
+import itertools
 import threading
 from threading import Lock
 import os
@@ -12,9 +13,18 @@ from typing import Optional, Dict, Any
 import asyncio # For websockets
 import websockets # For websockets
 import sniper_trading
+import sniper_http
+import sniper_codec
+import sniper_pools
+import sniper_state
+import sniper_log
+import sniper_portfolio
+import sniper_journal
 import ssl
 import certifi
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
 
 # --- Wallet/Seed Phrase Imports ---
 import base58
@@ -58,6 +68,9 @@ RPC_LIST = [
     "https://solana-mainnet.api.syndica.io/api-key/4AM18sWSra766qjy6ZsawZ8KK5uLkk7ik5yRun719egHCNwqXDzuMvNx3HvkPz33H8AujKzdyP55oGxvrSA9Ehp9MFokeNXK3vg",
     "https://rpc.ankr.com/solana"
 ]
+# Extra endpoints that only receive transaction broadcasts (e.g. staked or regional send endpoints)
+SEND_ONLY_RPC_LIST = []
+BROADCAST_SENDS = True # Fan signed swap transactions out to every endpoint at once
 
 STARTING_USD = 100.0
 POSITION_SIZE_USD = 20.0
@@ -77,12 +90,38 @@ SIMULATION_DURATION = 60 * 60 * 2
 DEX_POLL_INTERVAL = 1 # This will now be primarily for "manual" refreshes or fallback
 MAX_TOKENS_PER_POLL = 500
 MAX_TOKEN_AGE_SECONDS = 1800
+SEEN_TOKENS_TTL = 24 * 3600 # Seconds a token stays in the seen index before it may be evaluated again
+SEEN_TOKENS_FILE = "seen_tokens.json" # Seen index persisted across restarts (None disables)
+TRADE_JOURNAL_FILE = sniper_journal.JOURNAL_FILE # SQLite journal of buys, sells and price updates (None disables)
+PROFILE_FEED_KNOWN_RUN = 3 # Consecutive already-seen profiles after which a poll stops scanning the feed
+PENDING_MINT_TTL = 300 # Seconds a mint Dexscreener has not indexed yet keeps being looked up
+PENDING_MINT_MAX = 500 # Mints held for those lookups, oldest dropped first
+PENDING_RECHECK_INTERVAL = 10 # Seconds between lookups of the pending mints (batched, no per-mint fallback)
 TERMINAL_WIDTH = 100
 SUMMARY_INTERVAL = 300
 MAX_LOG_SIZE = 10 * 1024 * 1024
 MAX_SEEN_TOKENS = 10000
 MAX_TRADES_HISTORY = 1000
 MAX_LOG_LINES = 5000
+LOG_LEVEL = "INFO" # Default level for categorised log lines; per category via log_levels={"FILTER": "DEBUG"}
+DEX_ENRICH_WORKERS = 8 # Concurrent pool lookups per poll
+DEX_BATCH_SIZE = 30 # Max comma-separated addresses accepted by the tokens endpoint
+MAX_CONCURRENT_TRADES = 4 # Buys allowed in flight at once
+MAX_CONCURRENT_SELLS = 2 # Take-profit/stop-loss sells in flight at once, on a pool of their own
+TRADE_DRAIN_TIMEOUT = 5.0 # Seconds stop() lets in-flight trades finish before stopping the event loop
+POOL_TX_FETCH_ATTEMPTS = 4 # getTransaction tries for a new-pool signature the node may not serve yet
+POOL_TX_FETCH_DELAY = 0.4 # Seconds between those tries (about one slot)
+RECENT_SIGNATURES_MAX = 2048 # Pool-creation signatures remembered for de-duplication
+WS_ENDPOINT_COUNT = 2 # Endpoints from RPC_LIST the log stream stays subscribed to at once
+WS_RECONNECT_BASE_DELAY = 0.5 # Seconds; reconnect backoff doubles from here with full jitter
+WS_RECONNECT_MAX_DELAY = 30.0
+SEND_ENDPOINTS_MAX = 256 # Signatures whose winning send endpoint is remembered for logging
+BLOCKHASH_REFRESH_INTERVAL = 2.0 # Seconds between background blockhash refreshes
+BLOCKHASH_MAX_AGE = 30.0 # Cached blockhashes older than this are refetched (valid ~60s on chain)
+RPC_HEALTH_PROBE_INTERVAL = 5.0 # Seconds between getSlot probes of every RPC endpoint
+RPC_EWMA_ALPHA = 0.3 # Weight of the newest sample in latency/error averages
+RPC_MAX_SLOT_LAG = 25 # Endpoints further behind the best observed slot are treated as unhealthy
+RPC_SLOT_LAG_PENALTY_MS = 400 # Score penalty per slot behind (about one slot time)
 
 # --- NEW JUPITER API CONFIG (kept for reference, but will be bypassed for direct swaps) ---
 JUPITER_V6_API_BASE = "https://public.jupiterapi.com"
@@ -91,27 +130,63 @@ JUPITER_SWAP_API = "https://quote-api.jup.ag/v6/swap"
 DEFAULT_SLIPPAGE_BPS = 100 # 100 basis points = 1% slippage. Adjust as needed.
 DEFAULT_PRIORITIZATION_FEE_LAMPORTS_PER_CU = 0 # Or a fixed value like 1000000
 
-class RateLimiter:
-    def __init__(self, calls_per_second=2):
-        self.calls_per_second = calls_per_second
-        self.last_call = datetime.now()
-        self.lock = Lock()
+class EndpointHealth:
+    """Rolling health of one RPC endpoint: EWMA latency, EWMA error rate and last probed slot."""
+
+    def __init__(self, url):
+        self.url = url
+        self.latency_ms = None
+        self.error_rate = 0.0
+        self.slot = None
+        self.slot_lag = 0
+
+    def record(self, latency_ms=None, error=False):
+        sample = 1.0 if error else 0.0
+        self.error_rate += RPC_EWMA_ALPHA * (sample - self.error_rate)
+        if latency_ms is not None and not error:
+            if self.latency_ms is None:
+                self.latency_ms = latency_ms
+            else:
+                self.latency_ms += RPC_EWMA_ALPHA * (latency_ms - self.latency_ms)
+
+    @property
+    def healthy(self):
+        return self.error_rate < 0.5 and self.slot_lag <= RPC_MAX_SLOT_LAG
+
+    def score(self):
+        """Lower is better. Unmeasured endpoints score as average so they still get tried."""
+        latency = self.latency_ms if self.latency_ms is not None else 500.0
+        return latency * (1 + 4 * self.error_rate) + self.slot_lag * RPC_SLOT_LAG_PENALTY_MS
 
-    def wait(self):
-        with self.lock:
-            now = datetime.now()
-            time_since_last = (now - self.last_call).total_seconds()
-            if time_since_last < 1/self.calls_per_second:
-                time.sleep(1/self.calls_per_second - time_since_last)
-            self.last_call = now # Update last_call to current time
 
 class RotatingSolanaClient:
-    def __init__(self, rpc_list, commitment="confirmed", logger=None):
+    def __init__(self, rpc_list, commitment="confirmed", logger=None, hedge_sends=False, send_only_list=None):
         self.rpc_list = rpc_list
         self.commitment = commitment
         self.current = 0
         self.clients = [Client(url) for url in rpc_list]
+        self.send_only_list = list(send_only_list or [])
+        self.send_only_clients = [Client(url) for url in self.send_only_list]
+        # Which endpoint accepted each parallel send first: per signature (concurrent trades
+        # share this client) and counted per endpoint
+        self.send_endpoints = OrderedDict()
+        self.send_wins = {}
+        self._send_lock = Lock()
         self.logger = logger
+        # Per-endpoint health; calls are routed to the best-scoring healthy endpoint first
+        self.health = [EndpointHealth(url) for url in rpc_list]
+        # Per-endpoint request budgets (the "rpc" entry of sniper_http.API_BUDGETS)
+        self.limiters = [sniper_http.get_limiter(f"rpc:{url}") for url in rpc_list]
+        self._health_lock = Lock()
+        # When enabled, transactions are sent to the top two endpoints at once
+        self.hedge_sends = hedge_sends
+        self._send_executor = self._new_send_executor()
+        # Latest (blockhash, last_valid_block_height, fetched_at), kept fresh by a background thread
+        self._blockhash = None
+        self._blockhash_lock = Lock()
+        self._refresh_stop = threading.Event()
+        self._refresh_thread = None
+        self._probe_thread = None
         if self.logger:
             self.logger(f"[RotatingSolanaClient] Initialized with endpoints: {rpc_list}")
         else:
@@ -128,37 +203,203 @@ class RotatingSolanaClient:
         self.current = (self.current + 1) % len(self.clients)
         self._log(f"[RotatingSolanaClient] Rotating RPC endpoint from {self.rpc_list[prev]} to {self.rpc_list[self.current]}")
 
-    def _with_failover(self, func, *args, **kwargs):
+    def _ranked(self):
+        """Endpoint indexes ordered healthy-first, then by score."""
+        with self._health_lock:
+            return sorted(range(len(self.clients)), key=lambda i: (not self.health[i].healthy, self.health[i].score()))
+
+    def ranked_urls(self):
+        """Endpoint URLs in routing order, for calls made as raw JSON-RPC."""
+        return [self.rpc_list[i] for i in self._ranked()]
+
+    def _timed_call(self, index, func, *args, **kwargs):
+        """Runs func against one endpoint and feeds latency/errors into its health."""
+        started = time.perf_counter()
+        try:
+            result = func(self.clients[index], *args, **kwargs)
+        except Exception:
+            with self._health_lock:
+                self.health[index].record(error=True)
+            raise
+        with self._health_lock:
+            self.health[index].record(latency_ms=(time.perf_counter() - started) * 1000)
+        return result
+
+    def _with_failover(self, func, *args, log_calls=True, **kwargs):
         last_exc = None
-        for attempt in range(len(self.clients)):
-            client = self.clients[self.current]
-            url = self.rpc_list[self.current]
+        for attempt, index in enumerate(self._ranked()):
+            url = self.rpc_list[index]
             try:
-                self._log(f"[RotatingSolanaClient] Using endpoint: {url} (attempt {attempt+1})")
-                result = func(client, *args, **kwargs)
-                self._log(f"[RotatingSolanaClient] Success on endpoint: {url}")
+                if log_calls:
+                    self._log(f"[RotatingSolanaClient] Using endpoint: {url} (attempt {attempt+1})")
+                self.limiters[index].acquire()
+                result = self._timed_call(index, func, *args, **kwargs)
+                self.limiters[index].reward()
+                if log_calls:
+                    self._log(f"[RotatingSolanaClient] Success on endpoint: {url}")
+                self.current = index
                 return result
             except Exception as e:
-                self._log(f"[RotatingSolanaClient] Exception on endpoint {url}: {e}. Rotating...")
+                if "429" in str(e) or "Too Many Requests" in str(e):
+                    self.limiters[index].penalize()
+                self._log(f"[RotatingSolanaClient] Exception on endpoint {url}: {e}. Trying next endpoint...")
                 last_exc = e
-                self._rotate()
         self._log(f"[RotatingSolanaClient] All endpoints failed. Raising last exception.")
         if last_exc is not None:
             raise last_exc
         raise Exception("All RPC endpoints failed")
 
+    def _send_parallel(self, indexes, *args, send_only=False, **kwargs):
+        """
+        Sends the same signed bytes to several endpoints at once and returns the first
+        accepted response. With send_only=True the send-only endpoints are included too.
+        """
+        send = lambda c: c.send_raw_transaction(*args, **kwargs)
+        futures = {self._send_executor.submit(self._timed_call, i, send): self.rpc_list[i] for i in indexes}
+        if send_only:
+            for url, client in zip(self.send_only_list, self.send_only_clients):
+                futures[self._send_executor.submit(send, client)] = url
+        last_exc = None
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                resp = future.result()
+            except Exception as e:
+                self._log(f"[RotatingSolanaClient] Send failed on {url}: {e}")
+                last_exc = e
+                continue
+            if getattr(resp, 'value', None):
+                with self._send_lock:
+                    self.send_endpoints[str(resp.value)] = url
+                    while len(self.send_endpoints) > SEND_ENDPOINTS_MAX:
+                        self.send_endpoints.popitem(last=False)
+                    self.send_wins[url] = self.send_wins.get(url, 0) + 1
+                if url in self.rpc_list:
+                    self.current = self.rpc_list.index(url)
+                return resp
+        if last_exc is not None:
+            raise last_exc
+        raise Exception("No RPC endpoint accepted the transaction")
+
+    def broadcast_raw_transaction(self, *args, **kwargs):
+        """
+        Sends signed transaction bytes to every RPC endpoint and send-only endpoint at once.
+        Signed bytes are idempotent, so duplicate submissions are harmless; the first
+        accepted signature is returned; send_endpoint(signature) tells which endpoint it was.
+        """
+        self._log(f"[RotatingSolanaClient] Broadcasting raw transaction to {len(self.clients) + len(self.send_only_clients)} endpoints...")
+        return self._send_parallel(range(len(self.clients)), *args, send_only=True, **kwargs)
+
+    def send_endpoint(self, signature):
+        """Endpoint that first accepted the parallel send of signature, if it is still remembered."""
+        with self._send_lock:
+            return self.send_endpoints.get(str(signature))
+
+    def probe_endpoints(self):
+        """Measures every endpoint with a lightweight getSlot call and updates slot lag."""
+        slots = {}
+        for index in range(len(self.clients)):
+            try:
+                slots[index] = self._timed_call(index, lambda c: c.get_slot(commitment=Commitment(self.commitment))).value
+            except Exception as e:
+                self._log(f"[RotatingSolanaClient] Health probe failed for {self.rpc_list[index]}: {e}")
+        best_slot = max(slots.values(), default=None)
+        with self._health_lock:
+            for index, slot in slots.items():
+                self.health[index].slot = slot
+                self.health[index].slot_lag = best_slot - slot
+        self.current = self._ranked()[0]
+
+    def health_report(self):
+        with self._health_lock:
+            return [
+                {
+                    'url': h.url,
+                    'latency_ms': h.latency_ms,
+                    'error_rate': h.error_rate,
+                    'slot': h.slot,
+                    'slot_lag': h.slot_lag,
+                    'healthy': h.healthy,
+                }
+                for h in self.health
+            ]
+
+    def refresh_blockhash(self, log_calls=False):
+        """Fetches the latest blockhash into the cache and returns (blockhash, last_valid_block_height)."""
+        resp = self._with_failover(lambda c: c.get_latest_blockhash(commitment=Commitment(self.commitment)), log_calls=log_calls)
+        value = resp.value
+        with self._blockhash_lock:
+            self._blockhash = (value.blockhash, value.last_valid_block_height, time.time())
+        return value.blockhash, value.last_valid_block_height
+
+    def get_cached_blockhash(self, max_age=BLOCKHASH_MAX_AGE):
+        """
+        Returns (blockhash, last_valid_block_height) from the prefetch cache.
+        Only fetches synchronously when the cache is empty or older than max_age.
+        """
+        with self._blockhash_lock:
+            cached = self._blockhash
+        if cached is None or time.time() - cached[2] > max_age:
+            return self.refresh_blockhash(log_calls=True)
+        return cached[0], cached[1]
+
+    def invalidate_blockhash(self):
+        """Drops the cached blockhash, e.g. after a BlockhashNotFound error."""
+        with self._blockhash_lock:
+            self._blockhash = None
+
+    def _new_send_executor(self):
+        return ThreadPoolExecutor(max_workers=max(2, len(self.rpc_list) + len(self.send_only_list)), thread_name_prefix="rpc-send")
+
+    def start_background_refresh(self, interval=BLOCKHASH_REFRESH_INTERVAL, probe_interval=RPC_HEALTH_PROBE_INTERVAL):
+        """Starts the blockhash prefetch and endpoint health probe threads."""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        if self._refresh_stop.is_set():
+            # Restarted after stop_background_refresh(), which shut the send pool down
+            self._send_executor = self._new_send_executor()
+        self._refresh_stop.clear()
+
+        def refresh_loop():
+            while not self._refresh_stop.is_set():
+                try:
+                    self.refresh_blockhash()
+                except Exception as e:
+                    self._log(f"[RotatingSolanaClient] Background blockhash refresh failed: {e}")
+                self._refresh_stop.wait(interval)
+
+        def probe_loop():
+            while not self._refresh_stop.is_set():
+                self.probe_endpoints()
+                self._refresh_stop.wait(probe_interval)
+
+        self._refresh_thread = threading.Thread(target=refresh_loop, daemon=True)
+        self._refresh_thread.start()
+        self._probe_thread = threading.Thread(target=probe_loop, daemon=True)
+        self._probe_thread.start()
+
+    def stop_background_refresh(self):
+        """Stops the blockhash refresh and the parallel-send pool (called when the session stops)."""
+        self._refresh_stop.set()
+        self._send_executor.shutdown(wait=False, cancel_futures=True)
+
     def get_latest_blockhash(self, *args, **kwargs):
         self._log(f"[RotatingSolanaClient] Fetching latest blockhash...")
         return self._with_failover(lambda c: c.get_latest_blockhash(*args, **kwargs))
 
-    def send_raw_transaction(self, *args, **kwargs):
+    def send_raw_transaction(self, *args, hedge=None, **kwargs):
         self._log(f"[RotatingSolanaClient] Sending raw transaction...")
+        if (self.hedge_sends if hedge is None else hedge) and len(self.clients) > 1:
+            return self._send_parallel(self._ranked()[:2], *args, **kwargs)
         return self._with_failover(lambda c: c.send_raw_transaction(*args, **kwargs))
 
     def confirm_transaction(self, *args, **kwargs):
         self._log(f"[RotatingSolanaClient] Confirming transaction...")
         return self._with_failover(lambda c: c.confirm_transaction(*args, **kwargs))
 
+    def get_signature_statuses(self, *args, **kwargs):
+        return self._with_failover(lambda c: c.get_signature_statuses(*args, **kwargs))
+
     def get_account_info(self, *args, **kwargs):
         self._log(f"[RotatingSolanaClient] Fetching account info...")
         return self._with_failover(lambda c: c.get_account_info(*args, **kwargs))
@@ -180,6 +421,8 @@ class SniperSession:
     WATCHLIST_PRINT_INTERVAL = 180
     DEX_TOKEN_PROFILE_URL = "https://api.dexscreener.com/token-profiles/latest/v1"
     DEX_TOKEN_PAIRS_URL = "https://api.dexscreener.com/token-pairs/v1/solana/"
+    DEX_TOKENS_URL = "https://api.dexscreener.com/tokens/v1/solana/"
+    DEX_PAIR_URL = "https://api.dexscreener.com/pairs/solana/"
     LOG_FILE = "logs"
     LOG_BACKUP = "logs.old"
     open_positions_file = "open_positions.json"
@@ -187,23 +430,56 @@ class SniperSession:
     def __init__(self, log_callback=None, status_callback=None, **kwargs):
         self.lock = Lock()
         self.log_lock = Lock()
-        # Separate rate limiters for different APIs if needed
-        self.dexscreener_rate_limiter = RateLimiter(calls_per_second=1)
-        # Further reduced calls_per_second for CoinGecko to prevent 429 errors
-        self.coingecko_rate_limiter = RateLimiter(calls_per_second=1)
-        self.jupiter_rate_limiter = RateLimiter(calls_per_second=10) 
-
-        self.log_lines = []
+        # Shared token-bucket budgets per API (see sniper_http.API_BUDGETS); requests sent
+        # with api="<name>" are paced by them and 429s shrink them automatically
+        self.dexscreener_rate_limiter = sniper_http.get_limiter("dexscreener")
+        self.dexscreener_pairs_rate_limiter = sniper_http.get_limiter("dexscreener_pairs")
+        self.coingecko_rate_limiter = sniper_http.get_limiter("coingecko")
+        self.jupiter_rate_limiter = sniper_http.get_limiter("jupiter")
+
+        self.log_lines = sniper_log.LogBuffer(MAX_LOG_LINES)
+        # log() only enqueues; the GUI callback, the optional log file and the metrics
+        # run on the dispatcher thread, never on the polling or trade threads
+        self.log_metrics = sniper_log.LogMetrics()
+        self.log_dispatcher = sniper_log.LogDispatcher([self.log_metrics])
+        if kwargs.get("log_file"):
+            self.log_dispatcher.add_sink(sniper_log.FileSink(kwargs["log_file"], max_bytes=MAX_LOG_SIZE))
+        self.log_dispatcher.start()
+        # Filter passes and swap dumps are DEBUG and are not even formatted unless enabled
+        self.logger = sniper_log.Logger(self.log, level=kwargs.get("log_level", LOG_LEVEL), levels=kwargs.get("log_levels"))
         self.tokens = {}
-        self.seen_tokens = set()
+        # Every token key evaluated this session, oldest evicted first (see _profile_key)
+        self.seen_tokens = sniper_state.SeenIndex(MAX_SEEN_TOKENS, ttl=kwargs.get("seen_tokens_ttl", SEEN_TOKENS_TTL),
+                                                  path=kwargs.get("seen_tokens_file", SEEN_TOKENS_FILE))
+        # Key of the newest token-profiles entry from the previous poll
+        self.profile_cursor = None
+        # Profiles whose pair Dexscreener had not indexed when they appeared; retried on their own
+        # schedule (see poll_dexscreener) and counted as known while the feed is diffed
+        self.pending_profiles = sniper_state.PendingIndex(PENDING_MINT_MAX, PENDING_MINT_TTL)
+        # Pools seen on-chain that were not bought on chain-only numbers: mint -> (token, pool_data),
+        # re-evaluated once Dexscreener indexes the pair (see _recheck_pending_pools)
+        self.pending_pools = sniper_state.PendingIndex(PENDING_MINT_MAX, PENDING_MINT_TTL)
         self.trades = []
+        # Immutable snapshots of tokens/trades/PnL for the GUI; see publish_portfolio()
+        self.portfolio = sniper_portfolio.PortfolioPublisher()
         self.SIMULATION_MODE = kwargs.get("simulation", SIMULATION_MODE)
+        self.BROADCAST_SENDS = kwargs.get("broadcast_sends", BROADCAST_SENDS)
         self.RPC_URL = kwargs.get("rpc_url", RPC_LIST[0])
         self.STARTING_USD = STARTING_USD
         duration_minutes = kwargs.get("duration", 120)  # Default 120 minutes
         self.SIMULATION_DURATION = int(duration_minutes) * 60  # Always store as seconds
         self.BUY_FEE = BUY_FEE
         self.SELL_FEE = SELL_FEE
+        # Running PnL totals, updated as positions open, reprice and close
+        self.ledger = sniper_portfolio.PortfolioLedger(self.SELL_FEE)
+        # Append-only record of every buy, sell and price update; open positions are restored from it
+        self.journal = None
+        journal_file = kwargs.get("journal_file", TRADE_JOURNAL_FILE)
+        if journal_file:
+            try:
+                self.journal = sniper_journal.TradeJournal(journal_file)
+            except Exception as e:
+                self.log(f"[ERROR] Failed to open trade journal {journal_file}: {e}")
         self.POSITION_SIZE_USD = kwargs.get("position_size", kwargs.get("position_size_usd", POSITION_SIZE_USD))
         self.TAKE_PROFIT_PCT = kwargs.get("take_profit", 30)
         self.STOP_LOSS_PCT = kwargs.get("stop_loss", 15)
@@ -221,6 +497,8 @@ class SniperSession:
 
         # Save callbacks early so self.log() works even before the rest of __init__ finishes
         self.log_callback = log_callback
+        if log_callback:
+            self.log_dispatcher.add_sink(log_callback)
         self.status_callback = status_callback
 
         # By default, automatic initial filters (legacy) are OFF. They simply skip the
@@ -237,13 +515,21 @@ class SniperSession:
         if not self.SIMULATION_MODE:
             wallet_type = kwargs.get("wallet_type", WALLET_TYPE)
             if wallet_type == "private" or wallet_type == "seed":
-                self.client = RotatingSolanaClient(RPC_LIST, logger=self.log)
+                self.client = RotatingSolanaClient(RPC_LIST, logger=self.log, hedge_sends=kwargs.get("hedge_sends", False), send_only_list=SEND_ONLY_RPC_LIST)
             else:
                 self.client = Client(self.RPC_URL)
         self.stop_threads = False
         self.keypair = None
         self.wallet_address = "SIMULATION_WALLET"
         self.websocket_triggered_poll = False # Flag to indicate WS triggered a poll
+        # Programs followed by the log stream (keys of sniper_pools.POOL_LOG_PROGRAMS)
+        self.LOG_STREAM_PROGRAMS = kwargs.get("log_stream_programs", list(sniper_pools.POOL_LOG_PROGRAMS))
+        # A transaction is notified once per subscription and once per connection
+        self.recent_pool_signatures = OrderedDict()
+        self.WS_ENDPOINT_COUNT = kwargs.get("ws_endpoint_count", WS_ENDPOINT_COUNT)
+        # Per WebSocket URL: slots with no notifications across a reconnect, and whether it is connected
+        self.ws_missed_slots = {}
+        self.ws_connected = {}
 
         # Debug log for MIN_BUY_TX_RATIO at initialization
         self.log(f"[INIT DEBUG] MIN_BUY_TX_RATIO set to: {self.MIN_BUY_TX_RATIO}")
@@ -290,27 +576,44 @@ class SniperSession:
 
         self.sol_balance = None
         self.sol_usd = None
+        self.last_sol_usd = None
         self.start_time = None
         self.last_price_check = 0
         self.session_started = False
         self.token_volumes = {}
         self.watched_tokens = {}
         self.last_watchlist_print = time.time()
-        self.websocket_thread = None
+        self.loop_thread = None
         self.polling_thread = None
+        self.shutdown_thread = None
+        self.shutdown_done = threading.Event()
         self.last_summary_print = time.time()
         self.initial_balance_usd = None
         self.session_end_time = None
         
-        # Asyncio event loop and task for WebSockets
+        # One asyncio event loop per session owns the WebSocket listener, swaps and
+        # confirmations; it runs on self.loop_thread and is started on first use
         self.loop = asyncio.new_event_loop()
+        self.loop_lock = Lock()
         self.websocket_task = None
 
+        # Worker pool used to fan out Dexscreener pool lookups
+        self.enrich_executor = ThreadPoolExecutor(max_workers=DEX_ENRICH_WORKERS, thread_name_prefix="dex-enrich")
+
         self.execute_buy_token = sniper_trading.execute_buy_token.__get__(self)
         self.execute_sell_token = sniper_trading.execute_sell_token.__get__(self)
         self.try_sell = sniper_trading.SniperSession.try_sell.__get__(self)
 
-        self.buy_lock = threading.Lock()
+        # Trades run concurrently on their own pools: inflight_mints keeps a token from being
+        # traded twice at once and reserved_sol holds SOL committed to buys not yet confirmed.
+        # Exits get a separate pool so a burst of slow buys never delays a stop-loss.
+        self.trade_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_TRADES, thread_name_prefix="trade")
+        self.sell_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SELLS, thread_name_prefix="sell")
+        self.buy_lock = threading.Lock()  # Guards sol_balance and reserved_sol
+        self.trade_lock = threading.Lock()  # Guards inflight_mints and pending_sells
+        self.inflight_mints = set()
+        self.pending_sells = set()  # Mints with a sell check queued or running on sell_executor
+        self.reserved_sol = 0.0
         if not hasattr(self, 'sol_balance') or self.sol_balance is None:
             self.sol_balance = 0.0
         if not hasattr(self, 'sol_usd') or self.sol_usd is None:
@@ -318,14 +621,27 @@ class SniperSession:
             
         # Load any existing open positions
         self.load_open_positions()
+        self.publish_portfolio()
+        self.load_seen_tokens()
 
-    def simulate_buy(self, token, now, from_watchlist=False, force=False):
+    def simulate_buy(self, token, now, from_watchlist=False, force=False, pool_data=None):
         mint = token.get('mint') or token.get('address') or token.get('tokenAddress')
         if not mint:
             msg = "[ERROR] Buy: token address (mint) is None, cannot proceed."
             self.log(msg)
             return False, msg
-        pool_data = self.fetch_dexscreener_pool(mint)
+        if not sniper_trading.claim_mint(self, mint):
+            msg = f"[INFO] A trade for {mint} is already in flight, skipping duplicate buy."
+            self.log(msg)
+            return (False, msg) if force else False
+        try:
+            return self._simulate_buy_claimed(mint, token, now, force, pool_data)
+        finally:
+            sniper_trading.release_mint(self, mint)
+
+    def _simulate_buy_claimed(self, mint, token, now, force=False, pool_data=None):
+        if pool_data is None:
+            pool_data = self.fetch_dexscreener_pool(mint)
         if not pool_data:
             msg = f"[ERROR] Buy: Could not fetch pool data for {mint}. Cannot perform direct swap."
             self.log(msg)
@@ -367,104 +683,104 @@ class SniperSession:
             fee = buy_amount_usd * self.BUY_FEE
             net_amt = buy_amount_usd - fee
             sol_amount = buy_amount_usd / self.sol_usd
-            with self.buy_lock:
-                available_balance_usd = self.sol_balance * self.sol_usd
-                if available_balance_usd < self.POSITION_SIZE_USD:
-                    msg = f"❌ Not enough balance (${available_balance_usd:.2f} available, need ${self.POSITION_SIZE_USD:.2f})"
+            wallet_balance = None
+            if not self.SIMULATION_MODE:
+                wallet_balance = self.get_wallet_balance()
+                if wallet_balance <= 0:
+                    msg = "[ERROR] Manual buy: Wallet balance 0 SOL."
                     self.log(msg)
                     return False, msg
-                if not self.SIMULATION_MODE:
-                    wallet_balance = self.get_wallet_balance()
-                    if wallet_balance <= 0:
-                        msg = "[ERROR] Manual buy: Wallet balance 0 SOL."
-                        self.log(msg)
-                        return False, msg
-                    if sol_amount > wallet_balance:
-                        msg = f"[ERROR] Manual buy: Insufficient SOL balance (have {wallet_balance:.4f}, need {sol_amount:.4f})."
-                        self.log(msg)
-                        return False, msg
-                buy_result = asyncio.run(self.execute_buy_token(mint, sol_amount, pool_data))
+            if not sniper_trading.reserve_sol(self, sol_amount, wallet_balance):
+                available_balance_usd = (self.sol_balance - self.reserved_sol) * self.sol_usd
+                msg = f"❌ Not enough balance (${available_balance_usd:.2f} available after in-flight buys, need ${self.POSITION_SIZE_USD:.2f})"
+                self.log(msg)
+                return False, msg
+            ok, err = False, None
+            try:
+                buy_result = self.run_coroutine(self.execute_buy_token(mint, sol_amount, pool_data))
                 if isinstance(buy_result, tuple):
                     ok, err = buy_result
                 else:
                     ok, err = buy_result, None
-                if ok:
-                    self.log(f"[INFO] Manual buy executed: {sol_amount:.4f} SOL into {symbol}")
-                    if self.SIMULATION_MODE:
-                        self.sol_balance -= sol_amount
-                    self.tokens[mint] = {
-                        'address': mint,
-                        'name': name,
-                        'symbol': symbol,
-                        'bought_at': now,
-                        'amount_usd': net_amt,
-                        'amount_left_usd': net_amt,
-                        'amount_invested_usd': net_amt,  # <-- Add this line
-                        'buy_price_usd': buy_price,
-                        'sold': False,
-                        'sell_price_usd': None,
-                        'sell_time': None,
-                        'pnl': None
-                    }
-                    if pool_data:
-                        price = self.safe_float(pool_data.get('priceUsd'))
-                        self.tokens[mint]['price_usd'] = price
-                        self.tokens[mint]['priceUsd'] = price
-                    else:
-                        self.tokens[mint]['price_usd'] = buy_price
-                        self.tokens[mint]['priceUsd'] = buy_price
-                    self.seen_tokens.add(mint)
-                    if hasattr(self, 'watched_tokens'):
-                        self.watched_tokens.pop(mint, None)
-                    return True, None
+            finally:
+                sniper_trading.release_sol(self, sol_amount, spent=bool(ok))
+            if ok:
+                self.log(f"[INFO] Manual buy executed: {sol_amount:.4f} SOL into {symbol}")
+                self.tokens[mint] = {
+                    'address': mint,
+                    'name': name,
+                    'symbol': symbol,
+                    'bought_at': now,
+                    'amount_usd': net_amt,
+                    'amount_left_usd': net_amt,
+                    'amount_invested_usd': net_amt,  # <-- Add this line
+                    'buy_price_usd': buy_price,
+                    'sold': False,
+                    'sell_price_usd': None,
+                    'sell_time': None,
+                    'pnl': None
+                }
+                if pool_data:
+                    price = self.safe_float(pool_data.get('priceUsd'))
+                    self.tokens[mint]['price_usd'] = price
+                    self.tokens[mint]['priceUsd'] = price
                 else:
-                    return False, err or "Manual buy failed for unknown reason."
-            return False, "Manual buy failed for unknown reason."
+                    self.tokens[mint]['price_usd'] = buy_price
+                    self.tokens[mint]['priceUsd'] = buy_price
+                self.ledger.update_position(self.tokens[mint])
+                self.write_journal("record_buy", self.tokens[mint])
+                self.seen_tokens.add(mint)
+                if hasattr(self, 'watched_tokens'):
+                    self.watched_tokens.pop(mint, None)
+                self.publish_portfolio()
+                return True, None
+            else:
+                return False, err or "Manual buy failed for unknown reason."
         # Automated buy: apply all filters
-        self.log(f"[DEBUG BUY FILTER] Checking filters for {name} ({symbol}) - Mint: {mint}")
+        self.logger.info("FILTER", "[DEBUG BUY FILTER] Checking filters for {} ({}) - Mint: {}", name, symbol, mint)
         buy_price = self.safe_float(token.get('price_usd'))
         if buy_price == 0:
-            self.log(f"❌ [FILTER FAILED] No price data (price_usd=0) for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] No price data (price_usd=0) for {} ({})", name, symbol)
             return False
         if buy_price > self.MAX_PRICE_USD:
-            self.log(f"❌ [FILTER FAILED] Price ${buy_price:.8f} > Max ${self.MAX_PRICE_USD:.8f} for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Price ${:.8f} > Max ${:.8f} for {} ({})", buy_price, self.MAX_PRICE_USD, name, symbol)
             return False
         else:
-            self.log(f"[FILTER PASS] Price ${buy_price:.8f} ≤ Max ${self.MAX_PRICE_USD:.8f}")
+            self.logger.debug("FILTER", "[FILTER PASS] Price ${:.8f} ≤ Max ${:.8f}", buy_price, self.MAX_PRICE_USD)
         liquidity = self.safe_float(token.get('liquidity_usd'))
         if liquidity < self.MIN_LIQUIDITY_USD:
-            self.log(f"❌ [FILTER FAILED] Low liquidity (${liquidity:.2f} < ${self.MIN_LIQUIDITY_USD:.2f}) for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Low liquidity (${:.2f} < ${:.2f}) for {} ({})", liquidity, self.MIN_LIQUIDITY_USD, name, symbol)
             return False
         else:
-            self.log(f"[FILTER PASS] Liquidity ${liquidity:,.2f} ≥ Min ${self.MIN_LIQUIDITY_USD:,.2f}")
+            self.logger.debug("FILTER", "[FILTER PASS] Liquidity ${:,.2f} ≥ Min ${:,.2f}", liquidity, self.MIN_LIQUIDITY_USD)
         volume_5m = self.safe_float(token.get('volume_m5'))
         if volume_5m < self.MIN_VOLUME_5M_USD:
-            self.log(f"❌ [FILTER FAILED] Low 5m volume (${volume_5m:.2f} < ${self.MIN_VOLUME_5M_USD:.2f}) for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Low 5m volume (${:.2f} < ${:.2f}) for {} ({})", volume_5m, self.MIN_VOLUME_5M_USD, name, symbol)
             return False
         else:
-            self.log(f"[FILTER PASS] 5m Volume ${volume_5m:,.2f} ≥ Min ${self.MIN_VOLUME_5M_USD:,.2f}")
+            self.logger.debug("FILTER", "[FILTER PASS] 5m Volume ${:,.2f} ≥ Min ${:,.2f}", volume_5m, self.MIN_VOLUME_5M_USD)
         buys_5m = self.safe_float(token.get('txns_m5_buys'))
         sells_5m = self.safe_float(token.get('txns_m5_sells'))
         buy_sell_ratio = buys_5m / sells_5m if sells_5m > 0 else float('inf')
         if buys_5m < self.MIN_BUYS_5M:
-            self.log(f"❌ [FILTER FAILED] Not enough 5m buys ({buys_5m} < {self.MIN_BUYS_5M}) for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Not enough 5m buys ({} < {}) for {} ({})", buys_5m, self.MIN_BUYS_5M, name, symbol)
             return False
         else:
-            self.log(f"[FILTER PASS] 5m Buys {buys_5m} ≥ Min {self.MIN_BUYS_5M}")
+            self.logger.debug("FILTER", "[FILTER PASS] 5m Buys {} ≥ Min {}", buys_5m, self.MIN_BUYS_5M)
         if sells_5m > 0 and buy_sell_ratio < self.MIN_BUY_TX_RATIO:
-            self.log(f"❌ [FILTER FAILED] Low buy/sell ratio ({buy_sell_ratio:.2f} < {self.MIN_BUY_TX_RATIO:.2f}) for {name} ({symbol}) (Buys: {buys_5m}, Sells: {sells_5m})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Low buy/sell ratio ({:.2f} < {:.2f}) for {} ({}) (Buys: {}, Sells: {})", buy_sell_ratio, self.MIN_BUY_TX_RATIO, name, symbol, buys_5m, sells_5m)
             return False
         else:
-            self.log(f"[FILTER PASS] Buy/Sell Ratio {buy_sell_ratio:.2f} ≥ Min {self.MIN_BUY_TX_RATIO:.2f}")
+            self.logger.debug("FILTER", "[FILTER PASS] Buy/Sell Ratio {:.2f} ≥ Min {:.2f}", buy_sell_ratio, self.MIN_BUY_TX_RATIO)
         pair_created_at = self.safe_float(token.get('pairCreatedAt', 0)) / 1000
         pair_age = now - pair_created_at
         if pair_age < self.MIN_PAIR_AGE_SECONDS:
-            self.log(f"❌ [FILTER FAILED] Too new ({int(pair_age)}s < {self.MIN_PAIR_AGE_SECONDS}s) for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Too new ({}s < {}s) for {} ({})", int(pair_age), self.MIN_PAIR_AGE_SECONDS, name, symbol)
             return False
         else:
-            self.log(f"[FILTER PASS] Pair Age {int(pair_age)}s ≥ Min {self.MIN_PAIR_AGE_SECONDS}s")
+            self.logger.debug("FILTER", "[FILTER PASS] Pair Age {}s ≥ Min {}s", int(pair_age), self.MIN_PAIR_AGE_SECONDS)
         if pair_age > self.MAX_PAIR_AGE_SECONDS:
-            self.log(f"❌ [FILTER FAILED] Too old ({int(pair_age)}s > {self.MAX_PAIR_AGE_SECONDS}s) for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Too old ({}s > {}s) for {} ({})", int(pair_age), self.MAX_PAIR_AGE_SECONDS, name, symbol)
             return False
         total_supply = token.get('totalSupply')
         try:
@@ -476,7 +792,7 @@ class SniperSession:
         except (TypeError, ValueError):
             buy_price_val = 0.0
         market_cap = total_supply * buy_price_val
-        self.log(f"[DEBUG BUY FILTER] Market Cap: ${market_cap:,.2f}")
+        self.logger.debug("FILTER", "[DEBUG BUY FILTER] Market Cap: ${:,.2f}", market_cap)
         settings = getattr(self, 'settings', {}) if hasattr(self, 'settings') else {}
         require_socials = settings.get('require_socials', False)
         min_percent_burned = settings.get('min_percent_burned', 0)
@@ -485,36 +801,36 @@ class SniperSession:
         block_risky_wallets = settings.get('block_risky_wallets', False)
         if require_socials:
             if not has_required_socials(token):
-                self.log(f"❌ [FILTER FAILED] No socials found for {name} ({symbol})")
+                self.logger.info("FILTER", "❌ [FILTER FAILED] No socials found for {} ({})", name, symbol)
                 return False
             else:
-                self.log(f"[FILTER PASS] Socials found for {name} ({symbol})")
+                self.logger.debug("FILTER", "[FILTER PASS] Socials found for {} ({})", name, symbol)
         if min_percent_burned > 0:
             percent_burned = get_burn_percent(mint, total_supply)
             if percent_burned < min_percent_burned:
-                self.log(f"❌ [FILTER FAILED] Only {percent_burned:.2f}% burned < Min {min_percent_burned}% for {name} ({symbol})")
+                self.logger.info("FILTER", "❌ [FILTER FAILED] Only {:.2f}% burned < Min {}% for {} ({})", percent_burned, min_percent_burned, name, symbol)
                 return False
             else:
-                self.log(f"[FILTER PASS] {percent_burned:.2f}% burned ≥ Min {min_percent_burned}% for {name} ({symbol})")
+                self.logger.debug("FILTER", "[FILTER PASS] {:.2f}% burned ≥ Min {}% for {} ({})", percent_burned, min_percent_burned, name, symbol)
         if require_immutable:
             if not is_immutable_metadata(mint):
-                self.log(f"❌ [FILTER FAILED] Metadata is mutable for {name} ({symbol})")
+                self.logger.info("FILTER", "❌ [FILTER FAILED] Metadata is mutable for {} ({})", name, symbol)
                 return False
             else:
-                self.log(f"[FILTER PASS] Metadata is immutable for {name} ({symbol})")
+                self.logger.debug("FILTER", "[FILTER PASS] Metadata is immutable for {} ({})", name, symbol)
         if max_percent_top_holders < 100:
             percent_top = get_top_holders_percent(mint, total_supply, top_n=5)
             if percent_top > max_percent_top_holders:
-                self.log(f"❌ [FILTER FAILED] Top 5 holders own {percent_top:.2f}% > Max {max_percent_top_holders}% for {name} ({symbol})")
+                self.logger.info("FILTER", "❌ [FILTER FAILED] Top 5 holders own {:.2f}% > Max {}% for {} ({})", percent_top, max_percent_top_holders, name, symbol)
                 return False
             else:
-                self.log(f"[FILTER PASS] Top 5 holders own {percent_top:.2f}% ≤ Max {max_percent_top_holders}% for {name} ({symbol})")
+                self.logger.debug("FILTER", "[FILTER PASS] Top 5 holders own {:.2f}% ≤ Max {}% for {} ({})", percent_top, max_percent_top_holders, name, symbol)
         if block_risky_wallets:
             if has_risky_wallet(mint):
-                self.log(f"❌ [FILTER FAILED] Risky wallet detected in top holders for {name} ({symbol})")
+                self.logger.info("FILTER", "❌ [FILTER FAILED] Risky wallet detected in top holders for {} ({})", name, symbol)
                 return False
             else:
-                self.log(f"[FILTER PASS] No risky wallets in top holders for {name} ({symbol})")
+                self.logger.debug("FILTER", "[FILTER PASS] No risky wallets in top holders for {} ({})", name, symbol)
         self.log("\n✨ ALL CHECKS PASSED - BUYING ✨")
         self.log(f"Token: {name} ({symbol})")
         self.log(f"Address: {mint}")
@@ -529,90 +845,197 @@ class SniperSession:
         fee = buy_amount_usd * self.BUY_FEE
         net_amt = buy_amount_usd - fee
         sol_amount = buy_amount_usd / self.sol_usd
-        with self.buy_lock:
-            available_balance_usd = self.sol_balance * self.sol_usd
-            if available_balance_usd < self.POSITION_SIZE_USD:
-                self.log(f"❌ Not enough balance (${available_balance_usd:.2f} available, need ${self.POSITION_SIZE_USD:.2f})")
+        wallet_balance = None
+        if not self.SIMULATION_MODE:
+            wallet_balance = self.get_wallet_balance()
+            if wallet_balance <= 0:
+                self.log("[ERROR] Buy: Wallet balance 0 SOL.")
                 return False
-            if not self.SIMULATION_MODE:
-                wallet_balance = self.get_wallet_balance()
-                if wallet_balance <= 0:
-                    self.log("[ERROR] Buy: Wallet balance 0 SOL.")
-                    return False
-                if sol_amount > wallet_balance:
-                    self.log(f"[ERROR] Buy: Insufficient SOL balance (have {wallet_balance:.4f}, need {sol_amount:.4f}).")
-                    return False
-            if asyncio.run(self.execute_buy_token(mint, sol_amount, pool_data)):
-                self.log(f"[INFO] Buy executed: {sol_amount:.4f} SOL into {symbol}")
-                if self.SIMULATION_MODE:
-                    self.sol_balance -= sol_amount
-                self.tokens[mint] = {
-                    'address': mint,
-                    'name': name,
-                    'symbol': symbol,
-                    'bought_at': now,
-                    'amount_usd': net_amt,
-                    'amount_left_usd': net_amt,
-                    'amount_invested_usd': net_amt,  # <-- Add this line
-                    'buy_price_usd': buy_price,
-                    'sold': False,
-                    'sell_price_usd': None,
-                    'sell_time': None,
-                    'pnl': None
-                }
-                if pool_data:
-                    price = self.safe_float(pool_data.get('priceUsd'))
-                    self.tokens[mint]['price_usd'] = price
-                    self.tokens[mint]['priceUsd'] = price
-                else:
-                    self.tokens[mint]['price_usd'] = buy_price
-                    self.tokens[mint]['priceUsd'] = buy_price
-                self.seen_tokens.add(mint)
-                if hasattr(self, 'watched_tokens'):
-                    self.watched_tokens.pop(mint, None)
-                return True
+        if not sniper_trading.reserve_sol(self, sol_amount, wallet_balance):
+            available_balance_usd = (self.sol_balance - self.reserved_sol) * self.sol_usd
+            self.log(f"❌ Not enough balance (${available_balance_usd:.2f} available after in-flight buys, need ${self.POSITION_SIZE_USD:.2f})")
+            return False
+        bought = False
+        try:
+            bought = self.run_coroutine(self.execute_buy_token(mint, sol_amount, pool_data))
+        finally:
+            sniper_trading.release_sol(self, sol_amount, spent=bool(bought))
+        if bought:
+            self.log(f"[INFO] Buy executed: {sol_amount:.4f} SOL into {symbol}")
+            self.tokens[mint] = {
+                'address': mint,
+                'name': name,
+                'symbol': symbol,
+                'bought_at': now,
+                'amount_usd': net_amt,
+                'amount_left_usd': net_amt,
+                'amount_invested_usd': net_amt,  # <-- Add this line
+                'buy_price_usd': buy_price,
+                'sold': False,
+                'sell_price_usd': None,
+                'sell_time': None,
+                'pnl': None
+            }
+            if pool_data:
+                price = self.safe_float(pool_data.get('priceUsd'))
+                self.tokens[mint]['price_usd'] = price
+                self.tokens[mint]['priceUsd'] = price
+            else:
+                self.tokens[mint]['price_usd'] = buy_price
+                self.tokens[mint]['priceUsd'] = buy_price
+            self.ledger.update_position(self.tokens[mint])
+            self.write_journal("record_buy", self.tokens[mint])
+            self.seen_tokens.add(mint)
+            if hasattr(self, 'watched_tokens'):
+                self.watched_tokens.pop(mint, None)
+            self.publish_portfolio()
+            return True
         return False
 
     def log(self, line):
-        if self.log_callback:
-            self.log_callback(line)
-        # File logging disabled
         self.log_lines.append(line)
-        self.cleanup_collections()
+        self.log_dispatcher.submit(line)
 
     def update_status(self, status):
         if self.status_callback:
             self.status_callback(status)
 
     def stop(self):
+        """
+        Signals every worker to stop and returns at once; the slow part (draining trades,
+        tearing down the event loop, closing the journal) runs on a "session-shutdown"
+        thread. Poll shutdown_complete() or wait on shutdown_done to know when it is over.
+        """
+        if self.shutdown_thread is not None:
+            return
         self.stop_threads = True
         self.log("[INFO] Stopping bot and cleaning up...")
-        # Cancel all pending asyncio tasks before closing the loop
-        if hasattr(self, 'loop') and self.loop and self.loop.is_running():
-            import asyncio
-            tasks = [t for t in asyncio.all_tasks(self.loop) if not t.done()]
-            for task in tasks:
-                task.cancel()
-            self.loop.call_soon_threadsafe(self.loop.stop)
         self.update_status("Stopped")
+        self.enrich_executor.shutdown(wait=False, cancel_futures=True)
+        # Queued trades are dropped; running ones get a moment to confirm and be journaled
+        # while the event loop is still up (see _shutdown)
+        self.trade_executor.shutdown(wait=False, cancel_futures=True)
+        self.sell_executor.shutdown(wait=False, cancel_futures=True)
+        self.shutdown_thread = threading.Thread(target=self._shutdown, daemon=True, name="session-shutdown")
+        self.shutdown_thread.start()
+
+    def shutdown_complete(self):
+        """True once stop() has been called and its background teardown has finished."""
+        return self.shutdown_done.is_set()
+
+    def _shutdown(self):
+        """
+        Background half of stop(). Running trades get TRADE_DRAIN_TIMEOUT to finish;
+        whatever outlives it is cancelled with the event loop, the journal is closed
+        once the last trade has returned, and the log dispatcher is closed last.
+        """
+        try:
+            drain = threading.Thread(target=self._drain_trades_and_close_journal, daemon=True, name="trade-drain")
+            drain.start()
+            drain.join(TRADE_DRAIN_TIMEOUT)
+            if drain.is_alive():
+                self.log(f"[WARNING] Trades still in flight after {TRADE_DRAIN_TIMEOUT:.0f}s; cancelling them with the event loop.")
+            self.save_seen_tokens()
+            if isinstance(self.client, RotatingSolanaClient):
+                self.client.stop_background_refresh()
+
+            # Cancel the WebSocket listener, then stop the session loop; its thread
+            # cancels whatever is still pending before closing the loop
+            if getattr(self, 'websocket_task', None):
+                self.websocket_task.cancel()
+            with self.loop_lock:
+                if self.loop and self.loop.is_running():
+                    self.loop.call_soon_threadsafe(self.loop.stop)
+                loop_thread = self.loop_thread
+            if loop_thread and loop_thread is not threading.current_thread():
+                loop_thread.join(timeout=2)
+            drain.join(timeout=2)
+        except Exception as e:
+            self.log(f"[ERROR] Session shutdown failed: {e}")
+        finally:
+            # Joins the log worker here rather than on the GUI thread; lines logged
+            # after this are delivered on the calling thread
+            self.log_dispatcher.close()
+            self.shutdown_done.set()
+
+    def submit_trade(self, func, *args, **kwargs):
+        """Runs a buy on the trade pool so a slow swap never holds up the next qualifying token."""
+        def run():
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                self.log(f"[ERROR] Trade task {getattr(func, '__name__', func)} failed: {e}")
+                return False
+        return self.trade_executor.submit(run)
 
-        # Cancel websocket task if it exists and loop is running
-        if getattr(self, 'websocket_task', None) and self.loop and self.loop.is_running():
-            self.loop.call_soon_threadsafe(self.websocket_task.cancel)
-
-        time.sleep(0.2)
+    def submit_sell(self, token, now):
+        """
+        Queues a take-profit/stop-loss check for token on the sell pool. Skipped (returns None)
+        while a check for the same mint is still queued or a trade for it is in flight.
+        """
+        mint = token.get('address')
+        with self.trade_lock:
+            if mint in self.pending_sells or mint in self.inflight_mints:
+                return None
+            self.pending_sells.add(mint)
 
-        # Gracefully stop the event-loop only if it is still running
-        if self.loop and self.loop.is_running():
-            self.loop.call_soon_threadsafe(self.loop.stop)
+        def run():
             try:
-                fut = asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), self.loop)
-                fut.result(timeout=1)
-            except (asyncio.TimeoutError, RuntimeError):
-                # Loop already stopped / cancelled – safe to ignore
-                pass
-            except asyncio.CancelledError:
-                self.log("Background task was cancelled cleanly.")
+                return self.try_sell(token, now)
+            except Exception as e:
+                self.log(f"[ERROR] Sell task for {mint} failed: {e}")
+                return False
+            finally:
+                with self.trade_lock:
+                    self.pending_sells.discard(mint)
+        try:
+            return self.sell_executor.submit(run)
+        except RuntimeError:
+            # Pool already shut down by stop()
+            with self.trade_lock:
+                self.pending_sells.discard(mint)
+            return None
+
+    def _ensure_loop(self):
+        """Starts the session event loop thread if it is not running yet and returns the loop."""
+        with self.loop_lock:
+            if self.loop_thread and self.loop_thread.is_alive():
+                return self.loop
+            if self.loop.is_closed():
+                self.loop = asyncio.new_event_loop()
+            loop = self.loop
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                try:
+                    loop.run_forever()
+                except Exception as e:
+                    self.log(f"Event loop encountered error: {e}")
+                finally:
+                    pending_tasks = asyncio.all_tasks(loop)
+                    for task in pending_tasks:
+                        task.cancel()
+                    loop.run_until_complete(asyncio.gather(*pending_tasks, return_exceptions=True))
+                    loop.close()
+                    self.log("Event loop closed.")
+
+            self.loop_thread = threading.Thread(target=run_loop, daemon=True, name="session-loop")
+            self.loop_thread.start()
+            return loop
+
+    def submit_coroutine(self, coro):
+        """
+        Schedules a coroutine on the session loop from any thread (GUI, poller, price checks)
+        and returns a concurrent.futures.Future for its result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run_coroutine(self, coro, timeout=None):
+        """Runs a coroutine on the session loop and blocks the calling thread until it finishes."""
+        if threading.current_thread() is self.loop_thread:
+            coro.close()
+            raise RuntimeError("run_coroutine() called from the event loop thread; await the coroutine instead")
+        return self.submit_coroutine(coro).result(timeout)
 
     def run(self):
         self.update_status("Running")
@@ -637,6 +1060,12 @@ class SniperSession:
             self.update_status("Error")
             return
         self.initial_balance_usd = self.sol_balance * self.sol_usd
+        self.publish_portfolio()
+        self.write_journal("record_event", "session_start", {
+            'initial_balance_usd': self.initial_balance_usd,
+            'wallet_address': self.wallet_address,
+            'simulation': self.SIMULATION_MODE,
+        })
         self.log(f"\nWallet Address: {self.wallet_address}")
         self.log(f"Starting Balance: {self.sol_balance:.4f} SOL (${self.initial_balance_usd:.2f} USD)")
         self.log(f"SOL Price: ${self.sol_usd:.2f}")
@@ -644,6 +1073,8 @@ class SniperSession:
         self.log("="*self.TERMINAL_WIDTH)
         self.start_time = time.time()
         self.session_end_time = self.start_time + self.SIMULATION_DURATION
+        if isinstance(self.client, RotatingSolanaClient):
+            self.client.start_background_refresh()
         self.start_streams()
 
         last_status = 0
@@ -661,28 +1092,37 @@ class SniperSession:
                 else:
                     self.log("[DEBUG] Failed to update SOL price.")
 
-                for token in list(self.tokens.values()):
-                    if not token['sold']:
-                        address = token.get('address')
-                        if not address:
-                            self.log("[ERROR] Skipping price update: token address is None for an open position.")
-                            continue
-                        pool_data = self.fetch_dexscreener_pool(address)
-                        if pool_data:
-                            token['price_usd'] = self.safe_float(pool_data.get('priceUsd'))
-                            token['priceUsd'] = token['price_usd']
-                            self.log(f"[DEBUG] Updated price for {token.get('symbol', 'N/A')}: ${token['price_usd']:.8f}")
-                            self.try_sell(token, now)
-                        else:
-                            self.log(f"[WARNING] Could not fetch latest pool data for open position {token.get('symbol', 'N/A')}.")
+                open_tokens = [t for t in list(self.tokens.values()) if not t['sold']]
+                pools = self.fetch_dexscreener_pools([t.get('address') for t in open_tokens if t.get('address')])
+                priced = []
+                for token in open_tokens:
+                    address = token.get('address')
+                    if not address:
+                        self.log("[ERROR] Skipping price update: token address is None for an open position.")
+                        continue
+                    pool_data = pools.get(address)
+                    if pool_data:
+                        token['price_usd'] = self.safe_float(pool_data.get('priceUsd'))
+                        token['priceUsd'] = token['price_usd']
+                        self.ledger.update_position(token)
+                        priced.append((address, token['price_usd']))
+                        self.log(f"[DEBUG] Updated price for {token.get('symbol', 'N/A')}: ${token['price_usd']:.8f}")
+                        self.submit_sell(token, now)
+                    else:
+                        self.log(f"[WARNING] Could not fetch latest pool data for open position {token.get('symbol', 'N/A')}.")
+                self.write_journal("record_prices", priced)
+                self.publish_portfolio()
                 last_price_check = now
             if now - last_status >= self.SUMMARY_INTERVAL:
                 self.print_status()
+                self.save_seen_tokens()
+                self.cleanup_collections()
                 last_status = now
             time.sleep(0.1)
         self.stop_threads = True
         self.print_final_stats()
         self.update_status("Stopped")
+        self.log_dispatcher.close()
 
     def print_header(self, text):
         line = "\n" + "="*self.TERMINAL_WIDTH + "\n"
@@ -692,26 +1132,37 @@ class SniperSession:
 
     def cleanup_collections(self):
         with self.lock:
-            if len(self.seen_tokens) > MAX_SEEN_TOKENS:
-                self.seen_tokens = set(list(self.seen_tokens)[-MAX_SEEN_TOKENS:])
             if len(self.trades) > MAX_TRADES_HISTORY:
                 self.trades = self.trades[-MAX_TRADES_HISTORY:]
-            if len(self.log_lines) > MAX_LOG_LINES:
-                self.log_lines = self.log_lines[-MAX_LOG_LINES:]
 
     def fetch_sol_usd(self):
-        """Fetch SOL/USD price with proper error handling"""
+        """
+        Fetch SOL/USD price with proper error handling. CoinGecko is retried by the shared
+        RetryPolicy; if it still fails, the WSOL pair on Dexscreener is used, and failing
+        that the last price fetched this session.
+        """
         try:
-            self.coingecko_rate_limiter.wait()
-            resp = requests.get(self.COINGECKO_SOL, timeout=5)
+            resp = sniper_http.get(self.COINGECKO_SOL, api="coingecko", timeout=5)
             resp.raise_for_status()
-            price = float(resp.json()["solana"]["usd"])
+            price = float(sniper_codec.response_json(resp)["solana"]["usd"])
             if price <= 0:
                 raise ValueError("Invalid SOL price")
+            self.last_sol_usd = price
             return price
-        except (requests.RequestException, KeyError, ValueError) as e:
+        except (sniper_http.HTTPError, KeyError, ValueError) as e:
             self.log(f"Error fetching SOL price: {e}")
-            return None
+        try:
+            pair = (self._fetch_dexscreener_batch([str(WRAPPED_SOL_MINT)]) or {}).get(str(WRAPPED_SOL_MINT))
+            price = self.safe_float(pair.get('priceUsd')) if pair and (pair.get('baseToken') or {}).get('address') == str(WRAPPED_SOL_MINT) else 0
+            if price > 0:
+                self.log(f"[INFO] Using Dexscreener SOL price ${price:.2f} (CoinGecko unavailable)")
+                self.last_sol_usd = price
+                return price
+        except (sniper_http.HTTPError, ValueError) as e:
+            self.log(f"Error fetching SOL price from Dexscreener: {e}")
+        if self.last_sol_usd:
+            self.log(f"[WARNING] Using last known SOL price ${self.last_sol_usd:.2f}")
+        return self.last_sol_usd
 
     def get_wallet_balance(self) -> float:
         if self.SIMULATION_MODE:
@@ -750,23 +1201,19 @@ class SniperSession:
             return 0.0
 
     def calculate_total_pnl(self):
-        realized_pnl = 0
-        unrealized_pnl = 0
-        for trade in self.trades:
-            realized_pnl += self.safe_float(trade.get('pnl', 0))
-        for token in self.tokens.values():
-            if not token['sold']:
-                buy_price = self.safe_float(token.get('buy_price_usd'))
-                cur_price = self.safe_float(token.get('price_usd'))
-                amount_left_usd = self.safe_float(token.get('amount_left_usd'))
-                if buy_price > 0 and cur_price > 0 and amount_left_usd > 0:
-                    tokens_amount = amount_left_usd / buy_price
-                    current_value = tokens_amount * cur_price
-                    current_value *= (1 - self.SELL_FEE)
-                    position_pnl = current_value - amount_left_usd
-                    unrealized_pnl += position_pnl
-        total_pnl = realized_pnl + unrealized_pnl
-        return realized_pnl, unrealized_pnl, total_pnl
+        """(realized, unrealized, total) PnL in USD, kept current by self.ledger rather than recomputed."""
+        return self.ledger.totals()
+
+    def publish_portfolio(self):
+        """
+        Publishes an immutable, versioned snapshot of open positions, closed trades and PnL
+        (self.portfolio.snapshot). Called after buys, sells and price passes so readers on
+        other threads never iterate self.tokens or self.trades themselves.
+        """
+        with self.lock:
+            tokens = list(self.tokens.values())
+            trades = list(self.trades)
+        return self.portfolio.publish(tokens, trades, self.ledger, self.initial_balance_usd)
 
     def _get_token_decimals_from_chain(self, mint_address: str) -> Optional[int]:
         """
@@ -780,7 +1227,6 @@ class SniperSession:
             else:
                 return None
             account_info = self.client.get_account_info(mint_pubkey, commitment=Commitment.confirmed) if self.client is not None else None
-            recent_blockhash = self.client.get_latest_blockhash(commitment=Commitment.confirmed).value.blockhash if self.client is not None else None
 
             if account_info is None or account_info.value is None:
                 self.log(f"❌ Failed to get account info for mint: {mint_address}")
@@ -805,7 +1251,6 @@ class SniperSession:
         Amount must be in atomic units (lamports for SOL, token_amount * 10^decimals for SPL tokens).
         """
         try:
-            self.jupiter_rate_limiter.wait()
             url = JUPITER_QUOTE_API
             params = {
                 "inputMint": input_mint,
@@ -816,12 +1261,12 @@ class SniperSession:
                 # Bypass Jupiter's new token restrictions by not filtering for age, and not using blocklists
                 # Optionally, you could add 'enforceSingleTx': 'false' to try to force a route
             }
-            response = requests.get(url, params=params, timeout=10)
+            response = sniper_http.get(url, api="jupiter", retry=sniper_http.TRADE_RETRY, params=params, timeout=10)
             self.log(f"[JUPITER] Quote request URL: {response.url}")
             if response.status_code != 200:
                 self.log(f"❌ Jupiter quote failed with status {response.status_code}. Response: {response.text}")
                 return None
-            data = response.json()
+            data = sniper_codec.response_json(response)
             self.log(f"[JUPITER] Quote response: {json.dumps(data)[:500]}")
             # Jupiter may restrict new tokens by not returning a routePlan or by returning an error
             if not data or 'routePlan' not in data:
@@ -829,7 +1274,7 @@ class SniperSession:
                 # Bypass: If Jupiter blocks, still return the data for further attempts
                 return data if data else None
             return data
-        except requests.exceptions.RequestException as e:
+        except sniper_http.HTTPError as e:
             self.log(f"❌ Jupiter quote network error: {e}")
             return None
         except json.JSONDecodeError as e:
@@ -844,7 +1289,6 @@ class SniperSession:
         Requests Jupiter to build a serialized swap transaction from a quote.
         """
         try:
-            self.jupiter_rate_limiter.wait()
             url = JUPITER_SWAP_API
             headers = {"Content-Type": "application/json"}
             payload = {
@@ -856,18 +1300,18 @@ class SniperSession:
                 "prioritizationFeeLamports": DEFAULT_PRIORITIZATION_FEE_LAMPORTS_PER_CU,
             }
             self.log(f"[JUPITER] Swap payload: {json.dumps(payload)[:500]}")
-            response = requests.post(url, headers=headers, json=payload, timeout=20)
+            response = sniper_http.post(url, api="jupiter", retry=sniper_http.TRADE_RETRY, headers=headers, json=payload, timeout=20)
             if response.status_code != 200:
                 self.log(f"❌ Jupiter swap transaction build failed with status {response.status_code}. Response: {response.text}")
                 return None
-            data = response.json()
+            data = sniper_codec.response_json(response)
             self.log(f"[JUPITER] Swap response: {json.dumps(data)[:500]}")
             if not data or 'swapTransaction' not in data:
                 self.log(f"❌ Jupiter swap transaction build failed: {data.get('error', 'No swapTransaction in response')}. Full response: {json.dumps(data)}")
                 return None
             raw_transaction_bytes = base64.b64decode(data['swapTransaction'])
             return raw_transaction_bytes
-        except requests.exceptions.RequestException as e:
+        except sniper_http.HTTPError as e:
             self.log(f"❌ Jupiter swap transaction network error: {e}")
             return None
         except json.JSONDecodeError as e:
@@ -895,7 +1339,7 @@ class SniperSession:
                 if self.client is None:
                     self.log(f"[ERROR] No client available for get_account_info.")
                     return None
-                account_info = self.client.get_account_info(ata)
+                account_info = await asyncio.to_thread(self.client.get_account_info, ata)
                 if account_info and account_info.value:
                     self.log(f"[DEBUG] ATA exists for {mint}")
                     return ata
@@ -934,9 +1378,8 @@ class SniperSession:
                     if self.client is None:
                         self.log_event(f"[ATA] No client available for blockhash fetch.")
                         return None
-                    self.log_event(f"[ATA] Attempt {attempt+1}: Fetching fresh blockhash for ATA creation")
-                    recent_blockhash = self.client.get_latest_blockhash(commitment=sol_commitment.Confirmed).value.blockhash
-                    self.log_event(f"[ATA] Fetched blockhash: {recent_blockhash}")
+                    recent_blockhash = await asyncio.to_thread(sniper_trading.get_recent_blockhash, self)
+                    self.log_event(f"[ATA] Using blockhash: {recent_blockhash}")
                     instructions = [create_ata_ix]
                     message = MessageV0.try_compile(
                         payer=owner,
@@ -953,26 +1396,28 @@ class SniperSession:
                     transaction_signed = True
                     self.log_event(f"[ATA] Transaction signed successfully (conventional wallet).")
                     self.log_event(f"[ATA] Sending ATA creation transaction for {mint} (attempt {attempt+1})")
-                    resp = self.client.send_raw_transaction(bytes(transaction))
+                    resp = await asyncio.to_thread(self.client.send_raw_transaction, bytes(transaction))
                     self.log_event(f"[ATA] send_raw_transaction response: {resp}")
                     if not resp or not hasattr(resp, 'value') or 'BlockhashNotFound' in str(resp):
                         self.log_event(f"[ATA] Failed to send ATA creation transaction (blockhash issue): {resp}")
-                        time.sleep(1)
+                        if hasattr(self.client, 'invalidate_blockhash'):
+                            self.client.invalidate_blockhash()
+                        await asyncio.sleep(1)
                         continue
                     signature = resp.value
                     self.log_event(f"[ATA] ATA creation transaction sent with signature: {signature}")
-                    conf = self.client.confirm_transaction(signature, commitment=sol_commitment.Confirmed)
-                    self.log_event(f"[ATA] Confirmation response: {conf}")
-                    if conf and conf.value:
+                    confirmed = await sniper_trading.confirm_signature(self, signature)
+                    self.log_event(f"[ATA] Confirmation result: {confirmed}")
+                    if confirmed:
                         self.log_event(f"[ATA] Successfully created ATA {ata}")
                         return ata
                     else:
                         self.log_event(f"[ATA] ATA creation transaction failed to confirm (attempt {attempt+1})")
-                        time.sleep(1)
+                        await asyncio.sleep(1)
                         continue
                 except Exception as e:
                     self.log_event(f"[ATA] Failed during transaction creation/sending (attempt {attempt+1}): {e}\n{traceback.format_exc()}")
-                    time.sleep(1)
+                    await asyncio.sleep(1)
                     continue
             self.log_event(f"❌ All attempts to create ATA failed for {mint}")
             return None
@@ -1187,9 +1632,8 @@ class SniperSession:
                 if self.client is None:
                     self.log_event(f"[SWAP] No client available for blockhash fetch.")
                     return False
-                self.log_event(f"[SWAP] Attempt {attempt}: Fetching fresh blockhash for direct swap")
-                recent_blockhash = self.client.get_latest_blockhash(commitment=sol_commitment.Confirmed).value.blockhash
-                self.log_event(f"[SWAP] Fetched blockhash: {recent_blockhash}")
+                recent_blockhash = await asyncio.to_thread(sniper_trading.get_recent_blockhash, self)
+                self.log_event(f"[SWAP] Using blockhash: {recent_blockhash}")
                 transaction = VersionedTransaction(
                     MessageV0.try_compile(
                         payer=payer,
@@ -1209,7 +1653,7 @@ class SniperSession:
                     return False
                 self.log_event("[SWAP] Sending direct swap transaction to Solana network...")
                 raw_tx = bytes(transaction)
-                result = self.client.send_raw_transaction(raw_tx)
+                result = await asyncio.to_thread(self.client.send_raw_transaction, raw_tx)
                 self.log_event(f"[SWAP] Transaction result: {result}")
                 if not result.value:
                     self.log_event(f"[SWAP] Direct swap failed: Transaction error")
@@ -1217,9 +1661,9 @@ class SniperSession:
                 else:
                     signature = result.value
                     self.log_event(f"[SWAP] Transaction sent with signature: {signature}")
-                    conf = self.client.confirm_transaction(signature, commitment=sol_commitment.Confirmed)
-                    self.log_event(f"[SWAP] Confirmation response: {conf}")
-                    if conf and conf.value:
+                    confirmed = await sniper_trading.confirm_signature(self, signature)
+                    self.log_event(f"[SWAP] Confirmation result: {confirmed}")
+                    if confirmed:
                         self.log_event(f"[SWAP] Direct swap transaction confirmed: {signature}")
                         return True
                     self.log_event(f"[SWAP] Direct swap failed: Transaction not confirmed")
@@ -1228,7 +1672,9 @@ class SniperSession:
                 self.log_event(f"[SWAP] Direct swap network error (attempt {attempt}): {e}")
                 if "Blockhash not found" in str(e) and attempt < MAX_RETRIES:
                     self.log_event("[SWAP] Retrying with a new blockhash...")
-                    time.sleep(1)
+                    if hasattr(self.client, 'invalidate_blockhash'):
+                        self.client.invalidate_blockhash()
+                    await asyncio.sleep(1)
                     continue
                 else:
                     self.log_event("[SWAP] Giving up after max retries or non-blockhash error.")
@@ -1252,7 +1698,7 @@ class SniperSession:
         self.log(f"[DEBUG PNL] Current SOL Balance: {self.sol_balance:.4f} SOL")
         self.log(f"[DEBUG PNL] Current SOL Price: ${self.sol_usd:.2f}")
         self.log(f"[DEBUG PNL] Current USD Balance (SOL * Price): ${current_sol_usd_value:.2f}")
-        self.log(f"[DEBUG PNL] Realized PnL (from trades list): ${realized_pnl:.2f}")
+        self.log(f"[DEBUG PNL] Realized PnL (closed trades): ${realized_pnl:.2f}")
         self.log(f"[DEBUG PNL] Unrealized PnL (open positions): ${unrealized_pnl:.2f}")
         self.log(f"[DEBUG PNL] Total PnL (realized + unrealized): ${total_pnl:.2f}")
 
@@ -1268,6 +1714,11 @@ class SniperSession:
         self.log(f"Initial Balance: ${self.initial_balance_usd:.2f}")
         self.log(f"Current Balance: ${current_total_portfolio_value:.2f}")
         self.log(f"Session PnL: ${session_pnl:.2f} ({pnl_pct:.1f}%)")
+        throttled = {api: c for api, c in sniper_http.throttle_stats().items() if c['throttled'] or c['gave_up']}
+        for api, counts in throttled.items():
+            self.log(f"[HTTP] {api}: {counts['throttled']} throttled, {counts['retries']} retries, {counts['gave_up']} gave up of {counts['calls']} calls")
+        if self.log_dispatcher.dropped:
+            self.log(f"[LOG] {self.log_dispatcher.dropped} lines dropped because the log sinks fell behind")
         self.log("="*self.TERMINAL_WIDTH)
         open_tokens = [t for t in self.tokens.values() if not t['sold']]
         if open_tokens:
@@ -1383,15 +1834,18 @@ class SniperSession:
                 return False, f"[ERROR] Buy: Could not fetch pool data for {mint}. Cannot perform direct swap."
             # Calculate amount to spend in SOL (use your existing logic for position size)
             sol_amount = self.POSITION_SIZE_USD / self.sol_usd
+            if not sniper_trading.claim_mint(self, mint):
+                return False, f"Manual buy SKIPPED for token: {token_info.get('name', 'N/A')} ({token_info.get('symbol', 'N/A')})\nA trade for this token is already in flight."
             try:
-                import asyncio
-                result = asyncio.run(self.execute_buy_token(mint, sol_amount, pool_data))
+                result = self.run_coroutine(self.execute_buy_token(mint, sol_amount, pool_data))
                 if result:
                     return True, f"Manual buy SUCCESS for token: {token_info.get('name', 'N/A')} ({token_info.get('symbol', 'N/A')})\nTrade confirmed on-chain."
                 else:
                     return False, f"Manual buy FAILED for token: {token_info.get('name', 'N/A')} ({token_info.get('symbol', 'N/A')})\nTransaction failed or not confirmed."
             except Exception as e:
                 return False, f"Manual buy FAILED for token: {token_info.get('name', 'N/A')} ({token_info.get('symbol', 'N/A')})\nError: {e}"
+            finally:
+                sniper_trading.release_mint(self, mint)
 
     def _get_websocket_url(self, http_url: str) -> str:
         """Converts an HTTP RPC URL to a WebSocket URL."""
@@ -1414,18 +1868,17 @@ class SniperSession:
             return None
         url1 = self.DEX_TOKEN_PAIRS_URL + str(mint)
         try:
-            self.dexscreener_rate_limiter.wait()
-            resp1 = requests.get(url1, timeout=5)
+            resp1 = sniper_http.get(url1, api="dexscreener_pairs", timeout=5)
             if resp1.status_code == 200:
-                data1 = resp1.json()
+                data1 = sniper_codec.response_json(resp1)
                 if isinstance(data1, dict) and 'pairs' in data1 and data1['pairs']:
                     return data1['pairs'][0]
                 elif isinstance(data1, list) and data1:
                     return data1[0]
-            url2 = f"https://api.dexscreener.com/pairs/solana/{mint}"
-            resp2 = requests.get(url2, timeout=5)
+            url2 = self.DEX_PAIR_URL + str(mint)
+            resp2 = sniper_http.get(url2, api="dexscreener_pairs", timeout=5)
             if resp2.status_code == 200:
-                data2 = resp2.json()
+                data2 = sniper_codec.response_json(resp2)
                 if isinstance(data2, dict) and 'pair' in data2 and data2['pair']:
                     return data2['pair']
                 elif isinstance(data2, list) and data2:
@@ -1438,7 +1891,7 @@ class SniperSession:
             self.log(error_msg)
             print(f"[DEBUG FETCH] Returning None. Reason: {error_msg}")
             return None
-        except requests.exceptions.RequestException as e:
+        except sniper_http.HTTPError as e:
             error_msg = f"[ERROR] Network error fetching Dexscreener pool for {mint}: {e}"
             self.log(error_msg)
             print(f"[DEBUG FETCH] Returning None. Reason: {error_msg}")
@@ -1454,85 +1907,377 @@ class SniperSession:
             print(f"[DEBUG FETCH] Returning None. Reason: {error_msg}")
             return None
 
+    def _is_solana_mint(self, mint):
+        return isinstance(mint, str) and bool(mint) and "." not in mint and not mint.startswith("0x")
+
+    def _fetch_dexscreener_batch(self, mints):
+        """
+        Resolves up to DEX_BATCH_SIZE mints with a single request to the tokens
+        endpoint. Returns {mint: pair}, preferring pairs where the mint is the base token.
+        """
+        resp = sniper_http.get(self.DEX_TOKENS_URL + ",".join(mints), api="dexscreener_pairs", timeout=5)
+        if resp.status_code != 200:
+            self.log(f"[ERROR] Dexscreener batch lookup failed: Status {resp.status_code}, Response: {resp.text[:200]}")
+            return None
+        data = sniper_codec.response_json(resp)
+        if isinstance(data, dict):
+            data = data.get('pairs') or []
+        wanted = set(mints)
+        pools = {}
+        for side in ('baseToken', 'quoteToken'):
+            for pair in data:
+                address = (pair.get(side) or {}).get('address')
+                if address in wanted and address not in pools:
+                    pools[address] = pair
+        return pools
+
+    def _fetch_dexscreener_pair(self, mint):
+        """Per-mint fallback for mints the batch lookup did not resolve."""
+        try:
+            resp = sniper_http.get(self.DEX_PAIR_URL + str(mint), api="dexscreener_pairs", timeout=5)
+            if resp.status_code == 200:
+                data = sniper_codec.response_json(resp)
+                if isinstance(data, dict) and 'pair' in data and data['pair']:
+                    return data['pair']
+                elif isinstance(data, list) and data:
+                    return data[0]
+        except (sniper_http.HTTPError, json.JSONDecodeError) as e:
+            self.log(f"[ERROR] Network error fetching Dexscreener pair for {mint}: {e}")
+        return None
+
+    def iter_dexscreener_pools(self, mints, fallback=True):
+        """
+        Yields (mint, pool_info) for the given mints as results arrive. Mints are
+        resolved DEX_BATCH_SIZE at a time through the tokens endpoint, with the
+        batches fetched concurrently. Mints missing from a successful batch, and every
+        mint of a batch that failed (error or non-200), fall back to a per-mint lookup,
+        so one bad response does not drop a whole batch from the poll. With fallback=False
+        only the batch lookups are made (used for retries of mints not indexed yet).
+        """
+        mints = [m for m in dict.fromkeys(mints) if self._is_solana_mint(m)]
+        batches = [mints[i:i + DEX_BATCH_SIZE] for i in range(0, len(mints), DEX_BATCH_SIZE)]
+        futures = {self.enrich_executor.submit(self._fetch_dexscreener_batch, batch): batch for batch in batches}
+        fallbacks = {}
+        for future in as_completed(futures):
+            if self.stop_threads:
+                return
+            try:
+                pools = future.result()
+            except Exception as e:
+                self.log(f"[ERROR] Dexscreener batch lookup error: {e}")
+                pools = None
+            if pools is None:
+                if not fallback:
+                    continue
+                self.log(f"[DEBUG] Looking up {len(futures[future])} mints of a failed batch one by one.")
+                pools = {}
+            for mint in futures[future]:
+                if mint in pools:
+                    yield mint, pools[mint]
+                elif fallback:
+                    fallbacks[self.enrich_executor.submit(self._fetch_dexscreener_pair, mint)] = mint
+        for future in as_completed(fallbacks):
+            if self.stop_threads:
+                return
+            try:
+                pool_info = future.result()
+            except Exception as e:
+                self.log(f"[ERROR] Pool lookup failed for {fallbacks[future]}: {e}")
+                continue
+            if pool_info:
+                yield fallbacks[future], pool_info
+
+    def fetch_dexscreener_pools(self, mints):
+        """Batched counterpart of fetch_dexscreener_pool. Returns {mint: pool_info}."""
+        return dict(self.iter_dexscreener_pools(mints))
+
+    def enrich_tokens(self, tokens, fallback=True):
+        """
+        Fetches pool data for the given profile entries and yields (token, pool_info)
+        pairs as soon as each lookup completes. Batches are submitted in feed order
+        (newest first) and share the pair rate limiter, so the newest pairs come
+        back first without exceeding the API budget. Tokens without pool data are skipped.
+        """
+        by_mint = {token.get('tokenAddress'): token for token in tokens}
+        for mint, pool_info in self.iter_dexscreener_pools(list(by_mint), fallback=fallback):
+            yield by_mint[mint], pool_info
+
     async def _listen_for_program_logs(self):
         """
-        Listens to Solana program logs via WebSocket for new liquidity pool creations.
-        When a new pool creation log is detected, it triggers an immediate Dexscreener poll.
+        Follows the logs of the pool-creation programs in LOG_STREAM_PROGRAMS on WS_ENDPOINT_COUNT
+        endpoints at once (RPC_URL first, then RPC_LIST), so one connection dropping leaves the
+        others listening. Notifications are de-duplicated by signature across connections.
+        """
+        urls = []
+        for http_url in [self.RPC_URL] + list(RPC_LIST):
+            ws_url = self._get_websocket_url(http_url)
+            if ws_url not in urls:
+                urls.append(ws_url)
+        urls = urls[:max(1, self.WS_ENDPOINT_COUNT)]
+        await asyncio.gather(*(self._listen_on_endpoint(ws_url) for ws_url in urls))
+
+    async def _listen_on_endpoint(self, ws_url):
+        """
+        One log-stream connection: a logsSubscribe (mentions filter) per followed program.
+        Frames are screened with a substring check and only the few that can announce a pool
+        are JSON-decoded; each new pool's transaction is then parsed into a buy candidate
+        (see _handle_new_pool_signature). Reconnects use jittered exponential backoff, and the
+        slot gap across a reconnect is added to ws_missed_slots.
         """
-        ws_url = self._get_websocket_url(self.RPC_URL)
-        self.log(f"Connecting to WebSocket RPC: {ws_url}")
+        label_url = ws_url.split('?')[0]
+        self.log(f"Connecting to WebSocket RPC: {label_url}")
 
         ssl_context = ssl.create_default_context(cafile=certifi.where())
+        programs = {label: sniper_pools.POOL_LOG_PROGRAMS[label] for label in self.LOG_STREAM_PROGRAMS
+                    if label in sniper_pools.POOL_LOG_PROGRAMS}
+        self.ws_missed_slots.setdefault(ws_url, 0)
+        failures = 0
+        last_slot = None
+        gap_pending = False
 
         while not self.stop_threads:
             try:
                 async with websockets.connect(ws_url, ssl=ssl_context, ping_interval=20, ping_timeout=20) as websocket:
-                    subscribe_request = {
-                        "jsonrpc": "2.0",
-                        "id": 1,
-                        "method": "programSubscribe",
-                        "params": [
-                            str(RAYDIUM_AMM_V2_PROGRAM_ID), # Using V2 for listening, as it's common for init logs
-                            {
-                                "encoding": "jsonParsed",
-                                "commitment": "confirmed",
-                                "filters": []
-                            }
-                        ]
-                    }
-                    await websocket.send(json.dumps(subscribe_request))
-                    
-                    response = await websocket.recv()
-                    parsed_response = json.loads(response)
-                    if 'result' in parsed_response:
-                        subscription_id = parsed_response['result']
-                        self.log(f"Subscribed to Raydium AMM V2 logs with ID: {subscription_id}")
-                    else:
-                        self.log(f"❌ Failed to subscribe to program logs: {parsed_response.get('error', 'Unknown error')}")
-                        await asyncio.sleep(5)
-                        continue
+                    pending = {}
+                    for request_id, (label, program_id) in enumerate(programs.items(), start=1):
+                        subscribe_request = {
+                            "jsonrpc": "2.0",
+                            "id": request_id,
+                            "method": "logsSubscribe",
+                            "params": [
+                                {"mentions": [program_id]},
+                                {"commitment": "confirmed"}
+                            ]
+                        }
+                        pending[request_id] = label
+                        await websocket.send(sniper_codec.dumps(subscribe_request))
+                    self.ws_connected[ws_url] = True
 
                     while not self.stop_threads:
                         try:
                             message = await websocket.recv()
-                            data = json.loads(message)
-
-                            if data.get('method') == 'programNotification':
-                                logs = data['params']['result']['value'].get('logs')
-                                signature = data['params']['result']['value'].get('signature')
-                                if logs:
-                                    new_pool_detected = False
-                                    for log_line in logs:
-                                        if "Program log: initialize2" in log_line or "Program log: initialize_pool" in log_line:
-                                            self.log(f"🚀 New Raydium pool initialization detected! Signature: {signature}")
-                                            new_pool_detected = True
-                                            break
-                                    
-                                    if new_pool_detected:
-                                        self.websocket_triggered_poll = True
-                                        self.log(f"Triggered immediate Dexscreener poll for new token.")
+                            if '"logsNotification"' not in message:
+                                # Subscription acks and errors are the only other frames on this socket
+                                reply = sniper_codec.loads(message)
+                                label = pending.pop(reply.get('id'), None)
+                                if label and 'result' in reply:
+                                    failures = 0
+                                    self.log(f"Subscribed to {label} logs on {label_url} with ID: {reply['result']}")
+                                elif label:
+                                    self.log(f"❌ Failed to subscribe to {label} logs on {label_url}: {reply.get('error', 'Unknown error')}")
+                                continue
+
+                            slot = sniper_pools.frame_slot(message)
+                            if slot is not None:
+                                if gap_pending and last_slot is not None and slot > last_slot + 1:
+                                    missed = slot - last_slot - 1
+                                    self.ws_missed_slots[ws_url] += missed
+                                    covered = sum(1 for url, up in self.ws_connected.items() if up and url != ws_url)
+                                    self.log(f"[WS] {label_url} missed {missed} slots while reconnecting ({last_slot} -> {slot}); "
+                                             f"{covered} other connection(s) were live")
+                                gap_pending = False
+                                last_slot = slot if last_slot is None else max(last_slot, slot)
+
+                            if not sniper_pools.frame_may_announce_pool(message):
+                                continue
+
+                            value = sniper_codec.loads(message)['params']['result']['value']
+                            logs = value.get('logs')
+                            signature = value.get('signature')
+                            if logs and not value.get('err') and any(sniper_pools.is_pool_creation_log(line) for line in logs):
+                                if not self._first_pool_sighting(signature):
+                                    continue
+                                self.log(f"🚀 New pool initialization detected on {label_url}! Signature: {signature}")
+                                # Parsed straight from the transaction; no waiting for Dexscreener to index it
+                                asyncio.get_running_loop().create_task(self._handle_new_pool_signature(signature))
 
                         except websockets.exceptions.ConnectionClosedOK:
-                            self.log("WebSocket connection closed gracefully.")
+                            self.log(f"WebSocket connection to {label_url} closed gracefully.")
                             break
                         except websockets.exceptions.ConnectionClosed as e:
-                            self.log(f"WebSocket connection closed unexpectedly: {e}")
-                            break
-                        except asyncio.CancelledError:
-                            self.log("WebSocket listener cancelled.")
+                            self.log(f"WebSocket connection to {label_url} closed unexpectedly: {e}")
                             break
                         except Exception as e:
-                            self.log(f"Error in WebSocket listener: {e}")
+                            self.log(f"Error in WebSocket listener ({label_url}): {e}")
                             await asyncio.sleep(1)
 
             except Exception as e:
-                self.log(f"WebSocket connection error: {e}. Retrying in 5 seconds...")
-                await asyncio.sleep(5)
+                self.log(f"WebSocket connection error on {label_url}: {e}")
+            finally:
+                self.ws_connected[ws_url] = False
+                gap_pending = True
+
+            if self.stop_threads:
+                break
+            delay = random.uniform(0, min(WS_RECONNECT_MAX_DELAY, WS_RECONNECT_BASE_DELAY * 2 ** failures))
+            failures += 1
+            self.log(f"[WS] Reconnecting to {label_url} in {delay:.2f}s (attempt {failures})")
+            await asyncio.sleep(delay)
+
+    def _first_pool_sighting(self, signature):
+        """True the first time a pool-creation signature is seen, within the last RECENT_SIGNATURES_MAX."""
+        if signature in self.recent_pool_signatures:
+            return False
+        self.recent_pool_signatures[signature] = time.time()
+        if len(self.recent_pool_signatures) > RECENT_SIGNATURES_MAX:
+            self.recent_pool_signatures.popitem(last=False)
+        return True
+
+    def fetch_pool_transaction(self, signature):
+        """
+        Fetches a new-pool transaction as raw JSON. A node that has not caught up to the
+        notifying slot returns null, so each try walks the endpoints in health order.
+        """
+        urls = self.client.ranked_urls() if isinstance(self.client, RotatingSolanaClient) else [self.RPC_URL]
+        for attempt in range(POOL_TX_FETCH_ATTEMPTS):
+            for url in urls:
+                try:
+                    tx = sniper_pools.fetch_transaction(url, signature)
+                except (sniper_http.HTTPError, ValueError) as e:
+                    self.log(f"[RPC] getTransaction failed on {url}: {e}")
+                    continue
+                if tx:
+                    return tx
+            time.sleep(POOL_TX_FETCH_DELAY)
+        return None
+
+    def build_pool_candidate(self, pool):
+        """Token dict and Dexscreener-shaped pool_data for a pool decoded from its creation transaction."""
+        prices = sniper_pools.price_pool(pool, self.sol_usd)
+        created_ms = (pool.get('block_time') or time.time()) * 1000
+        pool_data = {
+            'chainId': 'solana',
+            'dexId': pool['dex'],
+            'pairAddress': pool['pool'],
+            'baseToken': {'address': pool['base_mint']},
+            'quoteToken': {'address': pool['quote_mint']},
+            'priceUsd': prices['price_usd'],
+            'priceNative': prices['price_native'],
+            'liquidity': {'usd': prices['liquidity_usd'], 'base': pool.get('base_amount') or 0, 'quote': pool.get('quote_amount') or 0},
+            'pairCreatedAt': created_ms,
+        }
+        token = {
+            'tokenAddress': pool['base_mint'],
+            'chainId': 'solana',
+            'description': '',
+            'symbol': '',
+            'pairAddress': pool['pool'],
+            'signature': pool.get('signature'),
+        }
+        self._apply_pair_metrics(token, pool_data)
+        return token, pool_data
 
+    async def _handle_new_pool_signature(self, signature):
+        """Turns a pool-creation signature into a candidate and hands it to the filter and buy path."""
+        try:
+            tx = await asyncio.to_thread(self.fetch_pool_transaction, signature)
+            pool = sniper_pools.parse_new_pool(tx, signature)
+            if not pool:
+                self.log(f"[DEBUG] No pool-creation instruction decoded from {signature}; falling back to a Dexscreener poll.")
+                self.websocket_triggered_poll = True
+                return
+            mint = pool['base_mint']
+            if mint in self.seen_tokens or mint in self.pending_pools:
+                return
+            token, pool_data = self.build_pool_candidate(pool)
+            # Pending (not seen) until a buy or a reject on Dexscreener's numbers; see _buy_new_pool
+            self.pending_pools.add(mint, (token, pool_data))
+            self.log(f"\n[NEW POOL] {mint[:8]}... | pool {pool['pool'][:8]}... | price ${token['price_usd']:.10f} | liquidity ${token['liquidity_usd']:,.2f}")
+            self.submit_trade(self._buy_new_pool, token, pool_data)
+        except Exception as e:
+            self.log(f"[ERROR] Handling new pool {signature}: {e}")
+
+    def _buy_new_pool(self, token, pool_data):
+        """
+        Overlays Dexscreener metrics when the pair is already indexed, then evaluates the buy.
+
+        A brand-new pool has no 5m volume or buys yet, so with chain-only numbers the market
+        filters reject it. Such a reject is not final: the mint stays in pending_pools and is
+        evaluated again once Dexscreener has the pair. A buy, or a reject on Dexscreener's own
+        numbers, marks the mint seen.
+        """
+        mint = token['tokenAddress']
+        try:
+            indexed = (self._fetch_dexscreener_batch([mint]) or {}).get(mint)
+        except (sniper_http.HTTPError, ValueError):
+            indexed = None
+        if indexed:
+            pool_data = indexed
+            self._apply_pair_metrics(token, pool_data)
+        bought = self.simulate_buy(token, time.time(), force=False, pool_data=pool_data)
+        if bought or indexed:
+            self.pending_pools.discard(mint)
+            self.seen_tokens.add(mint)
+        else:
+            self.log(f"[DEBUG] {mint[:8]}... not bought on chain data alone; re-checking once Dexscreener indexes it.")
+        return bought
+
+    def _recheck_pending_pools(self, now):
+        """Re-evaluates pending chain pools that Dexscreener has indexed since they were seen."""
+        pending = dict(self.pending_pools.items(now))
+        if not pending:
+            return
+        for mint, pool_info in self.iter_dexscreener_pools(list(pending), fallback=False):
+            if self.pending_pools.pop(mint) is None:
+                continue
+            token, _ = pending[mint]
+            self._apply_pair_metrics(token, pool_info)
+            self.seen_tokens.add(mint)
+            self.log(f"\n[NEW POOL] {mint[:8]}... now indexed by Dexscreener, re-evaluating")
+            self.submit_trade(self.simulate_buy, token, now, force=False, pool_data=pool_info)
+
+    def _apply_pair_metrics(self, token, pool_info):
+        """Copies the filter inputs from a Dexscreener-shaped pair onto a candidate token."""
+        token.update(sniper_codec.pair_fields(pool_info))
+
+    @staticmethod
+    def _profile_key(profile):
+        """Seen-index key for a token-profiles entry: the mint on Solana, "chain:address" elsewhere."""
+        address = profile.get('tokenAddress')
+        if not address:
+            return None
+        chain = profile.get('chainId') or ('ethereum' if address.startswith("0x") else 'solana')
+        return address if chain == 'solana' and not address.startswith("0x") else f"{chain}:{address}"
+
+    def _new_profiles(self, data):
+        """
+        Diffs the newest-first token-profiles feed against the seen index and the pending
+        profiles. Scanning stops after PROFILE_FEED_KNOWN_RUN consecutive known entries, so the
+        cost of a poll follows the number of new profiles, while a repost bumped to the top does
+        not hide the new entries under it. An unchanged top entry skips the scan entirely;
+        pending profiles are retried separately. Entries for other chains are recorded as seen
+        and skipped.
+        """
+        if data and self._profile_key(data[0]) == self.profile_cursor:
+            return []
+        if data:
+            self.profile_cursor = self._profile_key(data[0])
+        candidates = []
+        queued = set()
+        known_run = 0
+        for profile in data:
+            key = self._profile_key(profile)
+            if not key:
+                continue
+            if key in self.seen_tokens or key in self.pending_profiles or key in queued:
+                known_run += 1
+                if known_run >= PROFILE_FEED_KNOWN_RUN:
+                    break
+                continue
+            known_run = 0
+            if key != profile.get('tokenAddress'):
+                # Silently skip non-Solana addresses
+                self.seen_tokens.add(key)
+                continue
+            queued.add(key)
+            candidates.append(profile)
+            if len(candidates) >= self.MAX_TOKENS_PER_POLL:
+                break
+        return candidates
 
     def poll_dexscreener(self):
-        last_seen = set()
         last_poll_time = 0
+        last_recheck = time.time()
         while not self.stop_threads:
             try:
                 now = time.time()
@@ -1543,67 +2288,52 @@ class SniperSession:
                 self.log(f"\n[DEBUG] Polling for new tokens (triggered by WS: {self.websocket_triggered_poll})...")
                 self.websocket_triggered_poll = False
 
-                self.dexscreener_rate_limiter.wait()
-                resp = requests.get(self.DEX_TOKEN_PROFILE_URL, timeout=10)
+                resp = sniper_http.get(self.DEX_TOKEN_PROFILE_URL, api="dexscreener", timeout=10)
                 
                 if resp.status_code != 200:
                     self.log(f"[ERROR] Dexscreener API error: Status {resp.status_code}, Response: {resp.text}")
                     time.sleep(self.DEX_POLL_INTERVAL)
                     continue
                 
-                data = resp.json()
+                data = sniper_codec.response_json(resp)
                 # The Dexscreener token profiles API returns a list, not a dict with 'pairs'
                 if not isinstance(data, list):
                     self.log(f"[ERROR] Invalid response format from Dexscreener token profiles: {json.dumps(data)}")
                     time.sleep(self.DEX_POLL_INTERVAL)
                     continue
                 
+                # The feed is newest first, so the diff (and its cap) keeps the freshest profiles.
+                # New ones stay pending until Dexscreener returns their pair.
+                candidates = self._new_profiles(data)
+                for profile in candidates:
+                    self.pending_profiles.add(profile.get('tokenAddress'), profile, now)
+                enriched = self.enrich_tokens(candidates)
+                if now - last_recheck >= PENDING_RECHECK_INTERVAL:
+                    last_recheck = now
+                    new_keys = {profile.get('tokenAddress') for profile in candidates}
+                    retries = [profile for key, profile in self.pending_profiles.items(now) if key not in new_keys]
+                    if retries:
+                        enriched = itertools.chain(enriched, self.enrich_tokens(retries, fallback=False))
+                    self._recheck_pending_pools(now)
+
                 tokens_found_in_poll = 0
-                tokens_to_process = []
-                for token in data:
+                for token, pool_info in enriched:
                     mint = token.get('tokenAddress')
-                    if not mint or mint in self.seen_tokens or mint in last_seen:
-                        continue
-                    # Silently skip non-Solana addresses
-                    if mint.startswith("0x"):
-                        continue
-
-                    pool_info = self.fetch_dexscreener_pool(mint) 
-                    if not pool_info:
-                        # fetch_dexscreener_pool will now log a more specific error
-                        continue
+                    # Evaluated once: whatever the outcome below, the token is not rescanned
+                    self.seen_tokens.add(mint)
+                    self.pending_profiles.discard(mint)
                     pair_created_at = self.safe_float(pool_info.get('pairCreatedAt', 0)) / 1000
                     if not getattr(self, 'disable_initial_filters', False):
                         if now - pair_created_at > self.MAX_TOKEN_AGE_SECONDS:
                             continue
-                    tokens_to_process.append((pair_created_at, token, pool_info))
-                
-                tokens_to_process.sort(key=lambda x: x[0], reverse=True)
-                tokens_to_process = tokens_to_process[:self.MAX_TOKENS_PER_POLL]
-                
-                for _, token, pool_info in tokens_to_process:
-                    mint = token.get('tokenAddress')
                     name = token.get('description','')
                     symbol = token.get('symbol','')
-                    liquidity = pool_info.get('liquidity') or {}
-                    token['liquidity_usd'] = float(liquidity.get('usd', 0) or 0)
-                    token['liquidity_base'] = float(liquidity.get('base', 0) or 0)
-                    token['liquidity_quote'] = float(liquidity.get('quote', 0) or 0)
-                    token['price_usd'] = float(pool_info.get('priceUsd', 0) or 0)
-                    token['price_native'] = float(pool_info.get('priceNative', 0) or 0)
-                    token['pairCreatedAt'] = pool_info.get('pairCreatedAt')
-                    volume = pool_info.get('volume') or {}
-                    token['volume_m5'] = float(volume.get('m5', 0) or 0)
-                    txns = pool_info.get('txns') or {}
-                    token['txns_m5_buys'] = int(txns.get('m5', {}).get('buys', 0) or 0)
-                    token['txns_m5_sells'] = int(txns.get('m5', {}).get('sells', 0) or 0)
+                    self._apply_pair_metrics(token, pool_info)
                     self.log(f"\n[NEW] {name} ({symbol}) | {mint[:8]}...")
                     # Evaluate GUI (user) filters; if they pass, simulate_buy may execute a buy
-                    self.simulate_buy(token, now, force=False)
-                    self.seen_tokens.add(mint)
-                    last_seen.add(mint)
+                    self.submit_trade(self.simulate_buy, token, now, force=False, pool_data=pool_info)
                     tokens_found_in_poll += 1
-                
+
                 self.log(f"[DEBUG] Finished polling. Found {tokens_found_in_poll} new tokens.")
                 last_poll_time = now
             except Exception as e:
@@ -1614,26 +2344,7 @@ class SniperSession:
         self.polling_thread = threading.Thread(target=self.poll_dexscreener, daemon=True)
         self.polling_thread.start()
 
-        def run_websocket_loop():
-            asyncio.set_event_loop(self.loop)
-            self.websocket_task = self.loop.create_task(self._listen_for_program_logs())
-            try:
-                self.loop.run_forever()
-            except asyncio.CancelledError:
-                self.log("WebSocket loop cancelled.")
-            except Exception as e:
-                self.log(f"WebSocket loop encountered error: {e}")
-            finally:
-                pending_tasks = asyncio.all_tasks(self.loop)
-                for task in pending_tasks:
-                    if task is not None and hasattr(task, 'cancel'):
-                        task.cancel()
-                self.loop.run_until_complete(asyncio.gather(*pending_tasks, return_exceptions=True))
-                self.loop.close()
-                self.log("WebSocket loop closed.")
-
-        self.websocket_thread = threading.Thread(target=run_websocket_loop, daemon=True)
-        self.websocket_thread.start()
+        self.websocket_task = self.submit_coroutine(self._listen_for_program_logs())
 
     def clear_initial_filters(self):
         """Set all initial snipe filters to their most permissive values."""
@@ -1646,93 +2357,71 @@ class SniperSession:
         self.MAX_PAIR_AGE_SECONDS = float("inf")
         self.log("[CONFIG] Initial snipe filters disabled – polling will include all tokens.")
 
-    def try_sell(self, token, now, force=False):
-        if token['sold']:
-            self.log(f"[ERROR] Try sell: Token already sold: {token.get('name', 'N/A')} ({token.get('symbol', 'N/A')})")
-            return False
-        mint = token['address']
-        name = token['name']
-        symbol = token['symbol']
-        # Use the last known price for selling
-        cur_price = float(self.safe_float(token.get('price_usd')) or 0.0)
-        buy_price = float(self.safe_float(token.get('buy_price_usd')) or 0.0)
-        
-        if cur_price == 0 or buy_price == 0:
-            self.log(f"[ERROR] Try sell: No price data for token: {name} ({symbol})")
-            return False
-            
-        # Use the original invested amount at buy time
-        amount_invested = float(self.safe_float(token.get('amount_invested_usd')) or self.safe_float(token.get('amount_left_usd')) or 0.0)
-        
-        # For manual sells, we need to execute the actual transaction
-        if force:  # Manual sell
-            # Calculate tokens to sell based on remaining USD amount
-            sell_amt_usd = self.safe_float(token.get('amount_left_usd'))
-            actual_tokens_to_sell = sell_amt_usd / cur_price if cur_price > 0 else 0
-            
-            if actual_tokens_to_sell <= 0:
-                self.log(f"❌ Sell failed: No tokens to sell for {name} ({symbol}).")
-                return False
-                
-            # Get pool data for the transaction
-            pool_data = self.fetch_dexscreener_pool(mint)
-            if not pool_data:
-                self.log(f"[ERROR] Sell: Could not fetch pool data for {mint}. Cannot perform transaction.")
-                return False
-                
-            # Execute the actual sell transaction
-            import asyncio
-            sell_success = asyncio.run(self.execute_sell_token(mint, actual_tokens_to_sell, pool_data))
-            
-            if not sell_success:
-                self.log(f"[ERROR] Sell transaction failed for {name} ({symbol})")
-                return False
-        
-        # Calculate PnL and record the trade
-        pnl = (cur_price - buy_price) / buy_price * amount_invested if buy_price else 0
-        self.log(f"[DEBUG TRADE] Closing trade: {name} ({symbol}) | Buy: ${buy_price:.8f} | Sell: ${cur_price:.8f} | Amount Invested: ${amount_invested:.4f} | PnL: ${pnl:.4f} | PnL%: {((cur_price - buy_price) / buy_price * 100) if buy_price else 0:+.2f}%")
-        
-        trade = {
-            'address': mint,
-            'buy_price_usd': buy_price,
-            'sell_price_usd': cur_price,
-            'amount_usd': amount_invested,
-            'buy_time': token.get('bought_at'),
-            'sell_time': now,
-            'pnl': pnl,
-            'name': name,
-            'symbol': symbol,
-            'reason': 'MANUAL' if force else 'AUTO',
-            'fraction': 1.0,
-            'sold': True,
-        }
-        
-        # Update token and add to trades
-        if mint in self.tokens:
-            self.tokens.pop(mint)
-        self.trades.append(trade)
-        self.log(f"[DEBUG] Closed trades count: {len(self.trades)}")
-        self.update_open_positions_file()
-        return True
+    def record_sell(self, token, trade):
+        """
+        Books a closed trade: the PnL totals, the trade journal and the published snapshot.
+        Called by the try_sell bound from sniper_trading in __init__, for auto and manual sells.
+        """
+        self.ledger.close_position(trade['address'], trade)
+        self.write_journal("record_sell", trade)
+        self.publish_portfolio()
+
+    def write_journal(self, method, *args):
+        """Calls a TradeJournal writer; a failed write is logged and never interrupts trading."""
+        journal = self.journal
+        if journal is None:
+            return
+        try:
+            getattr(journal, method)(*args)
+        except Exception as e:
+            self.log(f"[ERROR] Failed to write trade journal ({method}): {e}")
+
+    def _drain_trades_and_close_journal(self):
+        """Waits for running buys and sells (already shut down by stop()), then closes the journal."""
+        self.trade_executor.shutdown(wait=True)
+        self.sell_executor.shutdown(wait=True)
+        journal, self.journal = self.journal, None
+        if journal is not None:
+            try:
+                journal.close()
+            except Exception as e:
+                self.log(f"[ERROR] Failed to close trade journal: {e}")
 
-    def update_open_positions_file(self):
-        """Save all open (unsold) positions to open_positions.json."""
-        open_positions = [t for t in self.tokens.values() if not t.get('sold', False)]
+    def load_seen_tokens(self):
+        """Restore the persisted seen index so tokens already evaluated are not re-evaluated after a restart."""
+        try:
+            restored = self.seen_tokens.load()
+            if restored:
+                self.log(f"[INFO] Restored {restored} seen tokens from {self.seen_tokens.path}")
+        except Exception as e:
+            self.log(f"[ERROR] Failed to load seen tokens: {e}")
+
+    def save_seen_tokens(self):
+        if not self.seen_tokens.dirty:
+            return
         try:
-            with open(self.open_positions_file, 'w', encoding='utf-8') as f:
-                json.dump(open_positions, f, indent=2)
+            self.seen_tokens.save()
         except Exception as e:
-            self.log(f"[ERROR] Failed to update open positions file: {e}")
+            self.log(f"[ERROR] Failed to save seen tokens: {e}")
 
     def load_open_positions(self):
-        """Load open positions from open_positions.json."""
+        """Restore open positions from the trade journal, importing a legacy open_positions.json once."""
         try:
-            if os.path.exists(self.open_positions_file):
+            positions = self.journal.open_positions() if self.journal is not None else []
+            if not positions and os.path.exists(self.open_positions_file):
                 with open(self.open_positions_file, 'r', encoding='utf-8') as f:
                     positions = json.load(f)
+                if self.journal is not None:
+                    positions = [pos for pos in positions if 'address' in pos and not pos.get('sold', False)]
                     for pos in positions:
-                        if 'address' in pos and not pos.get('sold', False):
-                            self.tokens[pos['address']] = pos
+                        self.journal.record_buy(pos)
+                    # The journal is the record from now on; keep the old file aside rather than re-importing it
+                    os.replace(self.open_positions_file, self.open_positions_file + ".imported")
+                    self.log(f"[INFO] Imported {len(positions)} open positions from {self.open_positions_file} into the trade journal")
+            for pos in positions:
+                if 'address' in pos and not pos.get('sold', False):
+                    self.tokens[pos['address']] = pos
+                    self.ledger.update_position(pos)
         except Exception as e:
             self.log(f"[ERROR] Failed to load open positions: {e}")
 
@@ -1772,4 +2461,5 @@ if __name__ == "__main__":
         print("\nStopping bot...")
     finally:
         bot_session.stop()
+        bot_session.shutdown_done.wait()
         print("Bot stopped.")
@@ -0,0 +1,89 @@
+"""
+JSON codec shared by the WebSocket listener and the REST clients.
+
+Uses orjson when installed, then msgspec, then the standard library, behind the
+same loads/dumps functions. Decode errors are always raised as
+json.JSONDecodeError so existing except clauses keep working.
+
+pair_fields() turns an already-decoded Dexscreener pair into the flat numeric
+fields the buy filters read, in one walk over the few keys they use.
+"""
+import json
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+JSONDecodeError = json.JSONDecodeError
+
+if orjson is not None:
+    BACKEND = "orjson"
+
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+elif msgspec is not None:
+    BACKEND = "msgspec"
+    _decoder = msgspec.json.Decoder()
+    _encoder = msgspec.json.Encoder()
+
+    def loads(data):
+        try:
+            return _decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise JSONDecodeError(str(e), data if isinstance(data, str) else "", 0) from e
+
+    def dumps(obj) -> str:
+        return _encoder.encode(obj).decode()
+
+else:
+    BACKEND = "json"
+
+    def loads(data):
+        return json.loads(data)
+
+    def dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+
+def response_json(resp) -> Any:
+    """Drop-in for resp.json() that decodes the raw body with the fastest available backend."""
+    return loads(resp.content)
+
+
+def _num(value, cast=float):
+    try:
+        return cast(value or 0)
+    except (TypeError, ValueError):
+        return cast(0)
+
+
+def pair_fields(pair: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flat filter fields (price_usd, liquidity_usd, volume_m5, txns_m5_buys, ...) from a Dexscreener pair.
+    Numeric strings are coerced and missing or null values count as zero.
+    """
+    liquidity = pair.get('liquidity') or {}
+    volume = pair.get('volume') or {}
+    m5 = (pair.get('txns') or {}).get('m5') or {}
+    return {
+        'liquidity_usd': _num(liquidity.get('usd')),
+        'liquidity_base': _num(liquidity.get('base')),
+        'liquidity_quote': _num(liquidity.get('quote')),
+        'price_usd': _num(pair.get('priceUsd')),
+        'price_native': _num(pair.get('priceNative')),
+        'pairCreatedAt': pair.get('pairCreatedAt'),
+        'volume_m5': _num(volume.get('m5')),
+        'txns_m5_buys': _num(m5.get('buys'), int),
+        'txns_m5_sells': _num(m5.get('sells'), int),
+    }
@@ -4,7 +4,11 @@ import threading
 from datetime import datetime, timedelta
 from collections import deque
 import queue
-from sniper_bot import SniperSession
+from sniper_bot import SniperSession, SELL_FEE, TRADE_JOURNAL_FILE
+import sniper_state
+import sniper_log
+import sniper_portfolio
+import sniper_journal
 import json
 import os
 import time
@@ -131,7 +135,7 @@ FONT_STAT = ("Montserrat", 15, "bold")
 
 # Update all CTkFrame, CTkButton, CTkEntry, CTkLabel, etc. to use these constants for padding, font, and radius.
 # Example for cards in dashboard:
-# card = ctk.CTkFrame(self.open_scroll, fg_color=TURBO_NAVY, corner_radius=CARD_RADIUS, border_width=CARD_BORDER, border_color=TURBO_CYAN)
+# card = ctk.CTkFrame(self.open_table, fg_color=TURBO_NAVY, corner_radius=CARD_RADIUS, border_width=CARD_BORDER, border_color=TURBO_CYAN)
 # card.pack(fill="x", padx=SPACING_XL, pady=SPACING_LG, ipadx=SPACING_MD, ipady=SPACING_MD)
 # ctk.CTkLabel(card, text=f"Name: {name}", font=FONT_SUBHEADER, pady=SPACING_SM).pack(anchor="w", padx=SPACING_MD)
 # ctk.CTkLabel(card, text=f"PnL: {pnl_str}", font=FONT_STAT, text_color=color, pady=SPACING_SM).pack(anchor="w", padx=SPACING_MD)
@@ -275,6 +279,155 @@ class Sidebar(ctk.CTkFrame):
         self.callback(section)
 
 # --- Dashboard ---
+TRADE_ROW_HEIGHT = 150        # Approximate height of one trade card in pixels, used to size the row pool
+TRADE_ROWS_MIN = 3            # Rows kept in the pool even when the panel is tiny
+
+
+class TradeRow(ctk.CTkFrame):
+    """One pooled trade card. Its widgets are created once and only reconfigured afterwards."""
+
+    def __init__(self, master, title_color, on_sell=None, *args, **kwargs):
+        super().__init__(master, fg_color=TURBO_BLACK, corner_radius=CARD_RADIUS, *args, **kwargs)
+        self.address = None
+        self.view = None
+        self.title = ctk.CTkLabel(self, text="", font=FONT_SUBHEADER, text_color=title_color, anchor="w")
+        self.title.pack(anchor="w", padx=SPACING_MD, pady=(SPACING_SM, SPACING_SM))
+        self.prices = ctk.CTkLabel(self, text="", font=FONT_BODY, text_color=TURBO_WHITE, anchor="w")
+        self.prices.pack(anchor="w", padx=SPACING_MD)
+        self.pnl = ctk.CTkLabel(self, text="", font=FONT_STAT, text_color=TURBO_SUCCESS, anchor="w")
+        self.pnl.pack(anchor="w", padx=SPACING_MD)
+        self.status = ctk.CTkLabel(self, text="", font=FONT_BODY, text_color=TURBO_GRAY, anchor="w")
+        self.status.pack(anchor="w", padx=SPACING_MD, pady=(SPACING_SM, SPACING_SM))
+        if on_sell:
+            sell_btn = ctk.CTkButton(self, text="Sell", fg_color=TURBO_ERROR, hover_color=TURBO_PURPLE, text_color=TURBO_WHITE, width=BTN_WIDTH, height=BTN_HEIGHT, corner_radius=BTN_RADIUS, font=FONT_BODY, command=lambda: self.address and on_sell(self.address))
+            sell_btn.pack(anchor="e", padx=SPACING_MD, pady=(SPACING_SM, SPACING_SM))
+
+    def show(self, address, view):
+        """Applies a (title, prices, pnl, pnl_color, status) view; widgets are only touched when it changed."""
+        self.address = address
+        if view == self.view:
+            return
+        title, prices, pnl, pnl_color, status = view
+        old = self.view or (None,) * 5
+        if title != old[0]:
+            self.title.configure(text=title)
+        if prices != old[1]:
+            self.prices.configure(text=prices)
+        if pnl != old[2] or pnl_color != old[3]:
+            self.pnl.configure(text=pnl, text_color=pnl_color)
+        if status != old[4]:
+            self.status.configure(text=status)
+        self.view = view
+
+
+class TradeTable(ctk.CTkFrame):
+    """
+    Virtualised list of trade cards with a scrollbar.
+
+    Only a window of rows is ever built: a pool of TradeRow widgets sized to the
+    panel height is re-pointed at whichever trades are scrolled into view. Views
+    are cached per (address, version), so a trade whose version has not changed
+    is not even re-formatted, and a row only reconfigures labels whose text changed.
+    Trades without a 'version' key are compared by their formatted view instead.
+    """
+
+    def __init__(self, master, view_fn, title_color, empty_text, on_sell=None, *args, **kwargs):
+        super().__init__(master, fg_color=TURBO_DARK_GRAY, corner_radius=CARD_RADIUS, *args, **kwargs)
+        self.view_fn = view_fn
+        self.title_color = title_color
+        self.on_sell = on_sell
+        self.trades = []
+        self.offset = 0
+        self.visible_rows = TRADE_ROWS_MIN
+        self.rows = []
+        self._views = {}
+        self.rows_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.rows_frame.pack(side="left", expand=True, fill="both", padx=SPACING_MD, pady=SPACING_MD)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y", pady=SPACING_MD)
+        self.empty_label = ctk.CTkLabel(self.rows_frame, text=empty_text, font=FONT_BODY, text_color=TURBO_GRAY)
+        self.empty_label.pack(pady=SPACING_MD, padx=SPACING_MD)
+        self._bind_wheel(self)
+        self._bind_wheel(self.rows_frame)
+        self.bind("<Configure>", self._on_resize)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", self._on_wheel)
+        widget.bind("<Button-5>", self._on_wheel)
+
+    def _on_resize(self, event):
+        rows = max(TRADE_ROWS_MIN, event.height // TRADE_ROW_HEIGHT + 1)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self._render()
+
+    def _on_wheel(self, event):
+        step = -1 if (getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0) else 1
+        self.scroll_to(self.offset + step)
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.scroll_to(int(float(args[0]) * len(self.trades)))
+        elif action == "scroll":
+            amount = int(args[0])
+            self.scroll_to(self.offset + (amount * self.visible_rows if len(args) > 1 and args[1] == "pages" else amount))
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, len(self.trades) - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+
+    def set_trades(self, trades):
+        """Replaces the table contents and redraws the visible window."""
+        if trades is self.trades:
+            return
+        self.trades = trades
+        addresses = {t.get('address') for t in trades}
+        for address in [a for a in self._views if a not in addresses]:
+            del self._views[address]
+        self.offset = max(0, min(self.offset, len(trades) - self.visible_rows))
+        self._render()
+
+    def _view(self, trade):
+        address = trade.get('address')
+        version = trade.get('version')
+        cached = self._views.get(address)
+        if version is not None and cached and cached[0] == version:
+            return cached[1]
+        view = self.view_fn(trade)
+        self._views[address] = (version, view)
+        return view
+
+    def _render(self):
+        window = self.trades[self.offset:self.offset + self.visible_rows]
+        if not window:
+            self.empty_label.pack(pady=SPACING_MD, padx=SPACING_MD)
+        else:
+            self.empty_label.pack_forget()
+        while len(self.rows) < len(window):
+            row = TradeRow(self.rows_frame, self.title_color, on_sell=self.on_sell)
+            self._bind_wheel(row)
+            self.rows.append(row)
+        for i, row in enumerate(self.rows):
+            if i < len(window):
+                trade = window[i]
+                try:
+                    row.show(trade.get('address'), self._view(trade))
+                except Exception as e:
+                    print(f"Error displaying trade: {e}")
+                if not row.winfo_ismapped():
+                    row.pack(fill="x", pady=SPACING_SM, padx=SPACING_SM, ipadx=SPACING_MD, ipady=SPACING_MD)
+            elif row.winfo_ismapped():
+                row.pack_forget()
+        total = len(self.trades)
+        if total > len(window):
+            self.scrollbar.set(self.offset / total, (self.offset + len(window)) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+
 class DashboardFrame(ctk.CTkFrame):
     def __init__(self, master, start_callback, stop_callback, get_status, get_trades, get_summary, manual_sell_callback, *args, **kwargs):
         super().__init__(master, *args, **kwargs)
@@ -432,10 +585,10 @@ class DashboardFrame(ctk.CTkFrame):
         open_label.pack(pady=SPACING_SM, padx=SPACING_MD)
         closed_label = ctk.CTkLabel(self.closed_trades_panel, text="Closed Trades", font=FONT_DASHBOARD, text_color=TURBO_PURPLE, fg_color="transparent")
         closed_label.pack(pady=SPACING_SM, padx=SPACING_MD)
-        self.open_scroll = ctk.CTkScrollableFrame(self.open_trades_panel, fg_color=TURBO_DARK_GRAY, corner_radius=CARD_RADIUS)
-        self.open_scroll.pack(expand=True, fill="both", padx=SPACING_MD, pady=SPACING_MD, ipadx=SPACING_MD, ipady=SPACING_MD)
-        self.closed_scroll = ctk.CTkScrollableFrame(self.closed_trades_panel, fg_color=TURBO_DARK_GRAY, corner_radius=CARD_RADIUS)
-        self.closed_scroll.pack(expand=True, fill="both", padx=SPACING_MD, pady=SPACING_MD, ipadx=SPACING_MD, ipady=SPACING_MD)
+        self.open_table = TradeTable(self.open_trades_panel, self._open_trade_view, TURBO_CYAN, "No open trades.", on_sell=lambda addr: self.master.manual_sell(addr))
+        self.open_table.pack(expand=True, fill="both", padx=SPACING_MD, pady=SPACING_MD)
+        self.closed_table = TradeTable(self.closed_trades_panel, self._closed_trade_view, TURBO_PURPLE, "No closed trades.")
+        self.closed_table.pack(expand=True, fill="both", padx=SPACING_MD, pady=SPACING_MD)
         self.after(500, self.refresh_trades)
 
     def set_status(self, status):
@@ -447,6 +600,10 @@ class DashboardFrame(ctk.CTkFrame):
 
     def refresh_summary(self):
         summary = self.get_summary()
+        if summary is getattr(self, '_last_summary', None):
+            self.after(2000, self.refresh_summary)
+            return
+        self._last_summary = summary
         # Set values and colors
         self.summary_labels["Initial Balance"].configure(text=summary["initial_balance"], text_color=TURBO_WHITE)
         self.summary_labels["Current Balance"].configure(text=summary["current_balance"], text_color=TURBO_WHITE)
@@ -456,75 +613,64 @@ class DashboardFrame(ctk.CTkFrame):
         self.summary_labels["Last Updated"].configure(text=summary["last_updated"], text_color=TURBO_GRAY)
         self.after(2000, self.refresh_summary)
 
-    def refresh_trades(self):
-        open_trades, closed_trades = self.get_trades()
-        # Clear previous widgets
-        for widget in self.open_scroll.winfo_children():
-            widget.destroy()
-        for widget in self.closed_scroll.winfo_children():
-            widget.destroy()
-        # Modern card for each open trade
+    def _open_trade_view(self, trade):
+        name = trade.get('name', 'N/A')
+        symbol = trade.get('symbol', 'N/A')
+        buy_price = trade.get('buy_price_usd', 0)
+        cur_price = trade.get('price_usd', 0)
+        amount_usd = trade.get('amount_left_usd', 0)
+        sell_fee = getattr(self.master.session, 'SELL_FEE', 0.005) if hasattr(self.master, 'session') else 0.005
+        if buy_price and cur_price and amount_usd:
+            tokens_amount = amount_usd / buy_price
+            current_value = tokens_amount * cur_price * (1 - sell_fee)
+            pnl_usd = current_value - amount_usd
+            pnl_pct = (pnl_usd / amount_usd * 100) if amount_usd else 0
+        else:
+            pnl_usd = 0
+            pnl_pct = 0
+        status = "HOLDING" if not trade.get('sold') else "SOLD"
+        return (
+            f"{name} ({symbol})",
+            f"Buy: ${buy_price:.6f} | Cur: ${cur_price:.6f}",
+            f"PnL: {pnl_usd:+.4f} USD ({pnl_pct:+.2f}%)",
+            TURBO_SUCCESS if pnl_usd >= 0 else TURBO_ERROR,
+            f"Status: {status}",
+        )
+
+    def _closed_trade_view(self, trade):
+        name = trade.get('name', 'N/A')
+        symbol = trade.get('symbol', 'N/A')
+        buy_price = trade.get('buy_price_usd', 0)
+        sell_price = trade.get('sell_price_usd', 0)
+        amount_usd = trade.get('amount_usd', 0)
+        pnl_usd = trade.get('pnl', 0)
+        # Correct percent calculation: percent of invested amount
+        pnl_pct = (pnl_usd / amount_usd * 100) if amount_usd else 0
+        return (
+            f"{name} ({symbol})",
+            f"Buy: ${buy_price:.6f} | Sell: ${sell_price:.6f}",
+            f"PnL: {pnl_usd:+.4f} USD ({pnl_pct:+.2f}%)",
+            TURBO_SUCCESS if pnl_usd >= 0 else TURBO_ERROR,
+            "Status: SOLD",
+        )
+
+    def render_trades(self):
         try:
-            if open_trades:
-                for trade in open_trades:
-                    try:
-                        card = ctk.CTkFrame(self.open_scroll, fg_color=TURBO_BLACK, corner_radius=CARD_RADIUS)
-                        card.pack(fill="x", pady=SPACING_SM, padx=SPACING_SM, ipadx=SPACING_MD, ipady=SPACING_MD)
-                        name = trade.get('name', 'N/A')
-                        symbol = trade.get('symbol', 'N/A')
-                        buy_price = trade.get('buy_price_usd', 0)
-                        cur_price = trade.get('price_usd', 0)
-                        amount_usd = trade.get('amount_left_usd', 0)
-                        sell_fee = getattr(self.master.session, 'SELL_FEE', 0.005) if hasattr(self.master, 'session') else 0.005
-                        if buy_price and cur_price and amount_usd:
-                            tokens_amount = amount_usd / buy_price
-                            current_value = tokens_amount * cur_price * (1 - sell_fee)
-                            pnl_usd = current_value - amount_usd
-                            pnl_pct = (pnl_usd / amount_usd * 100) if amount_usd else 0
-                        else:
-                            pnl_usd = 0
-                            pnl_pct = 0
-                        status = "HOLDING" if not trade.get('sold') else "SOLD"
-                        ctk.CTkLabel(card, text=f"{name} ({symbol})", font=FONT_SUBHEADER, text_color=TURBO_CYAN, anchor="w").pack(anchor="w", padx=SPACING_MD, pady=(SPACING_SM, SPACING_SM))
-                        ctk.CTkLabel(card, text=f"Buy: ${buy_price:.6f} | Cur: ${cur_price:.6f}", font=FONT_BODY, text_color=TURBO_WHITE, anchor="w").pack(anchor="w", padx=SPACING_MD)
-                        ctk.CTkLabel(card, text=f"PnL: {pnl_usd:+.4f} USD ({pnl_pct:+.2f}%)", font=FONT_STAT, text_color=TURBO_SUCCESS if pnl_usd >= 0 else TURBO_ERROR, anchor="w").pack(anchor="w", padx=SPACING_MD)
-                        ctk.CTkLabel(card, text=f"Status: {status}", font=FONT_BODY, text_color=TURBO_GRAY, anchor="w").pack(anchor="w", padx=SPACING_MD, pady=(SPACING_SM, SPACING_SM))
-                        # Sell button
-                        sell_btn = ctk.CTkButton(card, text="Sell", fg_color=TURBO_ERROR, hover_color=TURBO_PURPLE, text_color=TURBO_WHITE, width=BTN_WIDTH, height=BTN_HEIGHT, corner_radius=BTN_RADIUS, font=FONT_BODY, command=lambda addr=trade.get('address'): self.master.manual_sell(addr))
-                        sell_btn.pack(anchor="e", padx=SPACING_MD, pady=(SPACING_SM, SPACING_SM))
-                    except Exception as e:
-                        print(f"Error displaying open trade: {e}")
-                        continue
-            else:
-                ctk.CTkLabel(self.open_scroll, text="No open trades.", font=FONT_BODY, text_color=TURBO_GRAY).pack(pady=SPACING_MD, padx=SPACING_MD)
+            open_trades, closed_trades = self.get_trades()
         except Exception as e:
-            print(f"Error refreshing open trades: {e}")
-            ctk.CTkLabel(self.open_scroll, text="Error loading trades. Please refresh.", font=FONT_BODY, text_color=TURBO_ERROR).pack(pady=SPACING_MD, padx=SPACING_MD)
-        # Modern card for each closed trade
-        if closed_trades:
-            for trade in closed_trades:
-                card = ctk.CTkFrame(self.closed_scroll, fg_color=TURBO_BLACK, corner_radius=CARD_RADIUS)
-                card.pack(fill="x", pady=SPACING_SM, padx=SPACING_SM, ipadx=SPACING_MD, ipady=SPACING_MD)
-                name = trade.get('name', 'N/A')
-                symbol = trade.get('symbol', 'N/A')
-                buy_price = trade.get('buy_price_usd', 0)
-                sell_price = trade.get('sell_price_usd', 0)
-                amount_usd = trade.get('amount_usd', 0)
-                pnl_usd = trade.get('pnl', 0)
-                # Correct percent calculation: percent of invested amount
-                pnl_pct = (pnl_usd / amount_usd * 100) if amount_usd else 0
-                ctk.CTkLabel(card, text=f"{name} ({symbol})", font=FONT_SUBHEADER, text_color=TURBO_PURPLE, anchor="w").pack(anchor="w", padx=SPACING_MD, pady=(SPACING_SM, SPACING_SM))
-                ctk.CTkLabel(card, text=f"Buy: ${buy_price:.6f} | Sell: ${sell_price:.6f}", font=FONT_BODY, text_color=TURBO_WHITE, anchor="w").pack(anchor="w", padx=SPACING_MD)
-                ctk.CTkLabel(card, text=f"PnL: {pnl_usd:+.4f} USD ({pnl_pct:+.2f}%)", font=FONT_STAT, text_color=TURBO_SUCCESS if pnl_usd >= 0 else TURBO_ERROR, anchor="w").pack(anchor="w", padx=SPACING_MD)
-                ctk.CTkLabel(card, text=f"Status: SOLD", font=FONT_BODY, text_color=TURBO_GRAY, anchor="w").pack(anchor="w", padx=SPACING_MD, pady=(SPACING_SM, SPACING_SM))
-        else:
-            ctk.CTkLabel(self.closed_scroll, text="No closed trades.", font=FONT_BODY, text_color=TURBO_GRAY).pack(pady=SPACING_MD, padx=SPACING_MD)
+            print(f"Error refreshing trades: {e}")
+            return
+        self.open_table.set_trades(open_trades or [])
+        self.closed_table.set_trades(closed_trades or [])
+
+    def refresh_trades(self):
+        self.render_trades()
         # Schedule next refresh
         self.after(2000, self.refresh_trades)
 
     def handle_manual_sell(self, address):
         self.manual_sell_callback(address)
-        self.refresh_trades()
+        self.render_trades()
 
     def update_live_dashboard(self):
         """Update the live dashboard with current stats and logs"""
@@ -700,10 +846,10 @@ class LogFrame(ctk.CTkFrame):
         self.panel.pack_propagate(False)
         # 2x2 grid for logs
         self.sections = [
-            ("System Logs", self.filter_system_logs, TURBO_CYAN),
-            ("Error Logs", self.filter_error_logs, TURBO_ERROR),
-            ("Trade Logs", self.filter_trade_logs, TURBO_PURPLE),
-            ("Debug Logs", self.filter_debug_logs, TURBO_GRAY),
+            ("System Logs", self.is_system_log, TURBO_CYAN),
+            ("Error Logs", self.is_error_log, TURBO_ERROR),
+            ("Trade Logs", self.is_trade_log, TURBO_PURPLE),
+            ("Debug Logs", self.is_debug_log, TURBO_GRAY),
         ]
         self.textboxes = []
         for i, (label, _, color) in enumerate(self.sections):
@@ -719,33 +865,70 @@ class LogFrame(ctk.CTkFrame):
         self.panel.grid_rowconfigure((0,1), weight=1)
         self.panel.grid_columnconfigure((0,1), weight=1)
         self._queue = deque()
+        self._cursor = 0
+        # Lines classified since the last tick, per section, and the text lines each box holds
+        self._pending = [[] for _ in self.sections]
+        self._line_counts = [0] * len(self.sections)
         self.after(200, self._flush)
 
+    @staticmethod
+    def is_system_log(l):
+        return "INFO" in l or "Started" in l or "Stopped" in l or not any(x in l for x in ["ERROR","FAIL","EXCEPTION","DEBUG","BUY","SELL","TRADE","PnL"])
+    @staticmethod
+    def is_error_log(l):
+        return any(x in l for x in ["ERROR","FAIL","EXCEPTION","Traceback"])
+    @staticmethod
+    def is_trade_log(l):
+        return any(x in l for x in ["BUY","SELL","TRADE","PnL","Manual buy","Manual sell"])
+    @staticmethod
+    def is_debug_log(l):
+        return "DEBUG" in l
+
     def filter_system_logs(self, lines):
-        return [l for l in lines if ("INFO" in l or "Started" in l or "Stopped" in l or (not any(x in l for x in ["ERROR","FAIL","EXCEPTION","DEBUG","BUY","SELL","TRADE","PnL"])))]
+        return [l for l in lines if self.is_system_log(l)]
     def filter_error_logs(self, lines):
-        return [l for l in lines if any(x in l for x in ["ERROR","FAIL","EXCEPTION","Traceback"])]
+        return [l for l in lines if self.is_error_log(l)]
     def filter_trade_logs(self, lines):
-        return [l for l in lines if any(x in l for x in ["BUY","SELL","TRADE","PnL","Manual buy","Manual sell"])]
+        return [l for l in lines if self.is_trade_log(l)]
     def filter_debug_logs(self, lines):
-        return [l for l in lines if "DEBUG" in l]
+        return [l for l in lines if self.is_debug_log(l)]
 
     def append_log(self, line):
         self._queue.append(line)
 
+    def _ingest(self, lines):
+        """Classifies each new line once, into the pending list of every section it belongs to."""
+        sections = [(pending, match) for pending, (_, match, _) in zip(self._pending, self.sections)]
+        for line in lines:
+            for pending, match in sections:
+                if match(line):
+                    pending.append(line)
+
     def _flush(self):
+        log_lines = getattr(self.master, 'log_lines', None)
+        if log_lines is None:
+            self.after(200, self._flush)
+            return
         if self._queue:
-            self.master.log_lines.extend(self._queue)
-            self._queue.clear()
-        # Update all textboxes
-        lines = self.master.log_lines[-MAX_LOG_LINES:] if hasattr(self.master, 'log_lines') else []
-        for i, (_, filter_fn, color) in enumerate(self.sections):
-            tb = self.textboxes[i]
+            pending = [self._queue.popleft() for _ in range(len(self._queue))]
+            log_lines.extend(pending)
+        new_lines, self._cursor, _ = log_lines.read_since(self._cursor)
+        if new_lines:
+            self._ingest(new_lines)
+        # One insert per box per tick, then trim the oldest lines past MAX_LOG_LINES
+        for i, tb in enumerate(self.textboxes):
+            pending = self._pending[i]
+            if not pending:
+                continue
+            text = "\n".join(pending) + "\n"
+            self._pending[i] = []
             tb.configure(state="normal")
-            tb.delete("1.0", "end")
-            filtered = filter_fn(lines)
-            for l in filtered:
-                tb.insert("end", l + "\n")
+            tb.insert("end", text)
+            self._line_counts[i] += text.count("\n")
+            excess = self._line_counts[i] - MAX_LOG_LINES
+            if excess > 0:
+                tb.delete("1.0", f"{excess + 1}.0")
+                self._line_counts[i] -= excess
             tb.see("end")
             tb.configure(state="disabled")
         self.after(200, self._flush)
@@ -756,6 +939,8 @@ class LogFrame(ctk.CTkFrame):
 
     def clear_log(self):
         self.master.log_lines.clear()
+        self._pending = [[] for _ in self.sections]
+        self._line_counts = [0] * len(self.sections)
         for tb in self.textboxes:
             tb.configure(state="normal")
             tb.delete("1.0", "end")
@@ -1721,9 +1906,18 @@ class MainApp(ctk.CTk):
         self.session = None
         self.bot_status = "Stopped"
         self.lock = threading.Lock()
-        self.seen_tokens = set()
+        self.seen_tokens = sniper_state.SeenIndex(MAX_SEEN_TOKENS)
         self.trades = []
-        self.log_lines = []
+        self.log_lines = sniper_log.LogBuffer(MAX_LOG_LINES)
+        # Last portfolio snapshot read from the session and what was derived from it
+        self._trades_snapshot = None
+        self._trades_view = ([], [])
+        self._summary_snapshot = None
+        self._summary_view = None
+        # Trade journal read while no bot runs, and the view built from its last version
+        self.journal = None
+        self._journal_version = None
+        self._journal_view = ([], [], None)
         # Initialize current_settings after all frames are created
         self.current_settings = self.settings_frame.get_settings()
         # Set window icon (favicon)
@@ -1884,6 +2078,9 @@ class MainApp(ctk.CTk):
         if self.bot_thread and self.bot_thread.is_alive():
             self.log_callback("Bot is already running.")
             return
+        if self.session and self.session.shutdown_thread is not None and not self.session.shutdown_complete():
+            self.log_callback("Previous session is still shutting down; try again in a moment.")
+            return
         self.log_frame.clear_log()
         # Always get fresh settings from GUI (ignore cached current_settings)
         settings = self.settings_frame.get_settings()
@@ -1933,20 +2130,24 @@ class MainApp(ctk.CTk):
 
     def stop_bot(self):
         if self.session:
+            # stop() returns at once; the session drains trades and closes its loop in the background
             self.session.stop()
             self.log_callback("Stop signal sent to bot.")
             beautiful_logger.system("Bot stopped by user")
+            self.after(200, self._poll_session_shutdown, self.session)
         else:
             beautiful_logger.system("Stop requested but no active session")
 
+    def _poll_session_shutdown(self, session):
+        if not session.shutdown_complete():
+            self.after(200, self._poll_session_shutdown, session)
+            return
+        self.log_callback("Bot shutdown complete.")
+
     def cleanup_collections(self):
         with self.lock:
-            if len(self.seen_tokens) > MAX_SEEN_TOKENS:
-                self.seen_tokens = set(list(self.seen_tokens)[-MAX_SEEN_TOKENS:])
             if len(self.trades) > MAX_TRADES_HISTORY:
                 self.trades = self.trades[-MAX_TRADES_HISTORY:]
-            if len(self.log_lines) > MAX_LOG_LINES:
-                self.log_lines = self.log_lines[-MAX_LOG_LINES:]
 
     def load_license(self):
         if os.path.exists(SETTINGS_FILE):
@@ -2270,126 +2471,82 @@ class MainApp(ctk.CTk):
             self.license_verified = False
             self.license_status_msg = f"License activation error: {e}"
 
+    def _portfolio_snapshot(self):
+        """The session's latest published snapshot, or None when no bot is running."""
+        portfolio = getattr(self.session, 'portfolio', None) if self.session else None
+        return portfolio.snapshot if portfolio is not None else None
+
     def get_trades(self):
         # Return (open_trades, closed_trades)
-        if self.session:
-            # Bot is running - get live data
-            open_trades = [t for t in getattr(self.session, 'tokens', {}).values() if not t.get('sold', False)]
-            closed_trades = getattr(self.session, 'trades', [])
+        snapshot = self._portfolio_snapshot()
+        if snapshot is not None:
+            # Bot is running - rebuild the lists only when the session published a new snapshot
+            if snapshot is not self._trades_snapshot:
+                self._trades_snapshot = snapshot
+                self._trades_view = (list(snapshot.open_positions), list(snapshot.closed_trades))
+            return self._trades_view
         else:
-            # Bot is stopped - load from persistence files
-            open_trades = self._load_open_positions()
-            closed_trades = self._load_closed_trades()
-        
+            # Bot is stopped - show the last session as recorded in the trade journal
+            open_trades, closed_trades, _ = self._load_journal()
+
         return open_trades, closed_trades
-    
-    def _load_open_positions(self):
-        """Load open positions from open_positions.json or detect from wallet"""
-        try:
-            with open("open_positions.json", "r") as f:
-                positions = json.load(f)
-                if positions:
-                    return positions
-        except:
-            pass
-        
-        # If no saved positions, try to reconstruct from recent logs
-        return self._reconstruct_trades_from_logs()
-    
-    def _load_closed_trades(self):
-        """Load closed trades from trades.log or other persistence"""
-        try:
-            # Try loading from trades.log first
-            closed_trades = []
-            if os.path.exists("logs/trades.log"):
-                with open("logs/trades.log", "r") as f:
-                    for line in f:
-                        if line.strip():
-                            try:
-                                trade = json.loads(line.strip())
-                                closed_trades.append(trade)
-                            except:
-                                continue
-            
-            # If no trades.log, try to parse from main logs
-            if not closed_trades and os.path.exists("logs"):
-                # Parse recent trades from main log file
-                pass  # Can implement if needed
-                
-            return closed_trades
-        except:
-            return []
-    
-    def _reconstruct_trades_from_logs(self):
-        """Reconstruct trades from recent log files"""
+
+    def _load_journal(self):
+        """
+        (open positions, closed trades of the last session, summary) from the trade journal,
+        re-queried only when the journal changed since the last call.
+        """
+        if self.journal is None:
+            try:
+                self.journal = sniper_journal.open_journal(TRADE_JOURNAL_FILE, create=False)
+            except Exception as e:
+                print(f"Error opening trade journal: {e}")
+            if self.journal is None:
+                return [], [], None
         try:
-            trades = []
-            
-            # Parse the main log file (logs-as) for successful buys
-            if os.path.exists("logs-as"):
-                with open("logs-as", "r") as f:
-                    lines = f.readlines()
-                
-                i = 0
-                while i < len(lines):
-                    line = lines[i].strip()
-                    
-                    # Look for successful buy patterns
-                    if "✨ ALL CHECKS PASSED - BUYING ✨" in line:
-                        # Found a buy attempt, look for the token info
-                        if i + 1 < len(lines):
-                            buy_line = lines[i + 1].strip()
-                            if "[BUY] Called with token_mint_address=" in buy_line:
-                                # Extract token mint address
-                                mint_start = buy_line.find("token_mint_address=") + 19
-                                mint_end = buy_line.find(",", mint_start)
-                                if mint_end > mint_start:
-                                    token_mint = buy_line[mint_start:mint_end]
-                                    
-                                    # Extract amount spent
-                                    amount_start = buy_line.find("amount_to_spend_sol=") + 20
-                                    amount_end = buy_line.find(",", amount_start)
-                                    if amount_end > amount_start:
-                                        try:
-                                            sol_amount = float(buy_line[amount_start:amount_end])
-                                            
-                                            # Create trade record
-                                            trade = {
-                                                'address': token_mint,
-                                                'name': 'Token',  # Will be updated when price info available
-                                                'symbol': token_mint[:8] + "...",  # Shortened mint address
-                                                'bought_at': datetime.now().isoformat(),
-                                                'amount_usd': sol_amount * 100,  # Estimate $100/SOL
-                                                'amount_left_usd': sol_amount * 100,
-                                                'buy_price_usd': 0.000001,  # Placeholder
-                                                'price_usd': 0.000001,  # Placeholder
-                                                'sold': False,
-                                                'sell_price_usd': None,
-                                                'sell_time': None,
-                                                'pnl': None
-                                            }
-                                            trades.append(trade)
-                                        except ValueError:
-                                            pass
-                    i += 1
-            
-            return trades
+            version = self.journal.version()
+            if version == self._journal_version:
+                return self._journal_view
+            session = self.journal.last_event("session_start")
+            open_trades = self.journal.open_positions()
+            closed_trades = self.journal.closed_trades(since=session['ts'] if session else None,
+                                                       limit=MAX_TRADES_HISTORY)
         except Exception as e:
-            print(f"Error reconstructing trades: {e}")
-            return []
+            print(f"Error reading trade journal: {e}")
+            return [], [], None
+        ledger = sniper_portfolio.PortfolioLedger(SELL_FEE)
+        ledger.rebuild(open_trades, closed_trades)
+        initial = ((session or {}).get('data') or {}).get('initial_balance_usd') or 100.0
+        _, _, total_pnl = ledger.totals()
+        if ledger.closed_count == 0:
+            pnl_str = "$0.00 (+0.00%)"
+            win_rate = "0.0%"
+        else:
+            pnl_str = f"${total_pnl:.2f} ({total_pnl / initial * 100:+.2f}%)"
+            win_rate = f"{(ledger.wins / ledger.closed_count * 100):.1f}%"
+        summary = {
+            "initial_balance": f"${initial:.2f}",
+            "current_balance": f"${initial + total_pnl:.2f}",
+            "pnl_usd": total_pnl if ledger.closed_count else 0,
+            "pnl_str": pnl_str,
+            "win_rate": win_rate,
+            "last_updated": time.strftime('%H:%M:%S'),
+        }
+        self._journal_version = version
+        self._journal_view = (open_trades, closed_trades, summary)
+        return self._journal_view
 
     def get_summary(self):
         # Return a dict with initial_balance, current_balance, pnl_usd, pnl_str, win_rate, last_updated
-        if self.session and hasattr(self.session, 'sol_balance') and hasattr(self.session, 'sol_usd') and hasattr(self.session, 'initial_balance_usd'):
-            # Bot is running - use live session data
-            initial = getattr(self.session, 'initial_balance_usd', 0) or 0
-            sol_balance = getattr(self.session, 'sol_balance', 0) or 0
-            sol_usd = getattr(self.session, 'sol_usd', 0) or 0
-            # Use backend's PnL calculation
-            realized_pnl, unrealized_pnl, total_pnl = self.session.calculate_total_pnl() if hasattr(self.session, 'calculate_total_pnl') else (0, 0, 0)
+        snapshot = self._portfolio_snapshot()
+        if snapshot is not None:
+            # Bot is running - PnL comes precomputed in the session's published snapshot
+            if snapshot is self._summary_snapshot:
+                return self._summary_view
+            initial = snapshot.initial_balance_usd
+            total_pnl = snapshot.total_pnl
             current = initial + total_pnl
-            trades = getattr(self.session, 'trades', [])
-            total_trades = len(trades)
+            total_trades = snapshot.closed_count
             if total_trades == 0:
                 pnl_usd = 0
                 pnl_pct = 0
@@ -2399,24 +2556,21 @@ class MainApp(ctk.CTk):
                 pnl_usd = total_pnl
                 pnl_pct = (pnl_usd / initial * 100) if initial else 0
                 pnl_str = f"${pnl_usd:.2f} ({pnl_pct:+.2f}%)"
-                winning_trades = len([t for t in trades if t.get('pnl', 0) > 0])
-                win_rate = f"{(winning_trades / total_trades * 100):.1f}%"
-            return {
+                win_rate = f"{(snapshot.winning_trades / total_trades * 100):.1f}%"
+            self._summary_snapshot = snapshot
+            self._summary_view = {
                 "initial_balance": f"${initial:.2f}",
                 "current_balance": f"${current:.2f}",
                 "pnl_usd": pnl_usd,
                 "pnl_str": pnl_str,
                 "win_rate": win_rate,
-                "last_updated": time.strftime('%H:%M:%S'),
+                "last_updated": time.strftime('%H:%M:%S', time.localtime(snapshot.published_at)),
             }
+            return self._summary_view
         else:
-            # Bot is stopped - calculate from available trades
-            open_trades, closed_trades = self.get_trades()
-            total_open = len(open_trades)
-            total_closed = len(closed_trades)
-            total_trades = total_open + total_closed
-            
-            if total_trades == 0:
+            # Bot is stopped - realized and unrealized PnL of the last journaled session
+            _, _, summary = self._load_journal()
+            if summary is None:
                 return {
                     "initial_balance": "$100.00",  # Default estimate
                     "current_balance": "$100.00",
@@ -2425,20 +2579,7 @@ class MainApp(ctk.CTk):
                     "win_rate": "0.0%",
                     "last_updated": time.strftime('%H:%M:%S'),
                 }
-            else:
-                # Estimate from trade data
-                initial = 100.0  # Default estimate
-                total_invested = sum(t.get('amount_usd', 0) for t in open_trades)
-                current = initial + (total_invested * 0.1)  # Rough estimate
-                
-                return {
-                    "initial_balance": f"${initial:.2f}",
-                    "current_balance": f"${current:.2f}",
-                    "pnl_usd": total_invested * 0.1,
-                    "pnl_str": f"${total_invested * 0.1:.2f} (+10.0%)",  # Placeholder
-                    "win_rate": "100.0%" if total_trades > 0 else "0.0%",
-                    "last_updated": time.strftime('%H:%M:%S'),
-                }
+            return summary
 
     def manual_sell(self, address):
         # Immediately sell the token with the given address
@@ -2446,7 +2587,7 @@ class MainApp(ctk.CTk):
             self.session.manual_sell_token(address)
             self.log_callback(f"Manual sell triggered for token: {address}")
             if "Dashboard" in self.frames:
-                self.frames["Dashboard"].refresh_trades()
+                self.frames["Dashboard"].render_trades()
 
     def fetch_token_info(self, address):
         if self.session and hasattr(self.session, 'fetch_dexscreener_pool'):
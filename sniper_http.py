@@ -0,0 +1,361 @@
+"""
+Shared HTTP transport for the bot's outbound REST calls.
+
+Dexscreener, CoinGecko, Jupiter, Solscan and Magic Eden requests all go through
+one transport that keeps a pooled, keep-alive httpx client per host, so TLS
+sessions are reused across calls instead of being renegotiated every time.
+HTTP/2 is used when the optional `h2` package is installed.
+
+Each upstream API also has a token-bucket budget (get_limiter). Passing
+api="<name>" to get/post waits for that budget first and feeds 429s back into it.
+Throttled (429), unavailable (5xx) and failed-to-connect calls are retried by a
+RetryPolicy that honours Retry-After and otherwise backs off with decorrelated
+jitter; throttle_stats() reports the counts per API.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401 - only needed to enable HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_TIMEOUT = 10.0          # Seconds, used when a call does not pass its own timeout
+CONNECT_TIMEOUT = 5.0           # Seconds allowed for TCP + TLS setup
+MAX_CONNECTIONS_PER_HOST = 20
+MAX_KEEPALIVE_PER_HOST = 10
+KEEPALIVE_EXPIRY = 60.0         # Seconds an idle connection is kept open
+
+# Callers catch this instead of requests.exceptions.RequestException
+HTTPError = httpx.HTTPError
+
+# Sustained requests/second and burst size per upstream API. Names with a ":" suffix
+# (e.g. "rpc:<url>") share the budget of their prefix but get their own bucket.
+API_BUDGETS = {
+    "dexscreener": (1.0, 5),         # token-profiles: 60/min
+    "dexscreener_pairs": (5.0, 10),  # tokens/pairs: 300/min
+    "coingecko": (0.5, 3),           # public tier: about 30/min
+    "jupiter": (10.0, 10),
+    "rpc": (10.0, 20),               # per RPC endpoint
+}
+DEFAULT_BUDGET = (5.0, 5)
+RETRY_MAX_ATTEMPTS = 4          # Tries per call, including the first
+RETRY_BASE_DELAY = 0.5          # Seconds; first backoff when no Retry-After is given
+RETRY_MAX_DELAY = 20.0          # Longest single backoff
+RETRY_AFTER_LIMIT = 60.0        # A Retry-After longer than this is not waited out
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+TRADE_RETRY_DEADLINE = 2.0      # Seconds after which a trade-path call (Jupiter quote/swap) stops retrying
+MIN_RATE_FRACTION = 0.125       # AIMD never cuts a budget below 1/8 of its configured rate
+RATE_RECOVERY_FRACTION = 0.05   # Configured rate regained per successful call after a cut
+
+
+class TokenBucket:
+    """
+    Token-bucket limiter: `rate` tokens/second refill a bucket holding at most `burst`.
+
+    Callers reserve a token under the lock and sleep outside it, so concurrent callers
+    are spaced out instead of serialised. A 429 halves the rate (down to
+    MIN_RATE_FRACTION of the configured rate) and optionally pauses the bucket; each
+    later success adds back RATE_RECOVERY_FRACTION of it.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None, name: str = ""):
+        self.name = name
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = max(1, int(burst if burst is not None else rate))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Takes one token, possibly borrowed from the future, and returns how long to wait for it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(delay, self.paused_until - now)
+
+    def reconfigure(self, rate: float, burst: Optional[int] = None):
+        """Changes the budget in place, so callers holding this bucket pick it up."""
+        with self.lock:
+            self.max_rate = float(rate)
+            self.rate = float(rate)
+            self.burst = max(1, int(burst if burst is not None else rate))
+            self.tokens = min(self.tokens, float(self.burst))
+
+    def acquire(self):
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    # Same call the old RateLimiter exposed
+    wait = acquire
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """Multiplicative decrease after a 429, plus a pause when the server said how long."""
+        with self.lock:
+            self.throttled += 1
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    def reward(self):
+        """Additive increase back toward the configured rate after a successful call."""
+        if self.rate < self.max_rate:
+            with self.lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_RECOVERY_FRACTION)
+
+    def record(self, status_code: int, retry_after: Optional[float] = None):
+        if status_code == 429:
+            self.penalize(retry_after)
+        elif status_code < 400:
+            self.reward()
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> TokenBucket:
+    """Shared bucket for an API name, created from API_BUDGETS on first use."""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                rate, burst = API_BUDGETS.get(name) or API_BUDGETS.get(name.split(":", 1)[0], DEFAULT_BUDGET)
+                limiter = _limiters[name] = TokenBucket(rate, burst, name=name)
+    return limiter
+
+
+def configure_limiter(name: str, rate: float, burst: Optional[int] = None) -> TokenBucket:
+    """
+    Replaces the budget for one API, e.g. configure_limiter("rpc", 50, 100) for a paid RPC plan.
+
+    A bare API name also applies to every per-endpoint bucket ("rpc:<url>") already created
+    and to those created later. Buckets are updated in place, so clients that captured them
+    (RotatingSolanaClient.limiters) follow the new budget.
+    """
+    with _limiters_lock:
+        if ":" not in name:
+            API_BUDGETS[name] = (rate, burst if burst is not None else rate)
+            prefix = name + ":"
+            for key, bucket in _limiters.items():
+                if key.startswith(prefix):
+                    bucket.reconfigure(rate, burst)
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = TokenBucket(rate, burst, name=name)
+        else:
+            limiter.reconfigure(rate, burst)
+    return limiter
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Seconds from a Retry-After header, given either as delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_stats = defaultdict(lambda: {"calls": 0, "throttled": 0, "retries": 0, "gave_up": 0})
+_stats_lock = threading.Lock()
+
+
+def _count(key: str, field: str):
+    with _stats_lock:
+        _stats[key][field] += 1
+
+
+def throttle_stats() -> Dict[str, Dict[str, int]]:
+    """Per API (or host, for calls without api=): calls, 429s seen, retries made and calls given up on."""
+    with _stats_lock:
+        return {key: dict(counts) for key, counts in _stats.items()}
+
+
+class RetryPolicy:
+    """
+    Retries a call on RETRY_STATUSES and transport errors.
+
+    The wait is the server's Retry-After when it sends one (up to RETRY_AFTER_LIMIT),
+    otherwise decorrelated jitter: a random delay between the base and three times the
+    previous delay, capped at max_delay. A 429 also penalises the API's token bucket,
+    so other callers slow down instead of walking into the same wall. With a deadline
+    (seconds from the first attempt) no retry is started that would wait past it.
+    """
+
+    def __init__(self, max_attempts: int = RETRY_MAX_ATTEMPTS, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY, retry_after_limit: float = RETRY_AFTER_LIMIT,
+                 statuses=RETRY_STATUSES, deadline: Optional[float] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_after_limit = retry_after_limit
+        self.statuses = set(statuses)
+        self.deadline = deadline
+
+    def next_delay(self, previous: float) -> float:
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+
+    def _past_deadline(self, started: float, delay: float) -> bool:
+        return self.deadline is not None and time.monotonic() - started + delay > self.deadline
+
+    def call(self, send, key: str, limiter: Optional["TokenBucket"] = None) -> httpx.Response:
+        delay = self.base_delay
+        started = time.monotonic()
+        for attempt in range(1, self.max_attempts + 1):
+            if limiter is not None:
+                limiter.acquire()
+            _count(key, "calls")
+            try:
+                resp = send()
+            except httpx.TransportError:
+                delay = self.next_delay(delay)
+                if attempt == self.max_attempts or self._past_deadline(started, delay):
+                    _count(key, "gave_up")
+                    raise
+            else:
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                if resp.status_code == 429:
+                    _count(key, "throttled")
+                if limiter is not None:
+                    limiter.record(resp.status_code, retry_after)
+                if resp.status_code not in self.statuses:
+                    return resp
+                if attempt == self.max_attempts or (retry_after is not None and retry_after > self.retry_after_limit):
+                    _count(key, "gave_up")
+                    return resp
+                delay = retry_after if retry_after is not None else self.next_delay(delay)
+                if self._past_deadline(started, delay):
+                    _count(key, "gave_up")
+                    return resp
+            _count(key, "retries")
+            time.sleep(delay)
+
+
+DEFAULT_RETRY = RetryPolicy()
+# Calls on the trade path: a quote is worthless a few seconds later, so at most one quick retry
+TRADE_RETRY = RetryPolicy(max_attempts=2, base_delay=0.2, max_delay=0.5, retry_after_limit=1.0,
+                          deadline=TRADE_RETRY_DEADLINE)
+
+
+class HttpTransport:
+    """Lazily creates one pooled httpx.Client per host and routes requests to it."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, connect_timeout=CONNECT_TIMEOUT, http2=HTTP2_AVAILABLE,
+                 max_connections=MAX_CONNECTIONS_PER_HOST, max_keepalive=MAX_KEEPALIVE_PER_HOST,
+                 keepalive_expiry=KEEPALIVE_EXPIRY):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._clients: Dict[str, httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    def _client(self, url) -> httpx.Client:
+        host = httpx.URL(url).host
+        client = self._clients.get(host)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(host)
+                if client is None:
+                    client = httpx.Client(
+                        http2=self.http2,
+                        timeout=self.timeout,
+                        limits=self.limits,
+                        follow_redirects=True,
+                    )
+                    self._clients[host] = client
+        return client
+
+    def request(self, method, url, **kwargs) -> httpx.Response:
+        return self._client(url).request(method, url, **kwargs)
+
+    def get(self, url, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+_transport = HttpTransport()
+
+
+def get_transport() -> HttpTransport:
+    return _transport
+
+
+def configure(**kwargs) -> HttpTransport:
+    """Replaces the shared transport, e.g. configure(timeout=5, connect_timeout=2, http2=False)."""
+    global _transport
+    old, _transport = _transport, HttpTransport(**kwargs)
+    old.close()
+    return _transport
+
+
+def request(method, url, api: Optional[str] = None, retry: Optional[RetryPolicy] = DEFAULT_RETRY, **kwargs) -> httpx.Response:
+    """
+    Sends through the shared transport. With api= the call is paced by that API's budget
+    and its 429s shrink it; retry=None sends exactly once.
+    """
+    limiter = get_limiter(api) if api else None
+    send = lambda: _transport.request(method, url, **kwargs)
+    if retry is None:
+        if limiter is not None:
+            limiter.acquire()
+        resp = send()
+        if limiter is not None:
+            limiter.record(resp.status_code, parse_retry_after(resp.headers.get("Retry-After")))
+        return resp
+    return retry.call(send, api or httpx.URL(url).host, limiter)
+
+
+def get(url, api: Optional[str] = None, **kwargs) -> httpx.Response:
+    return request("GET", url, api=api, **kwargs)
+
+
+def post(url, api: Optional[str] = None, **kwargs) -> httpx.Response:
+    return request("POST", url, api=api, **kwargs)
+
+
+def close():
+    _transport.close()
@@ -0,0 +1,198 @@
+"""
+Append-only trade journal in SQLite (WAL mode).
+
+Every buy, sell and price update is written as it happens, as one row in
+`events` plus an update of the derived `positions` (open) or `trades` (closed)
+table in the same transaction. A crash therefore never leaves a half-applied
+change: after a restart the positions table is exactly what the last committed
+event left. Each write costs one small transaction instead of a rewrite of the
+whole open-positions file, and closed trades and events are indexed by time,
+so range queries do not scan the journal.
+
+The GUI opens the same file read-side to show real data while no bot runs.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+JOURNAL_FILE = "trades.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    address TEXT,
+    price_usd REAL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_address_ts ON events (address, ts);
+CREATE TABLE IF NOT EXISTS positions (
+    address TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    price_usd REAL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    address TEXT NOT NULL,
+    sell_time REAL NOT NULL,
+    pnl REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trades_sell_time ON trades (sell_time);
+"""
+
+
+def _dumps(entry: Mapping[str, Any]) -> str:
+    return json.dumps(dict(entry), default=str, separators=(",", ":"))
+
+
+class TradeJournal:
+    """
+    One SQLite connection shared by the session's threads (writes are serialised by a lock).
+
+    Writers call record_buy / record_prices / record_sell / record_event; readers use
+    open_positions, closed_trades and events. version() changes whenever the journal
+    does, so a reader can skip re-querying an unchanged file.
+    """
+
+    def __init__(self, path: str = JOURNAL_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only risks the last commits on power loss, never corruption
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def _append(self, cur: sqlite3.Cursor, ts: float, kind: str, address: Optional[str] = None,
+                price_usd: Optional[float] = None, data: Optional[Mapping[str, Any]] = None):
+        cur.execute(
+            "INSERT INTO events (ts, kind, address, price_usd, data) VALUES (?, ?, ?, ?, ?)",
+            (ts, kind, address, price_usd, _dumps(data) if data is not None else None),
+        )
+
+    def record_buy(self, position: Mapping[str, Any], ts: Optional[float] = None):
+        """Journals an opened position and makes it the current state for its address."""
+        ts = ts if ts is not None else time.time()
+        address = position.get('address')
+        price = position.get('price_usd')
+        with self._lock, self._conn:
+            cur = self._conn.cursor()
+            self._append(cur, ts, "buy", address, price, position)
+            cur.execute(
+                "INSERT OR REPLACE INTO positions (address, data, price_usd, updated_at) VALUES (?, ?, ?, ?)",
+                (address, _dumps(position), price, ts),
+            )
+
+    def record_prices(self, prices: Iterable[Tuple[str, float]], ts: Optional[float] = None):
+        """Journals a price pass over open positions in one transaction."""
+        ts = ts if ts is not None else time.time()
+        prices = list(prices)
+        if not prices:
+            return
+        with self._lock, self._conn:
+            cur = self._conn.cursor()
+            cur.executemany(
+                "INSERT INTO events (ts, kind, address, price_usd) VALUES (?, 'price', ?, ?)",
+                [(ts, address, price) for address, price in prices],
+            )
+            cur.executemany(
+                "UPDATE positions SET price_usd = ?, updated_at = ? WHERE address = ?",
+                [(price, ts, address) for address, price in prices],
+            )
+
+    def record_sell(self, trade: Mapping[str, Any], ts: Optional[float] = None):
+        """Journals a closed trade and removes its address from the open positions."""
+        ts = ts if ts is not None else time.time()
+        address = trade.get('address')
+        sell_time = trade.get('sell_time') or ts
+        with self._lock, self._conn:
+            cur = self._conn.cursor()
+            self._append(cur, ts, "sell", address, trade.get('sell_price_usd'), trade)
+            cur.execute(
+                "INSERT INTO trades (address, sell_time, pnl, data) VALUES (?, ?, ?, ?)",
+                (address, sell_time, trade.get('pnl'), _dumps(trade)),
+            )
+            cur.execute("DELETE FROM positions WHERE address = ?", (address,))
+
+    def record_event(self, kind: str, data: Optional[Mapping[str, Any]] = None, ts: Optional[float] = None):
+        """Journals a session-level event such as "session_start"."""
+        ts = ts if ts is not None else time.time()
+        with self._lock, self._conn:
+            self._append(self._conn.cursor(), ts, kind, data=data)
+
+    def open_positions(self) -> List[Dict[str, Any]]:
+        """Current open positions, with the last journaled price applied."""
+        with self._lock:
+            rows = self._conn.execute("SELECT data, price_usd FROM positions ORDER BY updated_at").fetchall()
+        positions = []
+        for data, price in rows:
+            position = json.loads(data)
+            if price is not None:
+                position['price_usd'] = price
+                position['priceUsd'] = price
+            positions.append(position)
+        return positions
+
+    def closed_trades(self, since: Optional[float] = None, until: Optional[float] = None,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Closed trades with since <= sell_time < until, oldest first; limit keeps the newest."""
+        query = "SELECT data FROM trades WHERE sell_time >= ? AND sell_time < ? ORDER BY sell_time DESC, id DESC"
+        params: List[Any] = [since if since is not None else float('-inf'), until if until is not None else float('inf')]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(data) for (data,) in reversed(rows)]
+
+    def events(self, since: Optional[float] = None, until: Optional[float] = None,
+               address: Optional[str] = None, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Raw journal rows in time order, optionally for one address and/or kind."""
+        query = "SELECT ts, kind, address, price_usd, data FROM events WHERE ts >= ? AND ts < ?"
+        params: List[Any] = [since if since is not None else float('-inf'), until if until is not None else float('inf')]
+        if address is not None:
+            query += " AND address = ?"
+            params.append(address)
+        if kind is not None:
+            query += " AND kind = ?"
+            params.append(kind)
+        query += " ORDER BY ts, id"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {'ts': ts, 'kind': kind, 'address': address, 'price_usd': price, 'data': json.loads(data) if data else None}
+            for ts, kind, address, price, data in rows
+        ]
+
+    def last_event(self, kind: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ts, data FROM events WHERE kind = ? ORDER BY ts DESC, id DESC LIMIT 1", (kind,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'ts': row[0], 'kind': kind, 'data': json.loads(row[1]) if row[1] else None}
+
+    def version(self) -> Tuple[int, int]:
+        """Changes whenever this or another connection commits to the journal."""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0], self._conn.total_changes
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_journal(path: str = JOURNAL_FILE, create: bool = True) -> Optional[TradeJournal]:
+    """The journal at path, or None when create is False and it does not exist yet."""
+    if not create and not os.path.exists(path):
+        return None
+    return TradeJournal(path)
@@ -0,0 +1,318 @@
+"""
+In-memory log storage and level-gated logging shared by the bot sessions and the GUI.
+
+LogBuffer is a fixed-capacity ring buffer: appending never copies or slices, the
+oldest lines simply fall off the front. Every line gets a sequence number, so a
+consumer keeps a cursor and asks only for what was logged since it last looked.
+
+Logger sits in front of a session's log(): each message carries a category
+(FILTER, TRADE, RPC, SYSTEM) and a level, and its str.format arguments are only
+formatted when that category is enabled at that level.
+
+LogDispatcher takes the delivery of finished lines off the calling thread:
+submit() is a non-blocking enqueue and a dispatcher thread hands each line to
+the registered sinks (the GUI callback, FileSink, LogMetrics).
+"""
+import os
+import queue
+import sys
+import threading
+from collections import Counter, deque
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+DEFAULT_CAPACITY = 5000
+DISPATCH_QUEUE_SIZE = 20000     # Lines waiting for the sinks before new ones are dropped
+DISPATCH_BATCH_SIZE = 500       # Lines handed to the sinks between flushes
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR}
+CATEGORIES = ("SYSTEM", "FILTER", "TRADE", "RPC")
+
+
+class LogBuffer:
+    """
+    Last `capacity` log lines, numbered from 0 in the order they were appended.
+
+    `next_seq` is the sequence number the next line will get, so it doubles as the
+    cursor of a consumer that is fully caught up. Supports len(), iteration and
+    clear() like the lists it replaces.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._lines = deque(maxlen=capacity)
+        self.next_seq = 0
+        self._lock = threading.Lock()
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest line still held."""
+        return self.next_seq - len(self._lines)
+
+    def append(self, line: str) -> int:
+        """Stores line and returns its sequence number."""
+        with self._lock:
+            self._lines.append(line)
+            self.next_seq += 1
+            return self.next_seq - 1
+
+    def extend(self, lines: Iterable[str]) -> int:
+        """Stores lines in order and returns the cursor just past the last one."""
+        with self._lock:
+            for line in lines:
+                self._lines.append(line)
+                self.next_seq += 1
+            return self.next_seq
+
+    def read_since(self, cursor: int) -> Tuple[List[str], int, int]:
+        """
+        Lines appended at or after `cursor`, the new cursor, and how many lines between
+        the old cursor and the oldest retained one were already overwritten.
+        """
+        with self._lock:
+            first = self.next_seq - len(self._lines)
+            dropped = max(0, first - cursor)
+            start = max(cursor, first) - first
+            lines = list(islice(self._lines, start, None)) if start < len(self._lines) else []
+            return lines, self.next_seq, dropped
+
+    def tail(self, n: int) -> List[str]:
+        with self._lock:
+            return list(islice(self._lines, max(0, len(self._lines) - n), None))
+
+    def clear(self):
+        """Drops the held lines; sequence numbers keep counting so existing cursors stay valid."""
+        with self._lock:
+            self._lines.clear()
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._lines))
+
+
+def parse_level(level: Union[int, str]) -> int:
+    """Accepts a level number or name ("debug", "INFO", ...)."""
+    if isinstance(level, int):
+        return level
+    try:
+        return LEVEL_NAMES[str(level).upper()]
+    except KeyError:
+        raise ValueError(f"Unknown log level: {level}") from None
+
+
+class Logger:
+    """
+    Category/level gate in front of an emit callable (normally the session's log()).
+
+    Messages use str.format placeholders and are formatted only when they pass the
+    gate, so a disabled debug line costs one dict lookup:
+
+        logger.debug("TRADE", "Decoded transaction: {}", txn)
+
+    For blocks that do their own work before logging, check enabled() first.
+    """
+
+    def __init__(self, emit: Callable[[str], None], level: Union[int, str] = INFO,
+                 levels: Optional[Dict[str, Union[int, str]]] = None):
+        self.emit = emit
+        self.level = parse_level(level)
+        self.levels: Dict[str, int] = {}
+        for category, category_level in (levels or {}).items():
+            self.set_level(category, category_level)
+
+    def set_level(self, category: str, level: Union[int, str]):
+        self.levels[category.upper()] = parse_level(level)
+
+    def enabled(self, category: str, level: int) -> bool:
+        return level >= self.levels.get(category, self.level)
+
+    def log(self, category: str, level: int, msg: str, *args, **kwargs):
+        if level < self.levels.get(category, self.level):
+            return
+        self.emit(msg.format(*args, **kwargs) if args or kwargs else msg)
+
+    def debug(self, category: str, msg: str, *args, **kwargs):
+        self.log(category, DEBUG, msg, *args, **kwargs)
+
+    def info(self, category: str, msg: str, *args, **kwargs):
+        self.log(category, INFO, msg, *args, **kwargs)
+
+    def warning(self, category: str, msg: str, *args, **kwargs):
+        self.log(category, WARNING, msg, *args, **kwargs)
+
+    def error(self, category: str, msg: str, *args, **kwargs):
+        self.log(category, ERROR, msg, *args, **kwargs)
+
+
+class LogDispatcher:
+    """
+    Delivers log lines to sinks on a dedicated "log-dispatch" thread.
+
+    submit() never blocks: if the sinks fall DISPATCH_QUEUE_SIZE lines behind, new
+    lines are counted in `dropped` instead of stalling the trading threads. A sink is
+    any callable taking the line; after each batch its flush() is called if it has one.
+    A sink that raises is reported on stderr and keeps receiving lines.
+
+    After close() (or before the thread starts) submit() delivers synchronously, so
+    lines logged while a session shuts down are not lost.
+    """
+
+    _STOP = object()
+
+    def __init__(self, sinks: Iterable[Callable[[str], None]] = (), maxsize: int = DISPATCH_QUEUE_SIZE):
+        self.sinks: List[Callable[[str], None]] = list(sinks)
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._sink_lock = threading.Lock()
+        # Orders submit() against start()/close(): once close() has queued _STOP, no line can follow it
+        self._state_lock = threading.Lock()
+
+    def add_sink(self, sink: Callable[[str], None]):
+        with self._sink_lock:
+            self.sinks = self.sinks + [sink]
+
+    def remove_sink(self, sink: Callable[[str], None]):
+        with self._sink_lock:
+            self.sinks = [s for s in self.sinks if s is not sink]
+
+    def start(self):
+        with self._state_lock:
+            if self._thread is None:
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, name="log-dispatch", daemon=True)
+                self._thread.start()
+
+    def submit(self, line: str):
+        with self._state_lock:
+            if self._thread is not None and not self._closed:
+                try:
+                    self._queue.put_nowait(line)
+                except queue.Full:
+                    self.dropped += 1
+                return
+        self._deliver([line])
+
+    def flush(self, timeout: Optional[float] = None):
+        """Waits until every line submitted so far has been delivered (or the timeout passes)."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 2.0):
+        """Delivers what is queued, stops the thread and closes sinks that have close()."""
+        with self._state_lock:
+            thread, self._thread = self._thread, None
+            self._closed = True
+            if thread is not None:
+                # The dispatcher keeps draining, so this only waits while the queue is full
+                self._queue.put(self._STOP)
+        if thread is not None:
+            thread.join(timeout)
+        for sink in self.sinks:
+            close = getattr(sink, "close", None)
+            if close:
+                try:
+                    close()
+                except Exception:
+                    pass
+
+    def _deliver(self, lines: List[str]):
+        for sink in self.sinks:
+            try:
+                for line in lines:
+                    sink(line)
+                flush = getattr(sink, "flush", None)
+                if flush:
+                    flush()
+            except Exception as e:
+                print(f"Log sink {sink!r} failed: {e}", file=sys.stderr)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch: List[str] = []
+            events = []
+            stop = False
+            while True:
+                if item is self._STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= DISPATCH_BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._deliver(batch)
+            for event in events:
+                event.set()
+            if stop:
+                return
+
+
+class FileSink:
+    """Appends timestamped lines to a file, moving it to `backup_path` once it passes max_bytes."""
+
+    def __init__(self, path: str, backup_path: Optional[str] = None, max_bytes: int = 10 * 1024 * 1024):
+        self.path = path
+        self.backup_path = backup_path or path + ".old"
+        self.max_bytes = max_bytes
+        self._file = None
+
+    def __call__(self, line: str):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(f"{datetime.now().isoformat()} - {line}\n")
+
+    def flush(self):
+        if self._file is None:
+            return
+        self._file.flush()
+        if self._file.tell() > self.max_bytes:
+            self._file.close()
+            self._file = None
+            os.replace(self.path, self.backup_path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LogMetrics:
+    """Counts lines by their leading tag ("[ERROR]", "[FILTER PASS]", ...) for status reports."""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+
+    def __call__(self, line: str):
+        self.counts["lines"] += 1
+        start = line.find("[")
+        if start != -1 and start < 4:
+            end = line.find("]", start)
+            if end != -1:
+                self.counts[line[start + 1:end]] += 1
+        elif line.startswith("❌"):
+            self.counts["ERROR"] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return dict(self.counts)
@@ -0,0 +1,229 @@
+"""
+Decoding of new-pool transactions seen by the WebSocket listener.
+
+The listener only gets a signature. fetch_transaction() pulls that transaction as
+raw JSON-RPC and parse_new_pool() finds the pool-creation instruction in it,
+returning the pool address, both mints and the reserves the pool was seeded
+with, so a candidate can be priced before Dexscreener has indexed the pair.
+"""
+import hashlib
+import re
+import struct
+from typing import Any, Dict, Iterator, List, Optional
+
+import base58
+
+import sniper_http
+import sniper_codec
+
+RAYDIUM_AMM_V4_PROGRAM = "675kPX9MHTjRWKDhwPNV32YqUHPZBYUtDxPVyWFugyX5"
+RAYDIUM_CPMM_PROGRAM = "CPMMoo8L3F4NbTegBCKVNunggL7H1ZpdTHKxQB5qKP1C"
+# Migrations CPI into Raydium AMM v4 initialize2, so they decode as Raydium pools
+PUMPFUN_MIGRATION_PROGRAM = "39azUYFWPz3VHgKCf3VChUwbpURdCHRxjWVowf5jUJjg"
+RAYDIUM_INITIALIZE2_TAG = 1
+CPMM_INITIALIZE_DISCRIMINATOR = hashlib.sha256(b"global:initialize").digest()[:8]
+
+# Programs the listener follows with logsSubscribe
+POOL_LOG_PROGRAMS = {
+    "raydium_amm_v4": RAYDIUM_AMM_V4_PROGRAM,
+    "raydium_cpmm": RAYDIUM_CPMM_PROGRAM,
+    "pumpfun_migration": PUMPFUN_MIGRATION_PROGRAM,
+}
+# Substrings of a raw logsNotification frame that can announce a pool. The closing
+# quote keeps "Instruction: Initialize" from matching InitializeAccount/InitializeMint.
+POOL_FRAME_MARKERS = (
+    "Program log: initialize2",
+    'Program log: Instruction: Initialize"',
+    'Program log: Instruction: Migrate"',
+)
+
+WSOL_MINT = "So11111111111111111111111111111111111111112"
+USD_MINTS = {
+    "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v",  # USDC
+    "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB",  # USDT
+}
+
+# initialize2: u8 tag, u8 nonce, u64 open_time, u64 init_pc_amount, u64 init_coin_amount
+_INITIALIZE2_LAYOUT = struct.Struct("<BBQQQ")
+# Account positions inside the initialize2 instruction
+_RAYDIUM_AMM_INDEX = 4
+_RAYDIUM_COIN_MINT_INDEX = 8
+_RAYDIUM_PC_MINT_INDEX = 9
+# CPMM initialize: 8-byte discriminator, u64 init_amount_0, u64 init_amount_1, u64 open_time
+_CPMM_INITIALIZE_LAYOUT = struct.Struct("<8sQQQ")
+_CPMM_POOL_STATE_INDEX = 3
+_CPMM_TOKEN_0_MINT_INDEX = 4
+_CPMM_TOKEN_1_MINT_INDEX = 5
+
+
+_FRAME_SLOT_RE = re.compile(r'"slot":\s*(\d+)')
+
+
+def frame_slot(raw: str) -> Optional[int]:
+    """Context slot of an undecoded notification frame (it leads the frame, so the search stops early)."""
+    match = _FRAME_SLOT_RE.search(raw)
+    return int(match.group(1)) if match else None
+
+
+def frame_may_announce_pool(raw: str) -> bool:
+    """Cheap check on an undecoded WebSocket frame; only frames passing it are JSON-decoded."""
+    return any(marker in raw for marker in POOL_FRAME_MARKERS)
+
+
+def is_pool_creation_log(line: str) -> bool:
+    return (line.startswith("Program log: initialize2")
+            or line == "Program log: Instruction: Initialize"
+            or line == "Program log: Instruction: Migrate")
+
+
+def fetch_transaction(rpc_url: str, signature: str, timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+    """getTransaction as plain JSON ("json" encoding, v0 supported). None when the node does not have it yet."""
+    payload = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "getTransaction",
+        "params": [
+            signature,
+            {"encoding": "json", "commitment": "confirmed", "maxSupportedTransactionVersion": 0},
+        ],
+    }
+    resp = sniper_http.post(rpc_url, api=f"rpc:{rpc_url}", json=payload, timeout=timeout)
+    resp.raise_for_status()
+    return sniper_codec.response_json(resp).get("result")
+
+
+def account_keys(tx: Dict[str, Any]) -> List[str]:
+    """Static account keys followed by the ones loaded from address lookup tables, in index order."""
+    keys = list(tx["transaction"]["message"]["accountKeys"])
+    loaded = (tx.get("meta") or {}).get("loadedAddresses") or {}
+    keys.extend(loaded.get("writable", []))
+    keys.extend(loaded.get("readonly", []))
+    return keys
+
+
+def iter_instructions(tx: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Top-level instructions first, then CPI (inner) instructions."""
+    yield from tx["transaction"]["message"].get("instructions", [])
+    for group in (tx.get("meta") or {}).get("innerInstructions") or []:
+        yield from group.get("instructions", [])
+
+
+def token_decimals(tx: Dict[str, Any]) -> Dict[str, int]:
+    """Mint -> decimals from the token balances the transaction touched."""
+    decimals = {WSOL_MINT: 9}
+    meta = tx.get("meta") or {}
+    for balance in (meta.get("postTokenBalances") or []) + (meta.get("preTokenBalances") or []):
+        mint = balance.get("mint")
+        amount = balance.get("uiTokenAmount") or {}
+        if mint and amount.get("decimals") is not None:
+            decimals[mint] = int(amount["decimals"])
+    return decimals
+
+
+def _decode_raydium_initialize2(ix: Dict[str, Any], keys: List[str]) -> Optional[Dict[str, Any]]:
+    try:
+        data = base58.b58decode(ix.get("data", ""))
+    except ValueError:
+        return None
+    if len(data) < _INITIALIZE2_LAYOUT.size or data[0] != RAYDIUM_INITIALIZE2_TAG:
+        return None
+    accounts = ix.get("accounts", [])
+    if len(accounts) <= _RAYDIUM_PC_MINT_INDEX:
+        return None
+    _, _, open_time, pc_amount, coin_amount = _INITIALIZE2_LAYOUT.unpack_from(data)
+    return {
+        "dex": "raydium",
+        "program": RAYDIUM_AMM_V4_PROGRAM,
+        "pool": keys[accounts[_RAYDIUM_AMM_INDEX]],
+        "base_mint": keys[accounts[_RAYDIUM_COIN_MINT_INDEX]],
+        "quote_mint": keys[accounts[_RAYDIUM_PC_MINT_INDEX]],
+        "base_amount_raw": coin_amount,
+        "quote_amount_raw": pc_amount,
+        "open_time": open_time,
+    }
+
+
+def _decode_cpmm_initialize(ix: Dict[str, Any], keys: List[str]) -> Optional[Dict[str, Any]]:
+    try:
+        data = base58.b58decode(ix.get("data", ""))
+    except ValueError:
+        return None
+    if len(data) < _CPMM_INITIALIZE_LAYOUT.size or data[:8] != CPMM_INITIALIZE_DISCRIMINATOR:
+        return None
+    accounts = ix.get("accounts", [])
+    if len(accounts) <= _CPMM_TOKEN_1_MINT_INDEX:
+        return None
+    _, amount_0, amount_1, open_time = _CPMM_INITIALIZE_LAYOUT.unpack_from(data)
+    return {
+        "dex": "raydium_cpmm",
+        "program": RAYDIUM_CPMM_PROGRAM,
+        "pool": keys[accounts[_CPMM_POOL_STATE_INDEX]],
+        "base_mint": keys[accounts[_CPMM_TOKEN_0_MINT_INDEX]],
+        "quote_mint": keys[accounts[_CPMM_TOKEN_1_MINT_INDEX]],
+        "base_amount_raw": amount_0,
+        "quote_amount_raw": amount_1,
+        "open_time": open_time,
+    }
+
+
+_POOL_DECODERS = {
+    RAYDIUM_AMM_V4_PROGRAM: _decode_raydium_initialize2,
+    RAYDIUM_CPMM_PROGRAM: _decode_cpmm_initialize,
+}
+
+
+def parse_new_pool(tx: Dict[str, Any], signature: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Returns the pool created by tx, or None when it carries no recognised pool-creation instruction.
+
+    The result is oriented so base_mint is the new token and quote_mint the SOL/USD side,
+    with reserves converted to UI amounts when both decimals are known.
+    """
+    if not tx or (tx.get("meta") or {}).get("err"):
+        return None
+    keys = account_keys(tx)
+    pool = None
+    for ix in iter_instructions(tx):
+        program_index = ix.get("programIdIndex")
+        if program_index is None or program_index >= len(keys):
+            continue
+        decoder = _POOL_DECODERS.get(keys[program_index])
+        if decoder:
+            pool = decoder(ix, keys)
+            if pool:
+                break
+    if not pool:
+        return None
+
+    if pool["base_mint"] == WSOL_MINT or (pool["base_mint"] in USD_MINTS and pool["quote_mint"] != WSOL_MINT):
+        pool["base_mint"], pool["quote_mint"] = pool["quote_mint"], pool["base_mint"]
+        pool["base_amount_raw"], pool["quote_amount_raw"] = pool["quote_amount_raw"], pool["base_amount_raw"]
+
+    decimals = token_decimals(tx)
+    base_decimals = decimals.get(pool["base_mint"])
+    quote_decimals = decimals.get(pool["quote_mint"])
+    pool["base_decimals"] = base_decimals
+    pool["base_amount"] = pool["base_amount_raw"] / 10 ** base_decimals if base_decimals is not None else None
+    pool["quote_amount"] = pool["quote_amount_raw"] / 10 ** quote_decimals if quote_decimals is not None else None
+    pool["signature"] = signature
+    pool["slot"] = tx.get("slot")
+    pool["block_time"] = tx.get("blockTime")
+    return pool
+
+
+def price_pool(pool: Dict[str, Any], sol_usd: Optional[float]) -> Dict[str, float]:
+    """Spot price and liquidity implied by the seeded reserves. Zero when the quote side cannot be valued."""
+    base_amount = pool.get("base_amount") or 0
+    quote_amount = pool.get("quote_amount") or 0
+    if pool.get("quote_mint") == WSOL_MINT:
+        quote_usd = sol_usd or 0
+    elif pool.get("quote_mint") in USD_MINTS:
+        quote_usd = 1.0
+    else:
+        quote_usd = 0
+    price_native = quote_amount / base_amount if base_amount > 0 else 0.0
+    return {
+        "price_native": price_native,
+        "price_usd": price_native * quote_usd,
+        "liquidity_usd": 2 * quote_amount * quote_usd,
+    }
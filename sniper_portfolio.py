@@ -0,0 +1,222 @@
+"""
+Portfolio snapshots published by a session for readers on other threads.
+
+The bot threads mutate session.tokens and session.trades in place. Instead of
+iterating those from the Tk thread, the session calls PortfolioPublisher.publish()
+after a buy, a sell or a price pass, and readers take publisher.snapshot: an
+immutable PortfolioSnapshot whose `version` only moves when something in it
+changed. A reader that remembers the last version it rendered can skip the rest.
+
+PortfolioLedger keeps the PnL aggregates (realized and unrealized PnL, wins and
+losses, capital in open positions) up to date as positions open, reprice and
+close, so totals are O(1) however long the session has been running.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class PortfolioSnapshot:
+    """
+    One consistent view of the portfolio. Positions and trades are read-only
+    mappings; each carries a 'version' key that changes whenever that entry did.
+    """
+    version: int = 0
+    open_positions: Tuple[Mapping[str, Any], ...] = ()
+    closed_trades: Tuple[Mapping[str, Any], ...] = ()
+    realized_pnl: float = 0.0
+    unrealized_pnl: float = 0.0
+    total_pnl: float = 0.0
+    winning_trades: int = 0
+    closed_count: int = 0
+    invested_usd: float = 0.0
+    initial_balance_usd: float = 0.0
+    published_at: float = field(default_factory=time.time)
+
+
+def _num(value) -> float:
+    """float(value), with None, junk, inf and NaN counted as 0 (same rule as SniperSession.safe_float)."""
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return result if result == result and result not in (float('inf'), float('-inf')) else 0.0
+
+
+class PortfolioLedger:
+    """
+    Running PnL accounting for one session.
+
+    Each open position's contribution (capital left in it and its unrealized PnL at
+    the last known price, net of sell_fee) is stored per address, so a price tick,
+    open or close only adjusts the totals by that position's change. Closed trades
+    are added to the realized totals once, when they are recorded.
+    """
+
+    def __init__(self, sell_fee: float = 0.0):
+        self.sell_fee = sell_fee
+        self.realized_pnl = 0.0
+        self.unrealized_pnl = 0.0
+        self.invested_usd = 0.0
+        self.wins = 0
+        self.losses = 0
+        self.closed_count = 0
+        # address -> (amount_left_usd, unrealized pnl) last added to the totals
+        self._positions: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def position_pnl(self, token: Mapping[str, Any]) -> float:
+        buy_price = _num(token.get('buy_price_usd'))
+        cur_price = _num(token.get('price_usd'))
+        amount_left_usd = _num(token.get('amount_left_usd'))
+        if buy_price > 0 and cur_price > 0 and amount_left_usd > 0:
+            current_value = amount_left_usd / buy_price * cur_price * (1 - self.sell_fee)
+            return current_value - amount_left_usd
+        return 0.0
+
+    def update_position(self, token: Mapping[str, Any]):
+        """Adds a newly opened position, or re-values one after its price or size changed."""
+        if token.get('sold', False):
+            self.close_position(token.get('address'))
+            return
+        invested = _num(token.get('amount_left_usd'))
+        pnl = self.position_pnl(token)
+        with self._lock:
+            old_invested, old_pnl = self._positions.get(token.get('address'), (0.0, 0.0))
+            self._positions[token.get('address')] = (invested, pnl)
+            self.invested_usd += invested - old_invested
+            self.unrealized_pnl += pnl - old_pnl
+
+    def close_position(self, address: Optional[str], trade: Optional[Mapping[str, Any]] = None):
+        """Drops an open position from the unrealized totals and records its closing trade, if given."""
+        with self._lock:
+            invested, pnl = self._positions.pop(address, (0.0, 0.0))
+            self.invested_usd -= invested
+            self.unrealized_pnl -= pnl
+            if not self._positions:
+                # Nothing open: clear any floating-point residue from the running sums
+                self.invested_usd = 0.0
+                self.unrealized_pnl = 0.0
+        if trade is not None:
+            self.record_trade(trade)
+
+    def record_trade(self, trade: Mapping[str, Any]):
+        pnl = _num(trade.get('pnl', 0))
+        with self._lock:
+            self.realized_pnl += pnl
+            self.closed_count += 1
+            if pnl > 0:
+                self.wins += 1
+            elif pnl < 0:
+                self.losses += 1
+
+    def rebuild(self, tokens: Iterable[Mapping[str, Any]], trades: Iterable[Mapping[str, Any]]):
+        """Recomputes everything from scratch, e.g. after positions were loaded from disk."""
+        with self._lock:
+            self.realized_pnl = self.unrealized_pnl = self.invested_usd = 0.0
+            self.wins = self.losses = self.closed_count = 0
+            self._positions = {}
+        for trade in trades:
+            self.record_trade(trade)
+        for token in tokens:
+            if not token.get('sold', False):
+                self.update_position(token)
+
+    def totals(self) -> Tuple[float, float, float]:
+        """(realized_pnl, unrealized_pnl, total_pnl), the tuple calculate_total_pnl returns."""
+        with self._lock:
+            return self.realized_pnl, self.unrealized_pnl, self.realized_pnl + self.unrealized_pnl
+
+
+def _freeze(entry: Dict[str, Any], version: int) -> Mapping[str, Any]:
+    frozen = dict(entry)
+    frozen['version'] = version
+    return MappingProxyType(frozen)
+
+
+class PortfolioPublisher:
+    """
+    Builds PortfolioSnapshots, reusing the frozen copy of every position and trade
+    that did not change since the previous publish.
+
+    publish() may be called from any thread; readers only ever read `snapshot`,
+    which is replaced in a single assignment.
+    """
+
+    def __init__(self):
+        self.snapshot = PortfolioSnapshot()
+        self._version = 0
+        # address -> (plain copy used for comparison, frozen copy handed out)
+        self._positions: Dict[str, Tuple[Dict[str, Any], Mapping[str, Any]]] = {}
+        # id(trade dict) -> (that dict, frozen copy). Closed trades are not modified after they
+        # are recorded; holding the dict keeps its id from being reused while it is cached.
+        self._trades: Dict[int, Tuple[Dict[str, Any], Mapping[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, tokens: Iterable[Dict[str, Any]], trades: Iterable[Dict[str, Any]],
+                ledger: PortfolioLedger, initial_balance_usd: Optional[float]) -> PortfolioSnapshot:
+        """Publishes a new snapshot if anything changed and returns the current one."""
+        realized_pnl, unrealized_pnl, total_pnl = ledger.totals()
+        with self._lock:
+            next_version = self._version + 1
+            changed = False
+
+            open_positions = []
+            positions = {}
+            for token in tokens:
+                if token.get('sold', False):
+                    continue
+                address = token.get('address')
+                plain = dict(token)
+                cached = self._positions.get(address)
+                if cached is not None and cached[0] == plain:
+                    frozen = cached[1]
+                else:
+                    frozen = _freeze(plain, next_version)
+                    changed = True
+                positions[address] = (plain, frozen)
+                open_positions.append(frozen)
+            if positions.keys() != self._positions.keys():
+                changed = True
+            self._positions = positions
+
+            closed_trades = []
+            frozen_trades = {}
+            for trade in trades:
+                cached = self._trades.get(id(trade))
+                if cached is not None and cached[0] is trade:
+                    frozen = cached[1]
+                else:
+                    frozen = _freeze(trade, next_version)
+                    changed = True
+                frozen_trades[id(trade)] = (trade, frozen)
+                closed_trades.append(frozen)
+            if len(frozen_trades) != len(self._trades):
+                changed = True
+            self._trades = frozen_trades
+
+            totals = (realized_pnl, unrealized_pnl, total_pnl, ledger.wins, ledger.closed_count,
+                      ledger.invested_usd, initial_balance_usd or 0.0)
+            previous = self.snapshot
+            if not changed and totals == (previous.realized_pnl, previous.unrealized_pnl, previous.total_pnl,
+                                          previous.winning_trades, previous.closed_count,
+                                          previous.invested_usd, previous.initial_balance_usd):
+                return previous
+
+            self._version = next_version
+            self.snapshot = PortfolioSnapshot(
+                version=next_version,
+                open_positions=tuple(open_positions),
+                closed_trades=tuple(closed_trades),
+                realized_pnl=realized_pnl,
+                unrealized_pnl=unrealized_pnl,
+                total_pnl=total_pnl,
+                winning_trades=ledger.wins,
+                closed_count=ledger.closed_count,
+                invested_usd=ledger.invested_usd,
+                initial_balance_usd=initial_balance_usd or 0.0,
+            )
+            return self.snapshot
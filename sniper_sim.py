@@ -16,6 +16,9 @@ from mnemonic import Mnemonic
 from bip_utils import Bip39SeedGenerator, Bip44, Bip44Coins
 from typing import Optional
 import sniper_trading
+import sniper_http
+import sniper_state
+import sniper_log
 
 # ==========================================
 # === BOT CONFIGURATION ===
@@ -57,20 +60,6 @@ MAX_SEEN_TOKENS = 10000          # Maximum number of seen tokens to store
 MAX_TRADES_HISTORY = 1000        # Maximum number of trades to keep in memory
 MAX_LOG_LINES = 5000             # Maximum number of log lines to keep in memory
 
-class RateLimiter:
-    def __init__(self, calls_per_second=2):
-        self.calls_per_second = calls_per_second
-        self.last_call = datetime.now()
-        self.lock = Lock()
-
-    def wait(self):
-        with self.lock:
-            now = datetime.now()
-            time_since_last = (now - self.last_call).total_seconds()
-            if time_since_last < 1/self.calls_per_second:
-                time.sleep(1/self.calls_per_second - time_since_last)
-            self.last_call = datetime.now()
-
 class SniperSession:
     # --- CONFIG ---
     COINGECKO_SOL = "https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd"
@@ -88,8 +77,8 @@ class SniperSession:
         # Initialize locks
         self.lock = Lock()
         self.log_lock = Lock()
-        self.log_lines = []
-        self.rate_limiter = RateLimiter(calls_per_second=2)
+        self.log_lines = sniper_log.LogBuffer(MAX_LOG_LINES)
+        self.rate_limiter = sniper_http.get_limiter("coingecko")
         
         # Use global config
         self.SIMULATION_MODE = SIMULATION_MODE
@@ -164,7 +153,7 @@ class SniperSession:
         self.sol_balance = None
         self.sol_usd = None
         self.tokens = {}
-        self.seen_tokens = set()
+        self.seen_tokens = sniper_state.SeenIndex(MAX_SEEN_TOKENS)
         self.trades = []
         self.start_time = None
         self.last_price_check = 0
@@ -195,12 +184,8 @@ class SniperSession:
     def cleanup_collections(self):
         """Clean up memory-intensive collections"""
         with self.lock:
-            if len(self.seen_tokens) > MAX_SEEN_TOKENS:
-                self.seen_tokens = set(list(self.seen_tokens)[-MAX_SEEN_TOKENS:])
             if len(self.trades) > MAX_TRADES_HISTORY:
                 self.trades = self.trades[-MAX_TRADES_HISTORY:]
-            if len(self.log_lines) > MAX_LOG_LINES:
-                self.log_lines = self.log_lines[-MAX_LOG_LINES:]
 
     def get_wallet_balance(self):
         """Get wallet balance based on mode"""
@@ -222,14 +207,14 @@ class SniperSession:
     def fetch_sol_usd(self):
         """Fetch SOL/USD price with proper error handling"""
         try:
-            self.rate_limiter.wait()  # Rate limit API calls
-            resp = requests.get(self.COINGECKO_SOL, timeout=5)
+            # Paced by the shared coingecko budget, whose 429s now slow it down too
+            resp = sniper_http.get(self.COINGECKO_SOL, api="coingecko", timeout=5)
             resp.raise_for_status()
             price = float(resp.json()["solana"]["usd"])
             if price <= 0:
                 raise ValueError("Invalid SOL price")
             return price
-        except (requests.RequestException, KeyError, ValueError):
+        except (sniper_http.HTTPError, KeyError, ValueError):
             return None
 
     def position_size(self):
@@ -249,7 +234,6 @@ class SniperSession:
                 with open(self.LOG_FILE, "a", encoding="utf-8") as f:
                     f.write(f"{datetime.now().isoformat()} - {line}\n")
                 self.log_lines.append(line)
-                self.cleanup_collections()
             except IOError as e:
                 print(f"Error writing to log: {e}")
 
@@ -258,7 +242,7 @@ class SniperSession:
         with self.log_lock:
             if os.path.exists(self.LOG_FILE):
                 os.remove(self.LOG_FILE)
-            self.log_lines = []
+            self.log_lines.clear()
 
     def safe_float(self, val):
         """Safe float conversion with proper error handling"""
@@ -481,6 +465,7 @@ class SniperSession:
             # Print status every SUMMARY_INTERVAL
             if now - last_status >= self.SUMMARY_INTERVAL:
                 self.print_status()
+                self.cleanup_collections()
                 last_status = now
             
             time.sleep(0.1)  # Prevent CPU spinning
@@ -505,7 +490,6 @@ class SniperSession:
         return None
 
     def poll_dexscreener(self):
-        last_seen = set()
         last_poll_time = 0
         
         while not self.stop_threads:
@@ -534,7 +518,7 @@ class SniperSession:
                 tokens = []
                 for token in data:
                     mint = token.get('tokenAddress')
-                    if not mint or mint in self.seen_tokens or mint in last_seen:
+                    if not mint or mint in self.seen_tokens:
                         continue
                         
                     # Get pool info early to check creation time
@@ -579,7 +563,7 @@ class SniperSession:
                     
                     # Try to buy
                     self.simulate_buy(token, now)
-                    last_seen.add(mint)
+                    self.seen_tokens.add(mint)
 
                 last_poll_time = now
 
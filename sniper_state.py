@@ -0,0 +1,168 @@
+"""
+Session state shared across the polling thread, the WebSocket listener and trades.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Iterator, List, Optional, Tuple
+
+
+class SeenIndex:
+    """
+    Bounded, insertion-ordered set of token keys (mints, or "chain:address" for other chains).
+
+    add, lookup and eviction are all O(1): keys live in an OrderedDict in the order they
+    were first seen, so both the size bound (maxlen) and the optional age bound (ttl,
+    seconds) only ever evict from the front. Supports the set operations the bot used
+    on seen_tokens (add, in, len, iteration).
+
+    With a path, load() restores entries saved by save() that are still within the ttl,
+    so a restart does not re-evaluate tokens already rejected.
+    """
+
+    def __init__(self, maxlen: int = 10000, ttl: Optional[float] = None, path: Optional[str] = None):
+        self.maxlen = maxlen
+        self.ttl = ttl
+        self.path = path
+        self.dirty = False
+        self._entries: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        if self.ttl is None:
+            return
+        cutoff = now - self.ttl
+        while self._entries:
+            key, seen_at = next(iter(self._entries.items()))
+            if seen_at > cutoff:
+                break
+            self._entries.popitem(last=False)
+            self.dirty = True
+
+    def add(self, key: Hashable, now: Optional[float] = None) -> bool:
+        """Records key; returns False when it was already present (its position is kept)."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            self._expire(now)
+            if key in self._entries:
+                return False
+            self._entries[key] = now
+            while len(self._entries) > self.maxlen:
+                self._entries.popitem(last=False)
+            self.dirty = True
+            return True
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.dirty = True
+
+    def seen_at(self, key: Hashable) -> Optional[float]:
+        seen_at = self._entries.get(key)
+        if seen_at is not None and self.ttl is not None and seen_at <= time.time() - self.ttl:
+            return None
+        return seen_at
+
+    def __contains__(self, key) -> bool:
+        return self.seen_at(key) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.time())
+            return len(self._entries)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        with self._lock:
+            self._expire(time.time())
+            return iter(list(self._entries))
+
+    def load(self) -> int:
+        """Restores saved entries (oldest first) and returns how many were kept."""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        with self._lock:
+            for key, seen_at in saved:
+                self._entries[key] = float(seen_at)
+                self._entries.move_to_end(key)
+            self._expire(time.time())
+            while len(self._entries) > self.maxlen:
+                self._entries.popitem(last=False)
+            self.dirty = False
+            return len(self._entries)
+
+    def save(self):
+        """Writes the index to path (via a temp file, so a crash never leaves it half-written)."""
+        if not self.path:
+            return
+        with self._lock:
+            self._expire(time.time())
+            entries = list(self._entries.items())
+            self.dirty = False
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+
+
+class PendingIndex:
+    """
+    Keys waiting on data from elsewhere (mints Dexscreener has not indexed yet), each with
+    the item needed to evaluate it once that data exists.
+
+    Entries expire ttl seconds after they were added, and past maxlen the oldest are
+    evicted, so something that never resolves stops being retried. Adding a key that is
+    already pending keeps its original expiry.
+    """
+
+    def __init__(self, maxlen: int = 500, ttl: float = 300.0):
+        self.maxlen = maxlen
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        cutoff = now - self.ttl
+        while self._entries:
+            added_at, _ = next(iter(self._entries.values()))
+            if added_at > cutoff:
+                break
+            self._entries.popitem(last=False)
+
+    def add(self, key: Hashable, item, now: Optional[float] = None) -> bool:
+        now = now if now is not None else time.time()
+        with self._lock:
+            self._expire(now)
+            if key in self._entries:
+                return False
+            self._entries[key] = (now, item)
+            while len(self._entries) > self.maxlen:
+                self._entries.popitem(last=False)
+            return True
+
+    def pop(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return entry[1] if entry is not None else default
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def items(self, now: Optional[float] = None) -> List[Tuple[Hashable, object]]:
+        """Live (key, item) pairs, oldest first."""
+        with self._lock:
+            self._expire(now if now is not None else time.time())
+            return [(key, item) for key, (_, item) in self._entries.items()]
+
+    def __contains__(self, key) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.time() - self.ttl
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.time())
+            return len(self._entries)
@@ -2,7 +2,6 @@ import asyncio
 from typing import Optional, Dict, Any, List
 import traceback
 import threading
-import requests
 import json
 import base64
 import logging
@@ -12,6 +11,13 @@ import re
 import sys
 import time
 import base58
+import ssl
+import certifi
+import websockets
+import sniper_http
+import sniper_codec
+import sniper_state
+import sniper_log
 
 # Import winsound for Windows beep functionality
 try:
@@ -24,6 +30,8 @@ from solders.commitment_config import CommitmentLevel
 from solders.transaction import VersionedTransaction, Transaction
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus
 from solana.rpc.api import Client
 from solana.rpc.types import TxOpts
 from solders.system_program import transfer, TransferParams
@@ -35,73 +43,301 @@ from spl.token.instructions import get_associated_token_address, create_associat
 # Use string-based commitment level for compatibility
 COMMITMENT_CONFIRMED = "confirmed"  # Standard commitment level string
 
-# SECOND_EDIT: helper function to send and confirm VersionedTransaction using current solana-py API
-async def _send_and_confirm_tx(self, transaction: VersionedTransaction) -> bool:
-    """Send the given transaction and wait for confirmation.
+SIGNATURE_CONFIRM_TIMEOUT = 30          # Seconds to wait for a sent transaction to confirm
+SIGNATURE_POLL_INTERVAL = 2.0           # getSignatureStatuses cadence while a WebSocket subscription is live
+SIGNATURE_POLL_FALLBACK_INTERVAL = 0.4  # Cadence (about one slot) when no subscription could be opened
+SIGNATURE_WS_RETRY_DELAY = 5.0          # Seconds before reopening the subscription socket after a failed connect
+
+
+class SignatureConfirmer:
+    """Confirms transactions from signatureSubscribe notifications.
+
+    One WebSocket per confirmer is opened on first use and kept open. Every
+    pending signature is subscribed over it, with replies matched by request id
+    and notifications by subscription id, so a buy or sell resolves as soon as
+    the RPC node reports it at the requested commitment without paying for a
+    TLS handshake per trade. If the socket drops it is reopened by the next
+    confirm() (at most every SIGNATURE_WS_RETRY_DELAY seconds).
+    A single background task polls getSignatureStatuses for all pending
+    signatures in one batched call as the fallback, at a fast cadence whenever
+    a signature has no live subscription.
 
-    Returns True on success, False otherwise.
+    confirm() returns True when the transaction landed without error, False when
+    it landed with an error, and None when it did not confirm within the timeout.
     """
-    try:
-        self.log(f"[DEBUG] Transaction message: {transaction.message if hasattr(transaction, 'message') else 'N/A'}")
-        self.log(f"[DEBUG] Transaction signatures before send: {[str(s) for s in transaction.signatures]}")
-        
-        # For Trojan bot wallets, we need to send raw transaction bytes
-        raw_tx = bytes(transaction)
-        
-        # Send without duplicate opts parameter
-        resp = self.client.send_raw_transaction(raw_tx)
-        
-        if not resp.value:
-            self.log(f"❌ Unexpected response from send_raw_transaction: {resp}")
-            return False
-            
-        signature = resp.value
-        self.log(f"[DEBUG] Transaction sent with signature: {signature}")
-        
-        # Use string-based commitment for compatibility
-        conf = self.client.confirm_transaction(signature, commitment="confirmed")
-        if conf and conf.value:
-            self.log(f"[DEBUG] Transaction confirmed with status: {conf.value}")
+
+    def __init__(self, client, ws_url: Optional[str] = None, logger=None, commitment: str = COMMITMENT_CONFIRMED):
+        self.client = client
+        self.ws_url = ws_url
+        self.logger = logger
+        self.commitment = commitment
+        self._loop = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._subscribed: set = set()
+        self._poll_task = None
+        self._reset_ws()
+
+    def _reset_ws(self):
+        self._ws = None
+        self._ws_lock = asyncio.Lock()
+        self._ws_failed_at = 0.0
+        self._next_id = 1
+        self._requests: Dict[int, str] = {}       # request id -> signature awaiting its subscription id
+        self._subscriptions: Dict[int, str] = {}  # subscription id -> signature
+        self._sub_ids: Dict[str, int] = {}        # signature -> subscription id
+
+    def _log(self, msg):
+        if self.logger:
+            self.logger(msg)
+        else:
+            print(msg)
+
+    async def confirm(self, signature, timeout: float = SIGNATURE_CONFIRM_TIMEOUT) -> Optional[bool]:
+        sig = str(signature)
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Futures, tasks and the socket are bound to the loop that created them
+            self._loop = loop
+            self._pending = {}
+            self._subscribed = set()
+            self._poll_task = None
+            self._reset_ws()
+        future = self._pending.get(sig)
+        if future is None:
+            future = loop.create_future()
+            self._pending[sig] = future
+        if self._poll_task is None or self._poll_task.done():
+            self._poll_task = loop.create_task(self._poll_statuses())
+        loop.create_task(self._subscribe(sig))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self._log(f"❌ Confirmation timeout for tx {sig} after {timeout}s")
+            return None
+        finally:
+            self._pending.pop(sig, None)
+            self._unsubscribe(sig)
+
+    def _resolve(self, sig: str, ok: bool):
+        future = self._pending.get(sig)
+        if future is not None and not future.done():
+            future.set_result(ok)
+
+    async def _open_ws(self):
+        """The shared subscription socket, connecting it if needed. None when it cannot be opened."""
+        if self._ws is not None:
+            return self._ws
+        async with self._ws_lock:
+            if self._ws is None and time.time() - self._ws_failed_at >= SIGNATURE_WS_RETRY_DELAY:
+                try:
+                    ssl_context = ssl.create_default_context(cafile=certifi.where()) if self.ws_url.startswith("wss") else None
+                    ws = await websockets.connect(self.ws_url, ssl=ssl_context, ping_interval=20, ping_timeout=20)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self._ws_failed_at = time.time()
+                    self._log(f"[DEBUG] signatureSubscribe unavailable: {e}. Falling back to status polling.")
+                    return None
+                self._ws = ws
+                asyncio.get_running_loop().create_task(self._read_ws(ws))
+        return self._ws
+
+    def _request_id(self) -> int:
+        req_id = self._next_id
+        self._next_id += 1
+        return req_id
+
+    async def _send(self, ws, request: Dict[str, Any]) -> bool:
+        try:
+            await ws.send(sniper_codec.dumps(request))
             return True
-        
-        self.log(f"❌ Transaction failed to confirm: {conf}")
-        return False
-        
-    except Exception as exc:
-        self.log(f"❌ Error sending/confirming transaction: {exc}\n{traceback.format_exc()}")
-        return False
+        except Exception as e:
+            self._log(f"[DEBUG] {request['method']} send failed: {e}")
+            return False
 
-# THIRD_EDIT: add constant and helper for sending transactions with current solana-py API
-async def _send_and_confirm_tx(self, transaction: VersionedTransaction) -> bool:
-    """Send the given transaction and wait for confirmation.
+    async def _subscribe(self, sig: str):
+        if not self.ws_url:
+            return
+        ws = await self._open_ws()
+        if ws is None or sig not in self._pending:
+            return
+        req_id = self._request_id()
+        self._requests[req_id] = sig
+        request = {
+            "jsonrpc": "2.0",
+            "id": req_id,
+            "method": "signatureSubscribe",
+            "params": [sig, {"commitment": self.commitment}],
+        }
+        if not await self._send(ws, request):
+            self._requests.pop(req_id, None)
 
-    Returns True on success, False otherwise.
-    """
-    try:
-        raw_tx = bytes(transaction) if isinstance(transaction, VersionedTransaction) else transaction.serialize()
-        resp = self.client.send_raw_transaction(raw_tx)
-        signature = getattr(resp, "value", None) if hasattr(resp, "value") else resp.get("result")
-        if not signature:
-            self.log(f"❌ Unexpected response from send_raw_transaction: {resp}")
+    def _unsubscribe(self, sig: str):
+        """Drops sig's subscription, if it has one, once its confirm() has returned."""
+        self._subscribed.discard(sig)
+        sub_id = self._sub_ids.pop(sig, None)
+        if sub_id is None:
+            return
+        self._subscriptions.pop(sub_id, None)
+        if self._ws is not None and self._loop is not None:
+            self._loop.create_task(self._send(self._ws, {
+                "jsonrpc": "2.0",
+                "id": self._request_id(),
+                "method": "signatureUnsubscribe",
+                "params": [sub_id],
+            }))
+
+    async def _read_ws(self, ws):
+        """Routes subscription replies and notifications on ws until it closes."""
+        try:
+            async for message in ws:
+                data = sniper_codec.loads(message)
+                req_id = data.get('id')
+                if req_id is not None:
+                    # Replies to signatureUnsubscribe are not tracked and fall through here
+                    sig = self._requests.pop(req_id, None)
+                    if sig is None:
+                        continue
+                    if 'result' not in data:
+                        self._log(f"[DEBUG] signatureSubscribe rejected for {sig[:8]}...: {data.get('error')}")
+                        continue
+                    self._subscriptions[data['result']] = sig
+                    self._sub_ids[sig] = data['result']
+                    if sig in self._pending:
+                        self._subscribed.add(sig)
+                    else:
+                        # confirm() already returned while the subscription was in flight
+                        self._unsubscribe(sig)
+                elif data.get('method') == 'signatureNotification':
+                    params = data.get('params') or {}
+                    # The node drops a signature subscription after its notification
+                    sig = self._subscriptions.pop(params.get('subscription'), None)
+                    if sig is None:
+                        continue
+                    self._sub_ids.pop(sig, None)
+                    self._subscribed.discard(sig)
+                    value = (params.get('result') or {}).get('value')
+                    if isinstance(value, dict):
+                        if value.get('err') is not None:
+                            self._log(f"❌ Transaction {sig} failed on-chain: {value['err']}")
+                        self._resolve(sig, value.get('err') is None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._log(f"[DEBUG] signatureSubscribe connection lost: {e}. Falling back to status polling.")
+        finally:
+            if self._ws is ws:
+                # Pending signatures lose their subscriptions and are polled until the next confirm() reconnects
+                self._ws = None
+                self._requests.clear()
+                self._subscriptions.clear()
+                self._sub_ids.clear()
+                self._subscribed.clear()
+            try:
+                await ws.close()
+            except Exception:
+                pass
+
+    async def _poll_statuses(self):
+        while self._pending:
+            live = all(sig in self._subscribed for sig in self._pending)
+            await asyncio.sleep(SIGNATURE_POLL_INTERVAL if live else SIGNATURE_POLL_FALLBACK_INTERVAL)
+            sigs = [sig for sig, future in list(self._pending.items()) if not future.done()]
+            if not sigs:
+                continue
+            try:
+                resp = await asyncio.to_thread(
+                    self.client.get_signature_statuses, [Signature.from_string(sig) for sig in sigs]
+                )
+            except Exception as e:
+                self._log(f"[DEBUG] getSignatureStatuses failed: {e}")
+                continue
+            for sig, status in zip(sigs, getattr(resp, "value", None) or []):
+                if status is None:
+                    continue
+                if status.err is not None:
+                    self._log(f"❌ Transaction {sig} failed on-chain: {status.err}")
+                    self._resolve(sig, False)
+                elif status.confirmation_status in (TransactionConfirmationStatus.Confirmed, TransactionConfirmationStatus.Finalized):
+                    self._resolve(sig, True)
+
+
+def get_recent_blockhash(self):
+    """Blockhash for a locally built transaction: from the client's prefetch cache when it keeps one."""
+    if hasattr(self.client, 'get_cached_blockhash'):
+        return self.client.get_cached_blockhash()[0]
+    return self.client.get_latest_blockhash(commitment=COMMITMENT_CONFIRMED).value.blockhash
+
+
+def send_signed_transaction(self, raw_tx: bytes):
+    """Submits signed swap bytes, fanned out to every endpoint when the session broadcasts sends."""
+    if getattr(self, 'BROADCAST_SENDS', False) and hasattr(self.client, 'broadcast_raw_transaction'):
+        resp = self.client.broadcast_raw_transaction(raw_tx)
+        self.log(f"[SEND] Broadcast accepted first by {self.client.send_endpoint(getattr(resp, 'value', None))}")
+        return resp
+    return self.client.send_raw_transaction(raw_tx)
+
+
+def confirm_signature(self, signature, timeout: float = SIGNATURE_CONFIRM_TIMEOUT):
+    """Awaitable confirmation through the session's SignatureConfirmer (created on first use)."""
+    confirmer = getattr(self, 'signature_confirmer', None)
+    if confirmer is None:
+        rpc_url = getattr(self, 'RPC_URL', None)
+        ws_url = self._get_websocket_url(rpc_url) if rpc_url and hasattr(self, '_get_websocket_url') else None
+        confirmer = SignatureConfirmer(self.client, ws_url, logger=self.log)
+        self.signature_confirmer = confirmer
+    return confirmer.confirm(signature, timeout)
+
+
+def claim_mint(self, mint: str) -> bool:
+    """Marks a trade for mint as in flight. False when one already is, so a token is never double-traded."""
+    with self.trade_lock:
+        if mint in self.inflight_mints:
             return False
-        self.log(f"⏳ Submitted tx {signature}. Waiting for confirmation…")
-        # Poll for confirmation (max 30 s)
-        timeout = 30
-        for _ in range(timeout):
-            conf = self.client.confirm_transaction(signature, commitment=COMMITMENT_CONFIRMED)
-            conf_val = getattr(conf, "value", conf.get("result", {}))
-            if conf_val and conf_val.get("err") is None:
-                self.log("✅ Jupiter swap transaction confirmed.")
-                return True
-            await asyncio.sleep(1)
-        self.log(f"❌ Confirmation timeout for tx {signature}. Last status: {conf}")
-        return False
-    except Exception as exc:
-        self.log(f"❌ Error sending/confirming transaction: {exc}\n{traceback.format_exc()}")
-        return False
+        self.inflight_mints.add(mint)
+        return True
+
+
+def release_mint(self, mint: str):
+    with self.trade_lock:
+        self.inflight_mints.discard(mint)
+
+
+def reserve_sol(self, sol_amount: float, wallet_balance: Optional[float] = None) -> bool:
+    """Sets SOL aside for a buy before it is sent, so concurrent buys cannot spend the same balance."""
+    with self.buy_lock:
+        available = self.sol_balance - self.reserved_sol
+        if wallet_balance is not None:
+            available = min(available, wallet_balance - self.reserved_sol)
+        if sol_amount > available:
+            return False
+        self.reserved_sol += sol_amount
+        return True
+
+
+def release_sol(self, sol_amount: float, spent: bool = False):
+    """Returns a reservation; a simulated buy that went through is deducted from sol_balance."""
+    with self.buy_lock:
+        self.reserved_sol = max(0.0, self.reserved_sol - sol_amount)
+        if spent and self.SIMULATION_MODE:
+            self.sol_balance -= sol_amount
 
 # --- BUY/SELL LOGIC FROM sniper_bot.py ---
 
+def log_swap_debug(self, txn, signer_index: int, side: str) -> None:
+    """Dumps a signed Jupiter swap. Only called with TRADE debug logging on: formatting the transaction is slow."""
+    self.log(f"\n=== Jupiter Swap Transaction Debug ({side}) ===")
+    self.log(f"Decoded transaction: {txn}")
+    self.log(f"Message: {txn.message}")
+    self.log(f"signer_index: {signer_index}")
+    self.log(f"account_keys[signer_index]: {txn.message.account_keys[signer_index]}")
+    self.log(f"keypair pubkey: {self.keypair.pubkey()}")
+    self.log(f"num_required_signatures: {txn.message.header.num_required_signatures}")
+    for i, sig in enumerate(txn.signatures):
+        self.log(f"  [{i}] {sig}")
+    self.log("=== End Debug ===\n")
+
+
 async def execute_buy_token(self, token_mint_address: str, amount_to_spend_sol: float, pool_info: Dict[str, Any]) -> bool:
     self.log(f"[BUY] Called with token_mint_address={token_mint_address}, amount_to_spend_sol={amount_to_spend_sol}, pool_info_keys={list(pool_info.keys()) if pool_info else None}")
     if self.SIMULATION_MODE:
@@ -112,7 +348,7 @@ async def execute_buy_token(self, token_mint_address: str, amount_to_spend_sol:
     output_mint = token_mint_address
     # 0. Check SOL balance before proceeding
     try:
-        balance_resp = self.client.get_balance(self.keypair.pubkey())
+        balance_resp = await asyncio.to_thread(self.client.get_balance, self.keypair.pubkey())
         sol_balance = int(getattr(balance_resp, "value", 0))
         self.log(f"Wallet balance: {sol_balance} lamports ({sol_balance/1e9} SOL)")
         if sol_balance < amount_sol_lamports:
@@ -128,7 +364,7 @@ async def execute_buy_token(self, token_mint_address: str, amount_to_spend_sol:
         owner = self.keypair.pubkey()
         mint = Pubkey.from_string(output_mint) if isinstance(output_mint, str) else output_mint
         ata = get_associated_token_address(owner, mint)
-        ata_info = self.client.get_account_info(ata)
+        ata_info = await asyncio.to_thread(self.client.get_account_info, ata)
         has_ata = ata_info and ata_info.get('result', {}).get('value') is not None
         if not has_ata:
             # Estimate ATA creation cost (approx 0.0021 SOL)
@@ -145,7 +381,7 @@ async def execute_buy_token(self, token_mint_address: str, amount_to_spend_sol:
         self.log(f"Attempting Jupiter buy for {token_mint_address[:8]}... (Attempt {attempt}/3)")
         slippage_bps = getattr(self, 'DEFAULT_SLIPPAGE_BPS', 100)
         try:
-            quote_response = self._get_jupiter_quote(input_mint, output_mint, amount_sol_lamports, slippage_bps)
+            quote_response = await asyncio.to_thread(self._get_jupiter_quote, input_mint, output_mint, amount_sol_lamports, slippage_bps)
             self.log(f"[BUY] Quote outAmount={quote_response.get('outAmount') if quote_response else 'N/A'}, priceImpactPct={quote_response.get('priceImpactPct') if quote_response else 'N/A'}")
             if not quote_response or 'routePlan' not in quote_response:
                 self.log(f"ERROR: No valid route found for swap or Jupiter API error.")
@@ -154,7 +390,7 @@ async def execute_buy_token(self, token_mint_address: str, amount_to_spend_sol:
             self.log(f"ERROR: Failed to fetch quote from Jupiter: {e}")
             continue
         try:
-            raw_transaction_bytes = self._get_jupiter_swap_transaction_raw(quote_response)
+            raw_transaction_bytes = await asyncio.to_thread(self._get_jupiter_swap_transaction_raw, quote_response)
             self.log(f"[BUY] Jupiter tx bytes length: {len(raw_transaction_bytes) if raw_transaction_bytes else 0}")
             if not raw_transaction_bytes:
                 self.log(f"ERROR: No swapTransaction in Jupiter response. Full response: {raw_transaction_bytes}")
@@ -162,17 +398,9 @@ async def execute_buy_token(self, token_mint_address: str, amount_to_spend_sol:
             swap_transaction_bytes = decode_base64_with_padding(raw_transaction_bytes)
             try:
                 txn = VersionedTransaction.from_bytes(swap_transaction_bytes)
-                self.log("\n=== Jupiter Swap Transaction Debug ===")
-                self.log(f"Decoded transaction: {txn}")
             except Exception as e:
                 self.log(f"ERROR: Failed to decode transaction: {e}. Full Jupiter swap response: {raw_transaction_bytes}")
                 continue
-            self.log("\n--- Signature Debug ---")
-            self.log("Signatures before signing:")
-            for i, sig in enumerate(txn.signatures):
-                self.log(f"  [{i}] {sig}")
-            self.log(f"Message: {txn.message}")
-            self.log(f"Your public key: {self.keypair.pubkey()}")
             my_pk = self.keypair.pubkey()
             try:
                 signer_index = list(txn.message.account_keys).index(my_pk)
@@ -182,23 +410,20 @@ async def execute_buy_token(self, token_mint_address: str, amount_to_spend_sol:
             from solders.message import to_bytes_versioned
             msg_bytes = to_bytes_versioned(txn.message)
             sig = self.keypair.sign_message(msg_bytes)
-            self.log(f"type(sig): {type(sig)}")
             txn.signatures = [sig] + txn.signatures[1:]
-            self.log("Signatures after signing:")
-            for i, sig in enumerate(txn.signatures):
-                self.log(f"  [{i}] {sig}")
-            self.log("=== End Debug ===\n")
-            self.log(f"signer_index: {signer_index}")
-            self.log(f"account_keys[signer_index]: {txn.message.account_keys[signer_index]}")
-            self.log(f"keypair pubkey: {self.keypair.pubkey()}")
-            self.log(f"num_required_signatures: {txn.message.header.num_required_signatures}")
-            self.log(f"signatures: {txn.signatures}")
+            if self.logger.enabled("TRADE", sniper_log.DEBUG):
+                log_swap_debug(self, txn, signer_index, "BUY")
             signed_txn_bytes = bytes(txn)
             self.log("Sending transaction to mainnet...")
-            send_resp = self.client.send_raw_transaction(signed_txn_bytes)
+            send_resp = await asyncio.to_thread(send_signed_transaction, self, signed_txn_bytes)
             signature = getattr(send_resp, "value", send_resp)
             self.log(f"Signature: {signature}")
-            if signature:
+            confirmed = await confirm_signature(self, signature) if signature else False
+            if confirmed is None:
+                # The swap may still land; retrying could buy/sell twice
+                self.log(f"❌ Jupiter swap not confirmed within timeout. Not retrying to avoid a duplicate swap.")
+                return False
+            if confirmed:
                 self.log("✅ Jupiter swap transaction confirmed.")
                 try:
                     if sys.platform == 'win32' and winsound:
@@ -242,7 +467,7 @@ async def execute_sell_token(self, token_mint_address: str, amount_tokens_to_sel
     try:
         from spl.token.instructions import get_associated_token_address
         ata = get_associated_token_address(self.keypair.pubkey(), Pubkey.from_string(token_mint_address) if isinstance(token_mint_address, str) else token_mint_address)
-        token_balance_resp = self.client.get_token_account_balance(ata)
+        token_balance_resp = await asyncio.to_thread(self.client.get_token_account_balance, ata)
         token_balance = float(token_balance_resp['result']['value']['amount'])
         self.log(f"Token balance: {token_balance} (raw amount)")
         if token_balance < amount_tokens_to_sell:
@@ -259,7 +484,7 @@ async def execute_sell_token(self, token_mint_address: str, amount_tokens_to_sel
         self.log(f"Attempting Jupiter sell for {token_mint_address[:8]}... (Attempt {attempt}/3)")
         slippage_bps = getattr(self, 'DEFAULT_SLIPPAGE_BPS', 100)
         try:
-            quote_response = self._get_jupiter_quote(input_mint, output_mint, amount_token_atomic, slippage_bps)
+            quote_response = await asyncio.to_thread(self._get_jupiter_quote, input_mint, output_mint, amount_token_atomic, slippage_bps)
             self.log(f"[SELL] Quote outAmount={quote_response.get('outAmount') if quote_response else 'N/A'}, priceImpactPct={quote_response.get('priceImpactPct') if quote_response else 'N/A'}")
             if not quote_response or 'routePlan' not in quote_response:
                 self.log(f"ERROR: No valid route found for swap or Jupiter API error.")
@@ -268,7 +493,7 @@ async def execute_sell_token(self, token_mint_address: str, amount_tokens_to_sel
             self.log(f"ERROR: Failed to fetch quote from Jupiter: {e}")
             continue
         try:
-            raw_transaction_bytes = self._get_jupiter_swap_transaction_raw(quote_response)
+            raw_transaction_bytes = await asyncio.to_thread(self._get_jupiter_swap_transaction_raw, quote_response)
             self.log(f"[SELL] Jupiter tx bytes length: {len(raw_transaction_bytes) if raw_transaction_bytes else 0}")
             if not raw_transaction_bytes:
                 self.log(f"ERROR: No swapTransaction in Jupiter response.")
@@ -276,17 +501,9 @@ async def execute_sell_token(self, token_mint_address: str, amount_tokens_to_sel
             swap_transaction_bytes = base64.b64decode(raw_transaction_bytes)
             try:
                 txn = VersionedTransaction.from_bytes(swap_transaction_bytes)
-                self.log("\n=== Jupiter Swap Transaction Debug (SELL) ===")
-                self.log(f"Decoded transaction: {txn}")
             except Exception as e:
                 self.log(f"ERROR: Failed to decode transaction: {e}. Full Jupiter swap response: {raw_transaction_bytes}")
                 continue
-            self.log("\n--- Signature Debug ---")
-            self.log("Signatures before signing:")
-            for i, sig in enumerate(txn.signatures):
-                self.log(f"  [{i}] {sig}")
-            self.log(f"Message: {txn.message}")
-            self.log(f"Your public key: {self.keypair.pubkey()}")
             my_pk = self.keypair.pubkey()
             try:
                 signer_index = list(txn.message.account_keys).index(my_pk)
@@ -296,23 +513,20 @@ async def execute_sell_token(self, token_mint_address: str, amount_tokens_to_sel
             from solders.message import to_bytes_versioned
             msg_bytes = to_bytes_versioned(txn.message)
             sig = self.keypair.sign_message(msg_bytes)
-            self.log(f"type(sig): {type(sig)}")
             txn.signatures = [sig] + txn.signatures[1:]
-            self.log("Signatures after signing:")
-            for i, sig in enumerate(txn.signatures):
-                self.log(f"  [{i}] {sig}")
-            self.log("=== End Debug ===\n")
-            self.log(f"signer_index: {signer_index}")
-            self.log(f"account_keys[signer_index]: {txn.message.account_keys[signer_index]}")
-            self.log(f"keypair pubkey: {self.keypair.pubkey()}")
-            self.log(f"num_required_signatures: {txn.message.header.num_required_signatures}")
-            self.log(f"signatures: {txn.signatures}")
+            if self.logger.enabled("TRADE", sniper_log.DEBUG):
+                log_swap_debug(self, txn, signer_index, "SELL")
             signed_txn_bytes = bytes(txn)
             self.log("Sending transaction to mainnet...")
-            send_resp = self.client.send_raw_transaction(signed_txn_bytes)
+            send_resp = await asyncio.to_thread(send_signed_transaction, self, signed_txn_bytes)
             signature = getattr(send_resp, "value", send_resp)
             self.log(f"Signature: {signature}")
-            if signature:
+            confirmed = await confirm_signature(self, signature) if signature else False
+            if confirmed is None:
+                # The swap may still land; retrying could buy/sell twice
+                self.log(f"❌ Jupiter swap not confirmed within timeout (SELL). Not retrying to avoid a duplicate swap.")
+                return False
+            if confirmed:
                 self.log("✅ Jupiter swap transaction confirmed (SELL).")
                 try:
                     if sys.platform == 'win32' and winsound:
@@ -357,7 +571,8 @@ class SniperSession:
     def __init__(self, *args, **kwargs):
         self.keypair: Optional[Keypair] = None
         self.client: Any = None  # RPC client
-        self.seen_tokens: set = set()  # Use set for .add()
+        self.seen_tokens = sniper_state.SeenIndex()
+        self.logger = sniper_log.Logger(self.log)
         # Add default filter attributes (copy from sniper_bot.py or set reasonable defaults)
         self.MAX_PRICE_USD = 10.0
         self.MIN_LIQUIDITY_USD = 100.0
@@ -373,7 +588,10 @@ class SniperSession:
         self.BUY_FEE = 0.005
         self.sol_usd = 0.0
         import threading
-        self.buy_lock = threading.Lock()
+        self.buy_lock = threading.Lock()  # Guards sol_balance and reserved_sol
+        self.trade_lock = threading.Lock()
+        self.inflight_mints = set()
+        self.reserved_sol = 0.0
         self.SIMULATION_MODE = False
         self.tokens = {}
         self.watched_tokens = set()
@@ -398,21 +616,10 @@ class SniperSession:
             signature = resp.value
             self.log(f"[DEBUG] Transaction sent with signature: {signature}")
             
-            # Add retry logic for confirmation
-            for attempt in range(3):
-                try:
-                    conf = self.client.confirm_transaction(signature, commitment="COMMITMENT_CONFIRMED")
-                    if conf and conf.value:
-                        self.log(f"[DEBUG] Transaction confirmed on attempt {attempt + 1}")
-                        return True
-                    self.log(f"[DEBUG] Confirmation attempt {attempt + 1} failed, retrying...")
-                    await asyncio.sleep(1)
-                except Exception as e:
-                    self.log(f"[DEBUG] Confirmation error on attempt {attempt + 1}: {e}")
-                    if attempt < 2:  # Don't sleep on last attempt
-                        await asyncio.sleep(1)
-            
-            self.log("❌ Transaction failed to confirm after 3 attempts")
+            if await confirm_signature(self, signature):
+                self.log(f"[DEBUG] Transaction confirmed: {signature}")
+                return True
+            self.log("❌ Transaction failed to confirm")
             return False
             
         except Exception as exc:
@@ -423,11 +630,26 @@ class SniperSession:
         """Log a message. To be implemented by subclasses."""
         pass
 
+    def run_coroutine(self, coro, timeout=None):
+        """Run a coroutine to completion. Subclasses route this onto their session event loop."""
+        return asyncio.run(coro)
+
     async def fetch_dexscreener_pool(self, address: str) -> Optional[Dict[str, Any]]:
         """Fetch pool info from DexScreener. To be implemented by subclasses."""
         pass
 
     def simulate_buy(self, token, now, from_watchlist=False, force=False):
+        mint = token.get('mint') or token.get('address') or token.get('tokenAddress')
+        if mint and not claim_mint(self, mint):
+            self.log(f"[INFO] A trade for {mint} is already in flight, skipping duplicate buy.")
+            return False
+        try:
+            return self._simulate_buy_claimed(token, now, from_watchlist, force)
+        finally:
+            if mint:
+                release_mint(self, mint)
+
+    def _simulate_buy_claimed(self, token, now, from_watchlist=False, force=False):
         if not force:
             mint = token.get('mint') or token.get('address') or token.get('tokenAddress')
             if mint:
@@ -443,54 +665,54 @@ class SniperSession:
             return False
         name = token.get('name', '') or token.get('description', '')
         symbol = token.get('symbol', '')
-        self.log(f"[DEBUG BUY FILTER] Checking filters for {name} ({symbol}) - Mint: {mint}")
+        self.logger.info("FILTER", "[DEBUG BUY FILTER] Checking filters for {} ({}) - Mint: {}", name, symbol, mint)
         buy_price = self.safe_float(token.get('price_usd'))
         if buy_price == 0:
-            self.log(f"❌ [FILTER FAILED] No price data (price_usd=0) for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] No price data (price_usd=0) for {} ({})", name, symbol)
             return False
         if buy_price > self.MAX_PRICE_USD:
-            self.log(f"❌ [FILTER FAILED] Price ${buy_price:.8f} > Max ${self.MAX_PRICE_USD:.8f} for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Price ${:.8f} > Max ${:.8f} for {} ({})", buy_price, self.MAX_PRICE_USD, name, symbol)
             return False
         else:
-            self.log(f"[FILTER PASS] Price ${buy_price:.8f} ≤ Max ${self.MAX_PRICE_USD:.8f}")
+            self.logger.debug("FILTER", "[FILTER PASS] Price ${:.8f} ≤ Max ${:.8f}", buy_price, self.MAX_PRICE_USD)
         liquidity = self.safe_float(token.get('liquidity_usd'))
         if liquidity < self.MIN_LIQUIDITY_USD:
-            self.log(f"❌ [FILTER FAILED] Low liquidity (${liquidity:.2f} < ${self.MIN_LIQUIDITY_USD:.2f}) for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Low liquidity (${:.2f} < ${:.2f}) for {} ({})", liquidity, self.MIN_LIQUIDITY_USD, name, symbol)
             return False
         else:
-            self.log(f"[FILTER PASS] Liquidity ${liquidity:,.2f} ≥ Min ${self.MIN_LIQUIDITY_USD:,.2f}")
+            self.logger.debug("FILTER", "[FILTER PASS] Liquidity ${:,.2f} ≥ Min ${:,.2f}", liquidity, self.MIN_LIQUIDITY_USD)
         volume_5m = self.safe_float(token.get('volume_m5'))
         if volume_5m < self.MIN_VOLUME_5M_USD:
-            self.log(f"❌ [FILTER FAILED] Low 5m volume (${volume_5m:.2f} < ${self.MIN_VOLUME_5M_USD:.2f}) for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Low 5m volume (${:.2f} < ${:.2f}) for {} ({})", volume_5m, self.MIN_VOLUME_5M_USD, name, symbol)
             return False
         else:
-            self.log(f"[FILTER PASS] 5m Volume ${volume_5m:,.2f} ≥ Min ${self.MIN_VOLUME_5M_USD:,.2f}")
+            self.logger.debug("FILTER", "[FILTER PASS] 5m Volume ${:,.2f} ≥ Min ${:,.2f}", volume_5m, self.MIN_VOLUME_5M_USD)
         buys_5m = self.safe_float(token.get('txns_m5_buys'))
         sells_5m = self.safe_float(token.get('txns_m5_sells'))
         buy_sell_ratio = buys_5m / sells_5m if sells_5m > 0 else float('inf')
         if buys_5m < self.MIN_BUYS_5M:
-            self.log(f"❌ [FILTER FAILED] Not enough 5m buys ({buys_5m} < {self.MIN_BUYS_5M}) for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Not enough 5m buys ({} < {}) for {} ({})", buys_5m, self.MIN_BUYS_5M, name, symbol)
             return False
         else:
-            self.log(f"[FILTER PASS] 5m Buys {buys_5m} ≥ Min {self.MIN_BUYS_5M}")
+            self.logger.debug("FILTER", "[FILTER PASS] 5m Buys {} ≥ Min {}", buys_5m, self.MIN_BUYS_5M)
         if sells_5m > 0 and buy_sell_ratio < self.MIN_BUY_TX_RATIO:
-            self.log(f"❌ [FILTER FAILED] Low buy/sell ratio ({buy_sell_ratio:.2f} < {self.MIN_BUY_TX_RATIO:.2f}) for {name} ({symbol}) (Buys: {buys_5m}, Sells: {sells_5m})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Low buy/sell ratio ({:.2f} < {:.2f}) for {} ({}) (Buys: {}, Sells: {})", buy_sell_ratio, self.MIN_BUY_TX_RATIO, name, symbol, buys_5m, sells_5m)
             return False
         else:
-            self.log(f"[FILTER PASS] Buy/Sell Ratio {buy_sell_ratio:.2f} ≥ Min {self.MIN_BUY_TX_RATIO:.2f}")
+            self.logger.debug("FILTER", "[FILTER PASS] Buy/Sell Ratio {:.2f} ≥ Min {:.2f}", buy_sell_ratio, self.MIN_BUY_TX_RATIO)
         pair_created_at = self.safe_float(token.get('pairCreatedAt', 0)) / 1000
         pair_age = now - pair_created_at
         if pair_age < self.MIN_PAIR_AGE_SECONDS:
-            self.log(f"❌ [FILTER FAILED] Too new ({int(pair_age)}s < {self.MIN_PAIR_AGE_SECONDS}s) for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Too new ({}s < {}s) for {} ({})", int(pair_age), self.MIN_PAIR_AGE_SECONDS, name, symbol)
             return False
         else:
-            self.log(f"[FILTER PASS] Pair Age {int(pair_age)}s ≥ Min {self.MIN_PAIR_AGE_SECONDS}s")
+            self.logger.debug("FILTER", "[FILTER PASS] Pair Age {}s ≥ Min {}s", int(pair_age), self.MIN_PAIR_AGE_SECONDS)
         if pair_age > self.MAX_PAIR_AGE_SECONDS:
-            self.log(f"❌ [FILTER FAILED] Too old ({int(pair_age)}s > {self.MAX_PAIR_AGE_SECONDS}s) for {name} ({symbol})")
+            self.logger.info("FILTER", "❌ [FILTER FAILED] Too old ({}s > {}s) for {} ({})", int(pair_age), self.MAX_PAIR_AGE_SECONDS, name, symbol)
             return False
         total_supply = self.safe_float(token.get('totalSupply'))
         market_cap = total_supply * buy_price if total_supply else 0
-        self.log(f"[DEBUG BUY FILTER] Market Cap: ${market_cap:,.2f}")
+        self.logger.debug("FILTER", "[DEBUG BUY FILTER] Market Cap: ${:,.2f}", market_cap)
 
         # After existing filters, before buying:
         settings = getattr(self, 'settings', {}) if hasattr(self, 'settings') else {}
@@ -503,40 +725,40 @@ class SniperSession:
         # 1. Socials
         if require_socials:
             if not has_required_socials(token):
-                self.log(f"❌ [FILTER FAILED] No socials found for {name} ({symbol})")
+                self.logger.info("FILTER", "❌ [FILTER FAILED] No socials found for {} ({})", name, symbol)
                 return False
             else:
-                self.log(f"[FILTER PASS] Socials found for {name} ({symbol})")
+                self.logger.debug("FILTER", "[FILTER PASS] Socials found for {} ({})", name, symbol)
         # 2. Burned
         if min_percent_burned > 0:
             percent_burned = get_burn_percent(mint, total_supply)
             if percent_burned < min_percent_burned:
-                self.log(f"❌ [FILTER FAILED] Only {percent_burned:.2f}% burned < Min {min_percent_burned}% for {name} ({symbol})")
+                self.logger.info("FILTER", "❌ [FILTER FAILED] Only {:.2f}% burned < Min {}% for {} ({})", percent_burned, min_percent_burned, name, symbol)
                 return False
             else:
-                self.log(f"[FILTER PASS] {percent_burned:.2f}% burned ≥ Min {min_percent_burned}% for {name} ({symbol})")
+                self.logger.debug("FILTER", "[FILTER PASS] {:.2f}% burned ≥ Min {}% for {} ({})", percent_burned, min_percent_burned, name, symbol)
         # 3. Immutable
         if require_immutable:
             if not is_immutable_metadata(mint):
-                self.log(f"❌ [FILTER FAILED] Metadata is mutable for {name} ({symbol})")
+                self.logger.info("FILTER", "❌ [FILTER FAILED] Metadata is mutable for {} ({})", name, symbol)
                 return False
             else:
-                self.log(f"[FILTER PASS] Metadata is immutable for {name} ({symbol})")
+                self.logger.debug("FILTER", "[FILTER PASS] Metadata is immutable for {} ({})", name, symbol)
         # 4. Top holders
         if max_percent_top_holders < 100:
             percent_top = get_top_holders_percent(mint, total_supply, top_n=5)
             if percent_top > max_percent_top_holders:
-                self.log(f"❌ [FILTER FAILED] Top 5 holders own {percent_top:.2f}% > Max {max_percent_top_holders}% for {name} ({symbol})")
+                self.logger.info("FILTER", "❌ [FILTER FAILED] Top 5 holders own {:.2f}% > Max {}% for {} ({})", percent_top, max_percent_top_holders, name, symbol)
                 return False
             else:
-                self.log(f"[FILTER PASS] Top 5 holders own {percent_top:.2f}% ≤ Max {max_percent_top_holders}% for {name} ({symbol})")
+                self.logger.debug("FILTER", "[FILTER PASS] Top 5 holders own {:.2f}% ≤ Max {}% for {} ({})", percent_top, max_percent_top_holders, name, symbol)
         # 5. Risky wallets
         if block_risky_wallets:
             if has_risky_wallet(mint):
-                self.log(f"❌ [FILTER FAILED] Risky wallet detected in top holders for {name} ({symbol})")
+                self.logger.info("FILTER", "❌ [FILTER FAILED] Risky wallet detected in top holders for {} ({})", name, symbol)
                 return False
             else:
-                self.log(f"[FILTER PASS] No risky wallets in top holders for {name} ({symbol})")
+                self.logger.debug("FILTER", "[FILTER PASS] No risky wallets in top holders for {} ({})", name, symbol)
 
         self.log("\n✨ ALL CHECKS PASSED - BUYING ✨")
         self.log(f"Token: {name} ({symbol})")
@@ -552,52 +774,63 @@ class SniperSession:
         fee = buy_amount_usd * self.BUY_FEE
         net_amt = buy_amount_usd - fee
         sol_amount = buy_amount_usd / self.sol_usd
-        with self.buy_lock:
-            available_balance_usd = self.sol_balance * self.sol_usd
-            if available_balance_usd < self.POSITION_SIZE_USD:
-                self.log(f"❌ Not enough balance (${available_balance_usd:.2f} available, need ${self.POSITION_SIZE_USD:.2f})")
+        wallet_balance = None
+        if not self.SIMULATION_MODE:
+            wallet_balance = self.get_wallet_balance()
+            if wallet_balance <= 0:
+                self.log("[ERROR] Manual buy: Wallet balance 0 SOL.")
                 return False
-            if not self.SIMULATION_MODE:
-                wallet_balance = self.get_wallet_balance()
-                if wallet_balance <= 0:
-                    self.log("[ERROR] Manual buy: Wallet balance 0 SOL.")
-                    return False
-                if sol_amount > wallet_balance:
-                    self.log(f"[ERROR] Manual buy: Insufficient SOL balance (have {wallet_balance:.4f}, need {sol_amount:.4f}).")
-                    return False
-            if asyncio.run(self.execute_buy_token(mint, sol_amount, pool_data)):
-                self.log(f"[INFO] Manual buy executed: {sol_amount:.4f} SOL into {symbol}")
-                # Update balances only in simulation or after on-chain success
-                if self.SIMULATION_MODE:
-                    self.sol_balance -= sol_amount
-                self.tokens[mint] = {
-                    'address': mint,
-                    'name': name,
-                    'symbol': symbol,
-                    'bought_at': now,
-                    'amount_usd': net_amt,
-                    'amount_left_usd': net_amt,
-                    'buy_price_usd': buy_price,
-                    'sold': False,
-                    'sell_price_usd': None,
-                    'sell_time': None,
-                    'pnl': None
-                }
-                if pool_data:
-                    price = self.safe_float(pool_data.get('priceUsd'))
-                    self.tokens[mint]['price_usd'] = price
-                    self.tokens[mint]['priceUsd'] = price
-                else:
-                    self.tokens[mint]['price_usd'] = buy_price
-                    self.tokens[mint]['priceUsd'] = buy_price
-                self.seen_tokens.add(mint)
-                if hasattr(self, 'watched_tokens'):
-                    self.watched_tokens.pop(mint, None)
-                self.update_open_positions_file()
-                return True
+        if not reserve_sol(self, sol_amount, wallet_balance):
+            available_balance_usd = (self.sol_balance - self.reserved_sol) * self.sol_usd
+            self.log(f"❌ Not enough balance (${available_balance_usd:.2f} available after in-flight buys, need ${self.POSITION_SIZE_USD:.2f})")
+            return False
+        bought = False
+        try:
+            bought = self.run_coroutine(self.execute_buy_token(mint, sol_amount, pool_data))
+        finally:
+            # Update balances only in simulation or after on-chain success
+            release_sol(self, sol_amount, spent=bool(bought))
+        if bought:
+            self.log(f"[INFO] Manual buy executed: {sol_amount:.4f} SOL into {symbol}")
+            self.tokens[mint] = {
+                'address': mint,
+                'name': name,
+                'symbol': symbol,
+                'bought_at': now,
+                'amount_usd': net_amt,
+                'amount_left_usd': net_amt,
+                'buy_price_usd': buy_price,
+                'sold': False,
+                'sell_price_usd': None,
+                'sell_time': None,
+                'pnl': None
+            }
+            if pool_data:
+                price = self.safe_float(pool_data.get('priceUsd'))
+                self.tokens[mint]['price_usd'] = price
+                self.tokens[mint]['priceUsd'] = price
+            else:
+                self.tokens[mint]['price_usd'] = buy_price
+                self.tokens[mint]['priceUsd'] = buy_price
+            self.seen_tokens.add(mint)
+            if hasattr(self, 'watched_tokens'):
+                self.watched_tokens.pop(mint, None)
+            self.update_open_positions_file()
+            return True
         return False
 
     def try_sell(self, token, now, force=False):
+        mint = token['address']
+        if not claim_mint(self, mint):
+            self.log(f"[DEBUG] A trade for {mint} is already in flight, skipping sell check.")
+            return False
+        try:
+            # Called through the class so sessions that only bind try_sell still reach it
+            return SniperSession._try_sell_claimed(self, token, now, force)
+        finally:
+            release_mint(self, mint)
+
+    def _try_sell_claimed(self, token, now, force=False):
         if token['sold']:
             self.log(f"[ERROR] Try sell: Token already sold: {token.get('name', 'N/A')} ({token.get('symbol', 'N/A')})")
             return False
@@ -638,7 +871,7 @@ class SniperSession:
         if not pool_data:
             self.log(f"[ERROR] Sell: Could not fetch pool data for {mint}. Cannot perform direct swap.")
             return False
-        if asyncio.run(self.execute_sell_token(mint, actual_tokens_to_sell, pool_data)):
+        if self.run_coroutine(self.execute_sell_token(mint, actual_tokens_to_sell, pool_data)):
             gross_usd = actual_tokens_to_sell * cur_price
             fee = gross_usd * self.SELL_FEE
             net_usd = gross_usd - fee
@@ -646,13 +879,14 @@ class SniperSession:
             amount_invested = self.safe_float(token.get('amount_invested_usd')) or sell_amt_usd
             pnl_usd = (cur_price - buy_price) / buy_price * amount_invested if buy_price else 0
             sol_received = net_usd / self.sol_usd
-            self.sol_balance += sol_received
+            with self.buy_lock:
+                self.sol_balance += sol_received
             token['amount_left_usd'] = 0
             token['sold'] = True
             token['sell_price_usd'] = cur_price
             token['sell_time'] = now
             token['pnl'] = pnl_usd
-            self.trades.append({
+            trade = {
                 'address': mint,
                 'buy_price_usd': buy_price,
                 'sell_price_usd': cur_price,
@@ -664,13 +898,14 @@ class SniperSession:
                 'symbol': symbol,
                 'reason': reason,
                 'fraction': 1.0
-            })
+            }
+            self.trades.append(trade)
             self.log(f"\n💰 SOLD {name} ({symbol})")
             self.log(f"Address: {mint}")
             self.log(f"Price: ${cur_price:.8f}")
             self.log(f"PnL: ${pnl_usd:.2f} ({(cur_price - buy_price) / buy_price * 100:+.1f}%)")
             self.log(f"Reason: {reason}")
-            self.update_open_positions_file()
+            self.record_sell(token, trade)
             return True
         return False
 
@@ -688,6 +923,10 @@ class SniperSession:
         # Stub for linter, should be implemented in subclass or main bot
         return False
 
+    def record_sell(self, token, trade):
+        """Persists a closed trade. sniper_bot.SniperSession, which binds try_sell, has its own that journals it."""
+        self.update_open_positions_file()
+
     def update_open_positions_file(self):
         """Save all open (unsold) positions to open_positions.json."""
         open_positions = [t for t in self.tokens.values() if not t.get('sold', False)]
@@ -714,7 +953,7 @@ def execute_buy(self, token_address, amount_sol):
             lamports=int(amount_sol * 1e9)
         )
         instruction = transfer(transfer_params)
-        recent_blockhash = self.client.get_latest_blockhash(commitment=COMMITMENT_CONFIRMED).value.blockhash
+        recent_blockhash = get_recent_blockhash(self)
         message = MessageV0.try_compile(
             payer=self.keypair.public_key,
             instructions=[instruction],
@@ -761,7 +1000,7 @@ def execute_sell(self, token_address, amount_tokens):
             lamports=int(amount_tokens)
         )
         instruction = transfer(transfer_params)
-        recent_blockhash = self.client.get_latest_blockhash(commitment=COMMITMENT_CONFIRMED).value.blockhash
+        recent_blockhash = get_recent_blockhash(self)
         message = MessageV0.try_compile(
             payer=self.keypair.public_key,
             instructions=[instruction],
@@ -935,10 +1174,10 @@ def get_holders_info(mint):
     # Solscan API: https://public-api.solscan.io/token/holders?tokenAddress=...&offset=0&limit=100
     try:
         url = f"https://public-api.solscan.io/token/holders?tokenAddress={mint}&offset=0&limit=100"
-        resp = requests.get(url, timeout=10)
+        resp = sniper_http.get(url, timeout=10)
         if resp.status_code == 200:
             # Each holder is a dict with 'owner' and 'amount' fields
-            return resp.json()
+            return sniper_codec.response_json(resp)
     except Exception as e:
         print(f"[ERROR] Could not fetch holders info: {e}")
     return []
@@ -973,9 +1212,9 @@ def is_immutable_metadata(mint):
     # Metaplex metadata: https://api-mainnet.magiceden.dev/v2/tokens/{mint}
     try:
         url = f"https://api-mainnet.magiceden.dev/v2/tokens/{mint}"
-        resp = requests.get(url, timeout=5)
+        resp = sniper_http.get(url, timeout=5)
         if resp.status_code == 200:
-            data = resp.json()
+            data = sniper_codec.response_json(resp)
             return not data.get('isMutable', True)
     except Exception as e:
         print(f"[ERROR] Could not fetch metadata: {e}")
@@ -1044,7 +1283,7 @@ async def _send_transaction_for_wallet_type(self, transaction, instruction=None)
             self.log("[DEBUG] Using Trojan wallet signing")
             if transaction is None and instruction is not None:
                 # Create a new transaction with the instruction
-                recent_blockhash = self.client.get_latest_blockhash(commitment="COMMITMENT_CONFIRMED").value.blockhash
+                recent_blockhash = get_recent_blockhash(self)
                 
                 # Create a versioned transaction
                 message = MessageV0.try_compile(
@@ -1063,7 +1302,7 @@ async def _send_transaction_for_wallet_type(self, transaction, instruction=None)
             self.log("[DEBUG] Using conventional wallet signing")
             if transaction is None and instruction is not None:
                 # Create a new transaction with the instruction
-                recent_blockhash = self.client.get_latest_blockhash(commitment="COMMITMENT_CONFIRMED").value.blockhash
+                recent_blockhash = get_recent_blockhash(self)
                 
                 # Create a versioned transaction
                 message = MessageV0.try_compile(
@@ -1092,21 +1331,12 @@ async def _send_transaction_for_wallet_type(self, transaction, instruction=None)
         signature = resp.value
         self.log(f"[DEBUG] Transaction sent with signature: {signature}")
         
-        # Wait for confirmation
-        for attempt in range(3):  # Try up to 3 times
-            try:
-                conf = self.client.confirm_transaction(signature, commitment="COMMITMENT_CONFIRMED")
-                if conf and conf.value:
-                    self.log(f"[DEBUG] Transaction confirmed on attempt {attempt + 1}")
-                    return True
-                self.log(f"[DEBUG] Confirmation attempt {attempt + 1} failed, retrying...")
-                await asyncio.sleep(1)
-            except Exception as e:
-                self.log(f"[DEBUG] Confirmation error on attempt {attempt + 1}: {e}")
-                if attempt < 2:  # Don't sleep on last attempt
-                    await asyncio.sleep(1)
+        # Wait for the signature notification (status polling as fallback)
+        if await confirm_signature(self, signature):
+            self.log(f"[DEBUG] Transaction confirmed: {signature}")
+            return True
         
-        self.log("❌ Transaction failed to confirm after 3 attempts")
+        self.log("❌ Transaction failed to confirm")
         return False
         
     except Exception as exc: